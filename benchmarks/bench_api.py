@@ -0,0 +1,432 @@
+"""API capacity at fixed arrival rates: latency, errors and DB queries per request.
+
+Seeds a throwaway database on the local Postgres (``DB_*`` settings) with a
+skewed data set – many small tenants, one large tenant owning
+``--large-tenant-share`` of the jobs, job history, resources and rollups – and
+then offers each scenario's requests at a constant rate for ``--duration``
+seconds::
+
+    python benchmarks/bench_api.py                                   # in-process (ASGI)
+    python benchmarks/bench_api.py --server --rates get_job=400,list_jobs=50
+    python benchmarks/bench_api.py --jobs 1000000 --mixed -o after.json
+
+Scenarios (``--rates name=requests/sec,...``):
+
+* ``create_resource`` – ``POST /tenants/{id}/resources/compute/vms``;
+* ``get_job`` – ``GET /tenants/{id}/jobs/{job_id}`` polling recent jobs;
+* ``list_jobs`` – first pages of the large tenant's jobs, a quarter of them
+  filtered by status;
+* ``tenant_metrics`` – ``GET /tenants/{id}/metrics``.
+
+Temporal is replaced by an in-process fake (``get_temporal_client``), so
+``create_resource`` measures the API tier only.  The load is open-loop:
+requests start on schedule whether or not earlier ones finished, latency
+counts from the scheduled start (queueing included), and requests beyond
+``--max-in-flight`` are dropped and reported.  In-process runs share one event
+loop with the load generator; ``--server`` serves the app from a uvicorn
+subprocess instead, which is what to size replicas by.  Query counts and DB
+time per request are read from the ``X-DB-Queries`` / ``X-DB-Time-Ms``
+response headers.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from common import summarize, throwaway_database, write_report
+
+# Set by ``db/accounting.py`` on every response (not imported here: importing
+# the package binds the engine before the throwaway database exists).
+QUERIES_HEADER = "X-DB-Queries"
+DB_TIME_HEADER = "X-DB-Time-Ms"
+
+SCENARIOS = ("create_resource", "get_job", "list_jobs", "tenant_metrics")
+DEFAULT_RATES = "create_resource=50,get_job=200,list_jobs=20,tenant_metrics=50"
+
+# Spread of the seeded jobs' ``created_at`` (and so of their history rows).
+_SEED_DAYS = 90
+
+
+# -----------------------------------------------------------------------------
+# Seed
+# -----------------------------------------------------------------------------
+
+
+def _seed_sql(args: argparse.Namespace) -> List[str]:
+    """Set-based inserts; tenant 1 is the large one."""
+    share = int(args.large_tenant_share * 100)
+    spread = _SEED_DAYS * 86400
+    return [
+        f"""
+        INSERT INTO tenants (id, name, created_at)
+        SELECT gen_random_uuid(), 'bench-tenant-' || g, now() - g * interval '1 minute'
+        FROM generate_series(1, {args.tenants}) g
+        """,
+        f"""
+        INSERT INTO resources (id, tenant_id, category, name, last_observed_state, created_at, updated_at)
+        SELECT gen_random_uuid(),
+               t.ids[CASE WHEN g % 100 < {share} THEN 1 ELSE 1 + g % {args.tenants} END],
+               'compute_vms', 'res-' || g, jsonb_build_object('cpu', 1 + g % 8, 'image', 'image-' || (g % 50)),
+               now() - (g % {spread}) * interval '1 second', now()
+        FROM generate_series(1, {args.resources}) g,
+             (SELECT array_agg(id ORDER BY created_at DESC) AS ids FROM tenants) t
+        """,
+        # ~1% queued or running, ~10% failed, the rest succeeded.
+        f"""
+        INSERT INTO jobs (id, tenant_id, job_type, category, resource_name, status, priority,
+                          dispatched_at, input_payload, result_payload, created_at, updated_at)
+        SELECT gen_random_uuid(),
+               t.ids[CASE WHEN g % 100 < {share} THEN 1 ELSE 1 + g % {args.tenants} END],
+               (ARRAY['create', 'update', 'delete']::job_type[])[1 + g % 3], 'compute/vms',
+               'res-' || (g % {args.resources}),
+               CASE WHEN g % 200 = 0 THEN 'pending'::job_status
+                    WHEN g % 200 = 1 THEN 'running'::job_status
+                    WHEN g % 10 = 0 THEN 'failed'::job_status
+                    ELSE 'succeeded'::job_status END,
+               'normal', now() - (g % {spread}) * interval '1 second',
+               jsonb_build_object('name', 'res-' || (g % {args.resources}), 'cpu', 2, 'image', 'rhel-9'),
+               CASE WHEN g % 200 > 1 THEN jsonb_build_object('commit', md5(g::text)) END,
+               now() - (g % {spread}) * interval '1 second', now()
+        FROM generate_series(1, {args.jobs}) g,
+             (SELECT array_agg(id ORDER BY created_at DESC) AS ids FROM tenants) t
+        """,
+        f"""
+        INSERT INTO job_history (job_id, status, timestamp, message)
+        SELECT j.id, 'running', j.created_at + h * interval '1 second', 'step ' || h
+        FROM jobs j, generate_series(1, {args.history_per_job}) h
+        """,
+    ]
+
+
+async def _seed(args: argparse.Namespace) -> Dict[str, Any]:
+    """Seed, build the rollups and ``ANALYZE``; return the ids the scenarios use."""
+    from sqlalchemy import func, select, text
+
+    from gitops_orchestrator.db.rollups import rebuild
+    from gitops_orchestrator.db.session import async_session, engine
+    from gitops_orchestrator.models import Job, Tenant
+
+    start = time.perf_counter()
+    async with engine.begin() as conn:
+        for sql in _seed_sql(args):
+            await conn.execute(text(sql))
+    async with async_session() as db:
+        await rebuild(db)
+        await db.commit()
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE"))
+        tenants = list((await conn.execute(select(Tenant.id).order_by(Tenant.created_at.desc()))).scalars())
+        recent = (
+            await conn.execute(select(Job.tenant_id, Job.id).order_by(Job.created_at.desc()).limit(args.poll_pool))
+        ).all()
+        large_jobs = (await conn.execute(select(func.count()).where(Job.tenant_id == tenants[0]))).scalar_one()
+    return {
+        "tenants": tenants,
+        "recent_jobs": [tuple(row) for row in recent],
+        "seed": {
+            "tenants": args.tenants,
+            "resources": args.resources,
+            "jobs": args.jobs,
+            "history_rows": args.jobs * args.history_per_job,
+            "large_tenant_jobs": large_jobs,
+            "seconds": round(time.perf_counter() - start, 1),
+        },
+    }
+
+
+# -----------------------------------------------------------------------------
+# Instrumented app
+# -----------------------------------------------------------------------------
+
+
+class FakeTemporal:
+    """Accepts workflow starts and signals without a Temporal server."""
+
+    def __init__(self) -> None:
+        self.started = 0
+        self.signalled = 0
+
+    async def start_workflow(self, *args: Any, **kwargs: Any) -> None:
+        self.started += 1
+
+    def get_workflow_handle(self, workflow_id: str) -> "FakeTemporal._Handle":
+        return FakeTemporal._Handle(self)
+
+    class _Handle:
+        def __init__(self, owner: "FakeTemporal") -> None:
+            self.owner = owner
+
+        async def signal(self, *args: Any, **kwargs: Any) -> None:
+            self.owner.signalled += 1
+
+
+def instrumented_app() -> Any:
+    """``main.app`` with the fake Temporal client."""
+    import gitops_orchestrator.main as api
+
+    fake = FakeTemporal()
+
+    async def temporal() -> FakeTemporal:
+        return fake
+
+    api.app.dependency_overrides[api.get_temporal_client] = temporal
+    api.get_temporal_client = temporal  # ``_start_job`` and warm-up resolve it from ``main``
+    return api.app
+
+
+def _serve(address: str) -> None:
+    """``--serve``: run the instrumented app under uvicorn (one process)."""
+    import uvicorn
+
+    host, _, port = address.rpartition(":")
+    uvicorn.run(instrumented_app(), host=host, port=int(port), log_level="warning", access_log=False)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_ready(client: Any, server: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"API server exited with {server.returncode}")
+        try:
+            if (await client.get("/readyz")).status_code == 200:
+                return
+        except Exception:  # noqa: BLE001 – not listening yet
+            pass
+        await asyncio.sleep(0.2)
+    raise SystemExit("API server not ready in time")
+
+
+# -----------------------------------------------------------------------------
+# Scenarios
+# -----------------------------------------------------------------------------
+
+Request = Tuple[str, str, Optional[Dict[str, Any]]]
+
+
+class _Scenarios:
+    """Request builders; ``create_resource`` feeds the jobs ``get_job`` polls."""
+
+    def __init__(self, state: Dict[str, Any], args: argparse.Namespace) -> None:
+        self.rng = random.Random(args.seed)
+        self.tenants: List[uuid.UUID] = state["tenants"]
+        self.large = self.tenants[0]
+        self.jobs: List[Tuple[uuid.UUID, uuid.UUID]] = list(state["recent_jobs"])
+        self.pool = args.poll_pool
+        self.page_size = args.page_size
+
+    def _tenant(self) -> uuid.UUID:
+        return self.large if self.rng.random() < 0.25 else self.rng.choice(self.tenants)
+
+    def create_resource(self) -> Request:
+        body = {"name": f"bench-{uuid.uuid4().hex[:12]}", "payload": {"cpu": 2, "image": "rhel-9"}}
+        return "POST", f"/api/v1/tenants/{self._tenant()}/resources/compute/vms", body
+
+    def get_job(self) -> Request:
+        tenant_id, job_id = self.rng.choice(self.jobs)
+        return "GET", f"/api/v1/tenants/{tenant_id}/jobs/{job_id}", None
+
+    def list_jobs(self) -> Request:
+        query = f"limit={self.page_size}"
+        if self.rng.random() < 0.25:
+            query += "&status=failed"
+        return "GET", f"/api/v1/tenants/{self.large}/jobs?{query}", None
+
+    def tenant_metrics(self) -> Request:
+        return "GET", f"/api/v1/tenants/{self._tenant()}/metrics", None
+
+    def created(self, response: Any) -> None:
+        """Poll the jobs ``create_resource`` submitted, most recent first."""
+        if response.status_code == 202:
+            job = response.json()
+            self.jobs.insert(0, (uuid.UUID(job["tenant_id"]), uuid.UUID(job["id"])))
+            del self.jobs[self.pool :]
+
+
+async def _drive(
+    client: Any, scenarios: _Scenarios, name: str, rate: float, args: argparse.Namespace
+) -> Dict[str, Any]:
+    """Offer *name* requests at *rate*/s for ``--duration`` seconds (open loop)."""
+    build = getattr(scenarios, name)
+    for _ in range(args.warmup):
+        method, url, body = build()
+        await client.request(method, url, json=body)
+
+    latency: List[float] = []
+    queries: List[int] = []
+    db_time: List[float] = []
+    outcomes: Counter = Counter()
+    in_flight = 0
+    dropped = 0
+
+    async def one(due: float, method: str, url: str, body: Optional[Dict[str, Any]]) -> None:
+        nonlocal in_flight
+        try:
+            response = await client.request(method, url, json=body)
+        except Exception as exc:  # noqa: BLE001 – counted as an error
+            outcomes[type(exc).__name__] += 1
+        else:
+            outcomes[str(response.status_code)] += 1
+            if QUERIES_HEADER in response.headers:
+                queries.append(int(response.headers[QUERIES_HEADER]))
+                db_time.append(float(response.headers[DB_TIME_HEADER]) / 1000)
+            if name == "create_resource":
+                scenarios.created(response)
+        finally:
+            latency.append(time.perf_counter() - due)
+            in_flight -= 1
+
+    tasks = []
+    total = int(rate * args.duration)
+    started = time.perf_counter()
+    for i in range(total):
+        due = started + i / rate
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if in_flight >= args.max_in_flight:
+            dropped += 1
+            continue
+        in_flight += 1
+        tasks.append(asyncio.create_task(one(due, *build())))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    completed = sum(outcomes.values())
+    errors = {k: v for k, v in outcomes.items() if not k.startswith(("2", "3"))}
+    return {
+        "target_rps": rate,
+        "achieved_rps": round(completed / elapsed, 1),
+        "offered": total,
+        "dropped": dropped,
+        "responses": dict(outcomes),
+        "error_rate": round((sum(errors.values()) + dropped) / total, 4) if total else 0.0,
+        "latency": summarize(latency),
+        "db_queries_per_request": {
+            "mean": round(sum(queries) / len(queries), 2) if queries else None,
+            "max": max(queries, default=None),
+        },
+        "db_time": summarize(db_time),
+    }
+
+
+async def _run(args: argparse.Namespace, rates: Dict[str, float]) -> Dict[str, Any]:
+    import httpx
+
+    print("seeding ...", file=sys.stderr)
+    state = await _seed(args)
+    print(f"seeded in {state['seed']['seconds']}s", file=sys.stderr)
+    scenarios = _Scenarios(state, args)
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+
+    server = None
+    if args.server:
+        from gitops_orchestrator.db.session import dispose_engines
+
+        await dispose_engines()  # the server process opens its own
+        address = f"127.0.0.1:{_free_port()}"
+        server = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve", address])
+        client = httpx.AsyncClient(base_url=f"http://{address}", limits=limits, timeout=args.timeout)
+    else:
+        transport = httpx.ASGITransport(app=instrumented_app())
+        client = httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout)
+
+    results: Dict[str, Any] = {}
+    try:
+        if server is not None:
+            await _wait_ready(client, server)
+        for name, rate in rates.items():
+            print(f"{name}: {rate}/s for {args.duration}s ...", file=sys.stderr)
+            results[name] = await _drive(client, scenarios, name, rate, args)
+            print(
+                f"  p50 {results[name]['latency'].get('p50_ms')}ms  p99 {results[name]['latency'].get('p99_ms')}ms  "
+                f"errors {results[name]['error_rate']:.2%}  queries/req {results[name]['db_queries_per_request']['mean']}",
+                file=sys.stderr,
+            )
+        if args.mixed:
+            print(f"mixed: {sum(rates.values())}/s for {args.duration}s ...", file=sys.stderr)
+            mixed = await asyncio.gather(*(_drive(client, scenarios, n, r, args) for n, r in rates.items()))
+            results["mixed"] = dict(zip(rates, mixed))
+    finally:
+        await client.aclose()
+        if server is not None:
+            server.terminate()
+            server.wait()
+        else:
+            from gitops_orchestrator.db.session import dispose_engines
+
+            await dispose_engines()
+
+    return {
+        "config": {
+            "transport": "uvicorn" if args.server else "asgi",
+            "duration": args.duration,
+            "max_in_flight": args.max_in_flight,
+            "page_size": args.page_size,
+            "rates": rates,
+            "seed": args.seed,
+        },
+        "seed": state["seed"],
+        "scenarios": results,
+    }
+
+
+def _parse_rates(raw: str) -> Dict[str, float]:
+    rates = {}
+    for part in raw.split(","):
+        name, _, rate = part.partition("=")
+        if name.strip() not in SCENARIOS:
+            raise SystemExit(f"unknown scenario '{name}' (one of {', '.join(SCENARIOS)})")
+        rates[name.strip()] = float(rate)
+    return rates
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rates", default=DEFAULT_RATES, help="scenario=requests/sec,... (default: %(default)s)")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per scenario")
+    parser.add_argument("--mixed", action="store_true", help="finally run all scenarios at once")
+    parser.add_argument("--server", action="store_true", help="serve the app from a uvicorn subprocess")
+    parser.add_argument("--max-in-flight", type=int, default=200, help="drop arrivals beyond this many open requests")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--warmup", type=int, default=20, help="unrecorded requests before each scenario")
+    parser.add_argument("--tenants", type=int, default=1_000)
+    parser.add_argument("--large-tenant-share", type=float, default=0.3, help="share of rows owned by one tenant")
+    parser.add_argument("--resources", type=int, default=50_000)
+    parser.add_argument("--jobs", type=int, default=300_000)
+    parser.add_argument("--history-per-job", type=int, default=3)
+    parser.add_argument("--poll-pool", type=int, default=2_000, help="recent jobs get_job polls")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep", action="store_true", help="keep the database")
+    parser.add_argument("--output", "-o", default="-", help="JSON report path (default: stdout)")
+    parser.add_argument("--serve", metavar="HOST:PORT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        _serve(args.serve)
+        return
+    rates = _parse_rates(args.rates)
+    # Configure the app before any module binds settings or the engine.
+    os.environ["SCHEDULER_ENABLED"] = "false"
+    with throwaway_database("gitops_api_bench", keep=args.keep):
+        report = asyncio.run(_run(args, rates))
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
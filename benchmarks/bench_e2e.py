@@ -0,0 +1,302 @@
+"""End-to-end job throughput: ``_start_job`` → ``JobWorkflow`` → ``render_and_commit``.
+
+Everything runs on one box without network access:
+
+* Temporal – the SDK's time-skipping test server (``--test-server`` path to a
+  pre-fetched ``temporal-test-server`` binary; otherwise the SDK downloads it
+  once into ``--download-dir`` and reuses it from there);
+* Git – local bare repos, seeded with a ``main`` branch, as the remotes of
+  ``RESOURCE_REPO_MAP_JSON``;
+* Postgres – a throwaway database on the local server (``DB_*`` settings),
+  migrated to head and dropped afterwards.
+
+The production worker pools (``temporal_worker.build_workers``) serve the
+workflows; jobs are submitted through ``routes.resources._start_job`` with
+``--concurrency`` in flight, each waiting for its workflow's result::
+
+    python benchmarks/bench_e2e.py --jobs 200 --concurrency 20
+    python benchmarks/bench_e2e.py --tenants 20 --tenant-skew 1.2 \\
+        --mix compute/vms=4,enterprise_networking/lb=1 --resources 50 --output after.json
+
+The JSON report (jobs/sec, per-stage p50/p99, git pushes per job) is meant to
+be diffed between versions.  Stage timings come from the same
+``observe_stage`` blocks that feed ``gitops_stage_duration_seconds``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter, defaultdict
+from contextlib import AsyncExitStack, contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+from common import summarize, throwaway_database, write_report
+
+# Categories whose jobs take the git path in ``JobWorkflow``.
+_GIT_CATEGORY_GROUPS = ("k8s", "storage", "compute")
+
+# Template context per category (``JobWorkflow`` passes the payload as ``vm``).
+_PAYLOADS: Dict[str, Dict[str, Any]] = {
+    "compute/vms": {"flavour": "m1.small", "cpu": 2, "memory": "4Gi", "image": "rhel-9"},
+}
+
+
+def _parse_mix(raw: str) -> Dict[str, float]:
+    mix = {}
+    for part in raw.split(","):
+        category, _, weight = part.partition("=")
+        mix[category.strip()] = float(weight or 1)
+    return mix
+
+
+def _uses_git(category: str) -> bool:
+    return any(group in category for group in _GIT_CATEGORY_GROUPS)
+
+
+def _check_mix(mix: Dict[str, float]) -> None:
+    from gitops_orchestrator.gitops.templater import TEMPLATES_DIR
+    from gitops_orchestrator.models import ResourceCategory
+
+    known = {c.value for c in ResourceCategory}
+    for category in mix:
+        if category not in known:
+            raise SystemExit(f"unknown category '{category}'")
+        if _uses_git(category) and not (TEMPLATES_DIR / f"{category}.yaml.j2").exists():
+            raise SystemExit(f"no template gitops/templates/{category}.yaml.j2; its jobs would fail to render")
+
+
+# -----------------------------------------------------------------------------
+# Local stand-ins
+# -----------------------------------------------------------------------------
+
+
+def _git(cwd: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-c", "user.name=bench", "-c", "user.email=bench@localhost", *args],
+        cwd=cwd, check=True, capture_output=True, text=True,
+    ).stdout.strip()
+
+
+def _bare_repo(root: Path, name: str) -> Path:
+    """Create a bare repo whose ``main`` holds one commit."""
+    bare = root / f"{name}.git"
+    _git(root, "init", "--quiet", "--bare", "--initial-branch=main", str(bare))
+    seed = root / f"{name}-seed"
+    _git(root, "init", "--quiet", "--initial-branch=main", str(seed))
+    (seed / "README.md").write_text(f"{name} (benchmark remote)\n")
+    _git(seed, "add", "README.md")
+    _git(seed, "commit", "--quiet", "-m", "seed")
+    _git(seed, "push", "--quiet", str(bare), "main")
+    return bare
+
+
+def _setup_repos(root: Path, categories: List[str], shared: bool) -> Dict[str, str]:
+    """Return ``RESOURCE_REPO_MAP_JSON`` content for *categories*."""
+    if shared:
+        bare = str(_bare_repo(root, "resources"))
+        return {category: bare for category in categories}
+    return {category: str(_bare_repo(root, category.replace("/", "_"))) for category in categories}
+
+
+def _commits(repo_map: Dict[str, str]) -> int:
+    """Commits landed on ``main`` across the remotes, minus the seeds."""
+    return sum(int(_git(Path(bare), "rev-list", "--count", "main")) - 1 for bare in set(repo_map.values()))
+
+
+@contextmanager
+def _record_stages() -> Iterator[Tuple[Dict[str, List[float]], Counter]]:
+    """Collect every ``observe_stage`` duration (seconds) and error count by stage."""
+    from gitops_orchestrator import instrumentation
+
+    samples: Dict[str, List[float]] = defaultdict(list)
+    errors: Counter = Counter()
+    original = instrumentation.observe_stage
+
+    @contextmanager
+    def recording(stage: str, **labels: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            with original(stage, **labels):
+                yield
+        except BaseException:
+            errors[stage] += 1
+            raise
+        finally:
+            samples[stage].append(time.perf_counter() - start)
+
+    instrumentation.observe_stage = recording  # call sites import it lazily
+    try:
+        yield samples, errors
+    finally:
+        instrumentation.observe_stage = original
+
+
+# -----------------------------------------------------------------------------
+# Driver
+# -----------------------------------------------------------------------------
+
+
+def _plan(args: argparse.Namespace, mix: Dict[str, float], tenants: List[uuid.UUID]) -> List[Tuple[uuid.UUID, str, str]]:
+    """Return (tenant, category, resource name) per job.
+
+    Tenants are drawn Zipf-like (weight ``1 / rank ** skew``); names from a
+    pool of ``--resources`` per tenant and category, so repeats are updates
+    that supersede each other.
+    """
+    rng = random.Random(args.seed)
+    tenant_weights = [1 / (rank + 1) ** args.tenant_skew for rank in range(len(tenants))]
+    categories, weights = zip(*mix.items())
+    plan = []
+    for _ in range(args.jobs):
+        tenant = rng.choices(tenants, tenant_weights)[0]
+        category = rng.choices(categories, weights)[0]
+        plan.append((tenant, category, f"bench-{rng.randrange(args.resources)}"))
+    return plan
+
+
+async def _run(args: argparse.Namespace, mix: Dict[str, float], repo_map: Dict[str, str]) -> Dict[str, Any]:
+    from temporalio.testing import WorkflowEnvironment
+
+    import gitops_orchestrator.main as api
+    from gitops_orchestrator.config import get_settings
+    from gitops_orchestrator.db.session import async_session, dispose_engines
+    from gitops_orchestrator.models import Tenant
+    from gitops_orchestrator.routes.resources import _start_job
+    from gitops_orchestrator.temporal_worker import build_workers
+
+    async with async_session() as db:
+        tenants = [Tenant(name=f"bench-tenant-{i}") for i in range(args.tenants)]
+        db.add_all(tenants)
+        await db.commit()
+        tenant_ids = [t.id for t in tenants]
+    plan = _plan(args, mix, tenant_ids)
+
+    try:
+        env = await WorkflowEnvironment.start_time_skipping(
+            test_server_existing_path=args.test_server, download_dest_dir=args.download_dir
+        )
+    except RuntimeError as exc:
+        # Usually the one-time download on a box without network access.
+        raise SystemExit(f"cannot start the Temporal test server ({exc}); fetch it and pass --test-server") from None
+    submit: List[float] = []
+    latency: List[float] = []
+    statuses: Counter = Counter()
+    try:
+        async def client() -> Any:
+            return env.client
+
+        api.get_temporal_client = client  # _start_job resolves it from ``main``
+        async with AsyncExitStack() as workers:
+            for worker in build_workers(env.client, get_settings()):
+                await workers.enter_async_context(worker)
+
+            gate = asyncio.Semaphore(args.concurrency)
+
+            async def one(tenant_id: uuid.UUID, category: str, name: str) -> None:
+                async with gate:
+                    start = time.perf_counter()
+                    async with async_session() as db:
+                        job = await _start_job(
+                            db=db,
+                            tenant_id=tenant_id,
+                            category=category,
+                            job_type="create",
+                            payload={"name": name, **_PAYLOADS.get(category, {})},
+                            resource_name=name,
+                        )
+                    submit.append(time.perf_counter() - start)
+                    try:
+                        status = await env.client.get_workflow_handle(str(job.id)).result()
+                    except Exception as exc:  # noqa: BLE001 – counted, not fatal
+                        status = f"error: {type(exc).__name__}"
+                    statuses[status] += 1
+                    latency.append(time.perf_counter() - start)
+
+            with _record_stages() as (stages, stage_errors):
+                started = time.perf_counter()
+                await asyncio.gather(*(one(*job) for job in plan))
+                wall = time.perf_counter() - started
+    finally:
+        await env.shutdown()
+        await dispose_engines()
+
+    pushes = len(stages.get("push", []))
+    commits = _commits(repo_map)
+    return {
+        "config": {
+            "jobs": args.jobs,
+            "concurrency": args.concurrency,
+            "tenants": args.tenants,
+            "tenant_skew": args.tenant_skew,
+            "mix": mix,
+            "resources": args.resources,
+            "shared_repo": args.shared_repo,
+            "seed": args.seed,
+        },
+        "wall_seconds": round(wall, 3),
+        "jobs_per_sec": round(args.jobs / wall, 3),
+        "statuses": dict(statuses),
+        "job_latency": summarize(latency),
+        "submit_latency": summarize(submit),
+        "stages": {
+            stage: {**summarize(values), "errors": stage_errors.get(stage, 0)} for stage, values in sorted(stages.items())
+        },
+        "git": {
+            "push_attempts": pushes,
+            "commits_landed": commits,
+            "pushes_per_job": round(pushes / args.jobs, 3),
+            "commits_per_job": round(commits / args.jobs, 3),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=100, help="jobs to run")
+    parser.add_argument("--concurrency", type=int, default=10, help="jobs in flight")
+    parser.add_argument("--tenants", type=int, default=5)
+    parser.add_argument("--tenant-skew", type=float, default=0.0, help="Zipf exponent of the tenant mix (0: uniform)")
+    parser.add_argument("--mix", default="compute/vms=1", help="category=weight,... (default: %(default)s)")
+    parser.add_argument("--resources", type=int, default=1_000_000, help="resource names per tenant and category")
+    parser.add_argument("--shared-repo", action="store_true", help="one remote for all categories")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--test-server", help="path of a temporal-test-server binary (no download)")
+    parser.add_argument(
+        "--download-dir",
+        default=str(Path(tempfile.gettempdir()) / "temporal-test-server"),
+        help="where the SDK caches the downloaded test server (default: %(default)s)",
+    )
+    parser.add_argument("--keep", action="store_true", help="keep the database and git remotes")
+    parser.add_argument("--output", "-o", default="-", help="JSON report path (default: stdout)")
+    args = parser.parse_args()
+
+    mix = _parse_mix(args.mix)
+    workdir = Path(tempfile.mkdtemp(prefix="gitops_bench_"))
+    repo_map = _setup_repos(workdir, [c for c in mix if _uses_git(c)], args.shared_repo)
+    # Configure the app before any module binds settings or the engine.
+    os.environ["RESOURCE_REPO_MAP_JSON"] = json.dumps(repo_map)
+    os.environ["SCHEDULER_ENABLED"] = "false"
+    try:
+        with throwaway_database(keep=args.keep):
+            _check_mix(mix)
+            report = asyncio.run(_run(args, mix, repo_map))
+    finally:
+        if args.keep:
+            print(f"kept git remotes in {workdir}", file=sys.stderr)
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
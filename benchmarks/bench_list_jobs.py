@@ -0,0 +1,181 @@
+"""Requests/sec of ``GET /tenants/{id}/jobs`` before and after the fast path.
+
+*before* is the previous implementation – ORM entities, ``model_validate`` per
+row, FastAPI re-validating against ``response_model`` and encoding through
+``jsonable_encoder`` + ``json.dumps``; *after* is the route in
+``routes/jobs.py`` (Core row tuples encoded by orjson).  Both are served
+in-process over ASGI, so the numbers isolate the Python request path::
+
+    python benchmarks/bench_list_jobs.py                    # in-memory rows
+    python benchmarks/bench_list_jobs.py --limit 1000 --seconds 10
+    python benchmarks/bench_list_jobs.py --tenant <uuid>    # real DB (DB_* settings)
+
+The in-memory mode hands both variants pre-built rows and so understates the
+gain (it leaves out ORM hydration); ``--tenant`` includes it.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI, Query, Response  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+from gitops_orchestrator.db.session import get_async_session, get_read_session  # noqa: E402
+from gitops_orchestrator.models import Job, JobSchema, JobStatus, JobType  # noqa: E402
+from gitops_orchestrator.pagination import PageParams, finish_page, paginate  # noqa: E402
+from gitops_orchestrator.routes import jobs  # noqa: E402
+from gitops_orchestrator.serialization import JOB_COLUMNS, ORJSONResponse  # noqa: E402
+
+
+def _before_app() -> FastAPI:
+    """The list route as it was before the fast path."""
+    app = FastAPI(default_response_class=JSONResponse)
+
+    @app.get("/api/v1/tenants/{tenant_id}/jobs", response_model=List[JobSchema])
+    async def list_jobs(
+        tenant_id: uuid.UUID,
+        response: Response,
+        status: Optional[JobStatus] = Query(None),
+        job_type: Optional[JobType] = Query(None),
+        page: PageParams = Depends(),
+        db: AsyncSession = Depends(get_async_session),
+    ) -> List[JobSchema]:
+        stmt = select(Job).where(Job.tenant_id == tenant_id)
+        if status is not None:
+            stmt = stmt.where(Job.status == status)
+        if job_type is not None:
+            stmt = stmt.where(Job.job_type == job_type)
+        rows = (await db.execute(paginate(stmt, Job.created_at, Job.id, page))).scalars().all()
+        return [JobSchema.model_validate(j) for j in finish_page(rows, page, response)]
+
+    return app
+
+
+def _after_app() -> FastAPI:
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.include_router(jobs.router, prefix="/api/v1")
+    return app
+
+
+# -----------------------------------------------------------------------------
+# In-memory session
+# -----------------------------------------------------------------------------
+
+
+class _FakeResult:
+    def __init__(self, rows: List[Any]) -> None:
+        self._rows = rows
+
+    def all(self) -> List[Any]:
+        return self._rows
+
+    def scalars(self) -> "_FakeResult":
+        return self
+
+
+class _FakeSession:
+    """Answers ``select(Job)`` with ORM objects and column selects with row tuples."""
+
+    def __init__(self, entities: List[Job], rows: List[Any]) -> None:
+        self.entities, self.rows = entities, rows
+
+    async def execute(self, stmt: Any) -> _FakeResult:
+        wants_entities = stmt.column_descriptions[0]["type"] is Job and len(stmt.column_descriptions) == 1
+        return _FakeResult(self.entities if wants_entities else self.rows)
+
+
+def _fake_session(tenant_id: uuid.UUID, n: int) -> Callable[[], Any]:
+    start = datetime.utcnow() - timedelta(days=1)
+    entities = [
+        Job(
+            id=uuid.uuid4(),
+            tenant_id=tenant_id,
+            resource_id=None,
+            job_type=JobType.update,
+            status=JobStatus.succeeded,
+            input_payload={"name": f"vm-{i}", "flavour": "m1.small", "disks": [{"size_gb": 100}]},
+            result_payload={"commit": "0" * 40, "pr_url": f"https://git.example.com/pr/{i}"},
+            superseded_by_id=None,
+            created_at=start + timedelta(seconds=i),
+            updated_at=start + timedelta(seconds=i, minutes=1),
+        )
+        for i in range(n)
+    ]
+    Row = namedtuple("Row", [c.key for c in JOB_COLUMNS.columns])  # type: ignore[misc]
+    rows = [Row(*(getattr(job, c.key) for c in JOB_COLUMNS.columns)) for job in entities]
+    session = _FakeSession(entities, rows)
+
+    async def override() -> Any:
+        yield session
+
+    return override
+
+
+# -----------------------------------------------------------------------------
+# Driver
+# -----------------------------------------------------------------------------
+
+
+async def _rps(app: FastAPI, url: str, seconds: float, concurrency: int) -> float:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        (await client.get(url)).raise_for_status()  # warm-up
+        deadline = time.perf_counter() + seconds
+        done = 0
+
+        async def worker() -> None:
+            nonlocal done
+            while time.perf_counter() < deadline:
+                (await client.get(url)).raise_for_status()
+                done += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return done / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limit", type=int, default=100, help="page size (rows per response)")
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration of each run")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent in-flight requests")
+    parser.add_argument("--tenant", type=uuid.UUID, help="read this tenant's jobs from the configured database")
+    args = parser.parse_args()
+
+    tenant_id = args.tenant or uuid.uuid4()
+    before, after = _before_app(), _after_app()
+    if args.tenant is None:
+        override = _fake_session(tenant_id, args.limit + 1)
+        # ``list_jobs`` reads through get_read_session (replica routing).
+        for app in (before, after):
+            app.dependency_overrides[get_async_session] = override
+            app.dependency_overrides[get_read_session] = override
+
+    url = f"/api/v1/tenants/{tenant_id}/jobs?limit={args.limit}"
+    results = {}
+    for name, app in (("before", before), ("after", after)):
+        results[name] = await _rps(app, url, args.seconds, args.concurrency)
+        print(f"{name:<7} {results[name]:>9.1f} req/s")
+    print(f"speedup {results['after'] / results['before']:>9.2f}x  (limit={args.limit})")
+
+    if args.tenant is not None:
+        from gitops_orchestrator.db.session import engine
+
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,262 @@
+"""Microbenchmarks of the job path's building blocks, with saved baselines.
+
+Covers ``git_writer.commit_change`` on generated repos of 10 up to 100k files
+(cloned over ``file://`` so git packs objects like it would for a remote),
+``templater.render_template`` with and without ``base_dir``,
+``template_fetcher.get_template_dir`` with a cold and a warm cache, and the
+JSON map settings of ``AppSettings``::
+
+    python benchmarks/bench_micro.py --save main           # record a baseline
+    python benchmarks/bench_micro.py --compare main        # exit 1 on regressions
+    python benchmarks/bench_micro.py -k render --compare main --threshold 0.1
+    python benchmarks/bench_micro.py --sizes 10,1000       # skip the big repos
+
+Each benchmark reports the median, minimum and p90 time per call over
+several rounds (fast calls are batched per round).  ``--compare`` flags any
+benchmark whose median grew by more than ``--threshold`` (default 20%)
+relative to ``benchmarks/baselines/<name>.json``; compare baselines taken on
+the same machine only.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from common import percentile, write_report
+
+BASELINES = Path(__file__).resolve().parent / "baselines"
+
+# (name, function, per-call setup or None)
+Benchmark = Tuple[str, Callable[[], Any], Optional[Callable[[], Any]]]
+
+
+# -----------------------------------------------------------------------------
+# Fixtures
+# -----------------------------------------------------------------------------
+
+
+def _fixture_repo(root: Path, files: int) -> Path:
+    """Create a bare repo whose ``main`` holds *files* manifests, via ``git fast-import``."""
+    bare = root / f"resources-{files}.git"
+    subprocess.run(["git", "init", "--quiet", "--bare", "--initial-branch=main", str(bare)], check=True)
+    stream: List[bytes] = []
+    for i in range(files):
+        content = f"name: res-{i}\ncpu: {1 + i % 8}\nimage: image-{i % 50}\n".encode()
+        stream.append(b"blob\nmark :%d\ndata %d\n%s\n" % (i + 1, len(content), content))
+    stream.append(b"commit refs/heads/main\ncommitter bench <bench@localhost> 0 +0000\ndata 7\nfixture\n")
+    for i in range(files):
+        stream.append(b"M 100644 :%d tenant-%d/vms/res-%d.yaml\n" % (i + 1, i % 100, i))
+    subprocess.run(
+        ["git", "fast-import", "--quiet"], cwd=bare, input=b"".join(stream) + b"\n", check=True
+    )
+    return bare
+
+
+def _template_repo(root: Path) -> Path:
+    """Bare template repo holding the bundled templates."""
+    from gitops_orchestrator.gitops.templater import TEMPLATES_DIR
+
+    work = root / "templates-work"
+    shutil.copytree(TEMPLATES_DIR, work)
+    git = ["git", "-c", "user.name=bench", "-c", "user.email=bench@localhost"]
+    subprocess.run([*git, "init", "--quiet", "--initial-branch=main"], cwd=work, check=True)
+    subprocess.run([*git, "add", "."], cwd=work, check=True)
+    subprocess.run([*git, "commit", "--quiet", "-m", "templates"], cwd=work, check=True)
+    bare = root / f"bench-templates-{uuid.uuid4().hex[:8]}.git"
+    subprocess.run(["git", "clone", "--quiet", "--bare", str(work), str(bare)], check=True)
+    return bare
+
+
+# -----------------------------------------------------------------------------
+# Benchmarks
+# -----------------------------------------------------------------------------
+
+
+def _commit_change(sizes: List[int], root: Path, wanted: Callable[[str], bool]) -> Iterator[Benchmark]:
+    from gitops_orchestrator.gitops.git_writer import commit_change
+
+    loop = asyncio.new_event_loop()
+    for files in sizes:
+        name = f"commit_change[{files} files]"
+        if not wanted(name):
+            continue  # building the big repos takes far longer than measuring
+        url = f"file://{_fixture_repo(root, files)}"
+        counter = iter(range(10**9))
+
+        def call(url: str = url) -> str:
+            return loop.run_until_complete(
+                commit_change(
+                    repo_url=url,
+                    relative_file_path=Path(f"bench/vms/res-{next(counter)}.yaml"),
+                    file_content="name: bench\ncpu: 2\n",
+                    commit_message="GitOps: update bench",
+                    category="compute/vms",
+                )
+            )
+
+        yield name, call, None
+
+
+def _render_template() -> Iterator[Benchmark]:
+    from gitops_orchestrator.gitops.templater import TEMPLATES_DIR, render_template
+
+    context = {"vm": {"name": "web-1", "flavour": "m1.small", "cpu": 2, "memory": "4Gi", "image": "rhel-9"}}
+    yield "render_template[default env]", lambda: render_template("compute/vms.yaml.j2", context), None
+    yield (
+        "render_template[base_dir]",
+        lambda: render_template("compute/vms.yaml.j2", context, base_dir=TEMPLATES_DIR),
+        None,
+    )
+
+
+def _get_template_dir(repo: Path) -> Iterator[Benchmark]:
+    from gitops_orchestrator.gitops import template_fetcher
+
+    cached = template_fetcher._CACHE_ROOT / repo.name.removesuffix(".git")
+
+    def evict() -> None:
+        shutil.rmtree(cached, ignore_errors=True)
+
+    get = lambda: template_fetcher.get_template_dir("compute/vms")  # noqa: E731
+    yield "get_template_dir[cold]", get, evict
+    yield "get_template_dir[warm]", get, None
+
+
+def _settings_maps() -> Iterator[Benchmark]:
+    from gitops_orchestrator.config import AppSettings
+    from gitops_orchestrator.models import ResourceCategory
+
+    repo_map = json.dumps({c.value: f"git@git.example.com:acme/{c.name}.git" for c in ResourceCategory})
+    overrides = json.dumps({str(uuid.UUID(int=i)): {"weight": 2, "max_in_flight": 50} for i in range(1000)})
+    settings = AppSettings(
+        resource_repo_map_json=repo_map,
+        template_repo_map_json=repo_map,
+        scheduler_tenant_overrides_json=overrides,
+    )
+    yield "settings.resource_repo_map", lambda: settings.resource_repo_map, None
+    yield "settings.scheduler_tenant_overrides[1000 tenants]", lambda: settings.scheduler_tenant_overrides, None
+    yield "AppSettings()", AppSettings, None
+
+
+# -----------------------------------------------------------------------------
+# Runner
+# -----------------------------------------------------------------------------
+
+
+def measure(
+    fn: Callable[[], Any], setup: Optional[Callable[[], Any]], *, min_rounds: int, min_time: float
+) -> Dict[str, Any]:
+    """Time *fn*; return per-call median/min/p90 in microseconds."""
+    iterations = 1
+    if setup is None:
+        start = time.perf_counter()
+        fn()  # warm-up
+        first = time.perf_counter() - start
+        # Batch fast calls so each round lasts at least ~1ms.
+        while first * iterations < 0.001:
+            iterations *= 10
+
+    times: List[float] = []
+    deadline = time.perf_counter() + min_time
+    while len(times) < min_rounds or time.perf_counter() < deadline:
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        times.append((time.perf_counter() - start) / iterations)
+    return {
+        "median_us": round(percentile(times, 50) * 1e6, 2),
+        "min_us": round(min(times) * 1e6, 2),
+        "p90_us": round(percentile(times, 90) * 1e6, 2),
+        "rounds": len(times),
+        "iterations": iterations,
+    }
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Print the change against *baseline*; return the benchmarks that regressed."""
+    regressions = []
+    old = baseline["benchmarks"]
+    print(f"\n{'benchmark':<52} {'baseline':>12} {'now':>12} {'change':>8}", file=sys.stderr)
+    for name, stats in results.items():
+        if name not in old:
+            print(f"{name:<52} {'-':>12} {stats['median_us']:>10.1f}us {'new':>8}", file=sys.stderr)
+            continue
+        change = stats["median_us"] / old[name]["median_us"] - 1
+        flag = "  REGRESSION" if change > threshold else ""
+        print(
+            f"{name:<52} {old[name]['median_us']:>10.1f}us {stats['median_us']:>10.1f}us {change:>+7.1%}{flag}",
+            file=sys.stderr,
+        )
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", dest="pattern", help="only benchmarks whose name contains this")
+    parser.add_argument("--sizes", default="10,1000,10000,100000", help="commit_change repo sizes in files")
+    parser.add_argument("--min-rounds", type=int, default=3)
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds per benchmark (at least)")
+    parser.add_argument("--save", metavar="NAME", help="save the results as baselines/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="compare with baselines/NAME.json; exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed median slowdown (default: %(default)s)")
+    parser.add_argument("--output", "-o", help="also write the JSON report here")
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="gitops_microbench_"))
+    try:
+        template_repo = _template_repo(root)
+        # Settings (and the template cache) are bound at import.
+        os.environ["TEMPLATE_REPO_MAP_JSON"] = json.dumps({"compute/vms": f"file://{template_repo}"})
+        sizes = [int(s) for s in args.sizes.split(",") if s]
+        wanted = lambda name: not args.pattern or args.pattern in name  # noqa: E731
+        suites = (
+            _render_template(),
+            _settings_maps(),
+            _get_template_dir(template_repo),
+            _commit_change(sizes, root, wanted),
+        )
+        results: Dict[str, Dict[str, Any]] = {}
+        for suite in suites:
+            for name, fn, setup in suite:
+                if not wanted(name):
+                    continue
+                results[name] = measure(fn, setup, min_rounds=args.min_rounds, min_time=args.min_time)
+                print(f"{name:<52} {results[name]['median_us']:>12.1f}us", file=sys.stderr)
+    finally:
+        from gitops_orchestrator.gitops import template_fetcher
+
+        shutil.rmtree(root, ignore_errors=True)
+        for leftover in template_fetcher._CACHE_ROOT.glob("bench-templates-*"):
+            shutil.rmtree(leftover, ignore_errors=True)
+
+    report = {"benchmarks": results}
+    if args.output:
+        write_report(report, args.output)
+    if args.save:
+        BASELINES.mkdir(exist_ok=True)
+        write_report(report, str(BASELINES / f"{args.save}.json"))
+    if args.compare:
+        baseline = json.loads((BASELINES / f"{args.compare}.json").read_text())
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""Helpers shared by the benchmark scripts.
+
+* :func:`throwaway_database` – a scratch database on the local Postgres
+  (``DB_HOST``/``DB_PORT``/``DB_USER``/``DB_PASSWORD``), migrated to head and
+  dropped afterwards.  Enter it *before* importing ``gitops_orchestrator.db``:
+  the engine is bound to ``DB_NAME`` at import time;
+* :func:`summarize` – latency percentiles in milliseconds;
+* :func:`write_report` – stable, diffable JSON plus run metadata.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+async def _admin(sql: str) -> None:
+    import asyncpg
+
+    from gitops_orchestrator.config import AppSettings
+
+    settings = AppSettings()
+    conn = await asyncpg.connect(
+        host=settings.db_host,
+        port=settings.db_port,
+        user=settings.db_user,
+        password=settings.db_password,
+        database="postgres",
+    )
+    try:
+        await conn.execute(sql)
+    finally:
+        await conn.close()
+
+
+@contextmanager
+def throwaway_database(prefix: str = "gitops_bench", *, keep: bool = False) -> Iterator[str]:
+    """Create, migrate and (unless *keep*) drop a scratch database; yield its name.
+
+    Sets ``DB_NAME`` for the rest of the process.  Must be entered outside a
+    running event loop (the Alembic environment runs its own).
+    """
+    from alembic import command
+    from alembic.config import Config
+
+    from gitops_orchestrator.config import get_settings
+
+    name = f"{prefix}_{uuid.uuid4().hex[:8]}"
+    asyncio.run(_admin(f'CREATE DATABASE "{name}"'))
+    previous = os.environ.get("DB_NAME")
+    os.environ["DB_NAME"] = name
+    get_settings.cache_clear()
+    try:
+        config = Config()
+        config.set_main_option("script_location", str(ROOT / "migrations"))
+        command.upgrade(config, "head")
+        yield name
+    finally:
+        if previous is None:
+            os.environ.pop("DB_NAME", None)
+        else:
+            os.environ["DB_NAME"] = previous
+        if keep:
+            print(f"kept database {name}", file=sys.stderr)
+        else:
+            asyncio.run(_admin(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Nearest-rank *q*-th percentile (0–100) of *values*."""
+    ordered = sorted(values)
+    if not ordered:
+        return float("nan")
+    rank = min(max(math.ceil(q / 100 * len(ordered)) - 1, 0), len(ordered) - 1)
+    return ordered[rank]
+
+
+def summarize(seconds: Sequence[float]) -> Dict[str, Any]:
+    """Count and p50/p90/p99/max in milliseconds of *seconds*."""
+    if not seconds:
+        return {"count": 0}
+    return {
+        "count": len(seconds),
+        "p50_ms": round(percentile(seconds, 50) * 1000, 3),
+        "p90_ms": round(percentile(seconds, 90) * 1000, 3),
+        "p99_ms": round(percentile(seconds, 99) * 1000, 3),
+        "max_ms": round(max(seconds) * 1000, 3),
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "describe", "--always", "--dirty"], cwd=ROOT, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def write_report(report: Dict[str, Any], path: Optional[str]) -> None:
+    """Add run metadata to *report* and write it as sorted JSON to *path* (``-``: stdout)."""
+    report = {
+        "meta": {
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "finished_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        **report,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True) + "\n"
+    if not path or path == "-":
+        sys.stdout.write(text)
+    else:
+        Path(path).write_text(text)
+        print(f"wrote {path}", file=sys.stderr)
@@ -0,0 +1,308 @@
+"""Fail when a hot query's plan falls back to a sequential scan.
+
+Creates a throwaway database on the configured Postgres server (``DB_*``
+settings), migrates it with ``alembic upgrade head``, seeds it with a
+realistically skewed data set, builds the rollups, runs ``ANALYZE`` and then ``EXPLAIN``s the
+queries issued by ``routes/`` and the scheduler.  Exits non-zero, listing the
+offending plans, if any of them sequentially scans one of the large tables::
+
+    python dev/check_query_plans.py            # uses DB_HOST/DB_PORT/...
+    python dev/check_query_plans.py --keep     # keep the database afterwards
+
+Run it (e.g. in CI against the compose Postgres) whenever a route query or an
+index in ``models.py`` changes.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Set
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import and_, cast, func, literal, select, text, tuple_  # noqa: E402
+from sqlalchemy.dialects.postgresql import JSONB, JSONPATH  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+from sqlalchemy.sql.expression import ClauseElement, Executable  # noqa: E402
+
+from gitops_orchestrator.callback_queue import Callback, batch_update  # noqa: E402
+from gitops_orchestrator.config import get_settings  # noqa: E402
+from gitops_orchestrator.db.partitions import PARENT_TABLE, is_partition_table  # noqa: E402
+from gitops_orchestrator.db.rollups import rebuild  # noqa: E402
+from gitops_orchestrator.models import (  # noqa: E402
+    Job,
+    JobHistory,
+    JobStatus,
+    Resource,
+    ResourceCategory,
+    Tenant,
+    TenantRollup,
+)
+from gitops_orchestrator.pagination import DEFAULT_PAGE_SIZE, PageParams, encode_cursor, paginate  # noqa: E402
+from gitops_orchestrator.routes.jobs import list_jobs_query  # noqa: E402
+from gitops_orchestrator.routes.resources import list_resources_query  # noqa: E402
+
+# Tables large enough in production that a seq scan is a regression.
+BIG_TABLES = {"tenants", "resources", "jobs", "job_history", "tenant_rollups"}
+
+# Seed sizes; big enough that the planner prefers indexes where they apply.
+TENANTS = 2_000
+RESOURCES = 100_000
+JOBS = 300_000
+HISTORY_PER_JOB = 2
+# Callbacks in the EXPLAINed batch write (the CALLBACK_BATCH_SIZE default).
+CALLBACK_BATCH = 500
+
+
+SEED_SQL = [
+    f"""
+    INSERT INTO tenants (id, name, created_at)
+    SELECT gen_random_uuid(), 'tenant-' || g, now() - g * interval '1 minute'
+    FROM generate_series(1, {TENANTS}) g
+    """,
+    f"""
+    INSERT INTO resources (id, tenant_id, category, name, last_observed_state, created_at, updated_at)
+    SELECT gen_random_uuid(), t.ids[1 + (g % {TENANTS})],
+           (enum_range(NULL::resource_category))[1 + (g % 11)],
+           'res-' || g, jsonb_build_object('image', 'image-' || (g % 50), 'disks', jsonb_build_array(
+               jsonb_build_object('size_gb', g % 500))),
+           now() - g * interval '1 second', now()
+    FROM generate_series(1, {RESOURCES}) g,
+         (SELECT array_agg(id ORDER BY name) AS ids FROM tenants) t
+    """,
+    # ~99% of jobs are finished; the rest are queued or in flight.
+    f"""
+    INSERT INTO jobs (id, tenant_id, resource_id, job_type, category, resource_name, status,
+                      priority, dispatched_at, input_payload, created_at, updated_at)
+    SELECT gen_random_uuid(), r.tenant_id, r.id, 'update', 'compute/vms', r.name,
+           CASE WHEN g % 200 = 0 THEN 'pending'::job_status
+                WHEN g % 200 = 1 THEN 'running'::job_status
+                WHEN g % 10 = 0 THEN 'failed'::job_status
+                ELSE 'succeeded'::job_status END,
+           CASE WHEN g % 3 = 0 THEN 'high' ELSE 'normal' END,
+           CASE WHEN g % 400 = 0 THEN NULL ELSE now() - g * interval '1 second' END,
+           jsonb_build_object('namespace', 'ns-' || (g % 5000)), now() - g * interval '1 second', now()
+    FROM generate_series(1, {JOBS}) g
+    JOIN resources r ON r.name = 'res-' || (1 + g % {RESOURCES})
+    """,
+    f"""
+    INSERT INTO job_history (job_id, status, timestamp)
+    SELECT j.id, 'running', j.created_at + h * interval '1 second'
+    FROM jobs j, generate_series(1, {HISTORY_PER_JOB}) h
+    """,
+]
+
+
+def _jsonb(doc: Any) -> Any:
+    # JSONB / JSONPATH binds have no literal renderer; go through a text literal.
+    return cast(literal(json.dumps(doc)), JSONB)
+
+
+def _queries(
+    tenant_id: uuid.UUID, resource_id: uuid.UUID, job_id: uuid.UUID, batch: List[Callback]
+) -> Dict[str, Any]:
+    """Statements mirroring the route and scheduler queries (first and later pages).
+
+    The list endpoints and the callback batch write are built by the code that
+    issues them; the rest are copies kept in step with ``routes/``.
+    """
+    cursor = (datetime.utcnow() - timedelta(days=1), uuid.UUID(int=0))
+    first_page = PageParams(cursor=None, limit=DEFAULT_PAGE_SIZE)
+    next_page = PageParams(cursor=encode_cursor(*cursor), limit=DEFAULT_PAGE_SIZE)
+    since = datetime.utcnow() - timedelta(hours=1)
+    until = datetime.utcnow() - timedelta(minutes=5)
+    vms = ResourceCategory.compute_vms
+
+    def jobs_page(page: PageParams = first_page, **filters: Any) -> Any:
+        return paginate(list_jobs_query(tenant_id, **filters), Job.created_at, Job.id, page)
+
+    def resources_page(page: PageParams = first_page, **filters: Any) -> Any:
+        return paginate(list_resources_query(tenant_id, vms, **filters), Resource.created_at, Resource.id, page)
+
+    in_flight = (JobStatus.pending, JobStatus.running)
+    queued = and_(Job.dispatched_at.is_(None), Job.status == JobStatus.pending)
+    rank = func.row_number().over(partition_by=(Job.tenant_id, Job.priority), order_by=(Job.created_at, Job.id))
+    heads = (
+        select(Job.id, Job.tenant_id, Job.priority, Job.created_at, rank.label("rank")).where(queued).subquery()
+    )
+    return {
+        "list_tenants": select(Tenant).order_by(Tenant.created_at, Tenant.id).limit(101),
+        "list_tenants (cursor)": select(Tenant)
+        .where(tuple_(Tenant.created_at, Tenant.id) > tuple_(*cursor))
+        .order_by(Tenant.created_at, Tenant.id)
+        .limit(101),
+        "list_resources": resources_page(),
+        "list_resources (cursor)": resources_page(next_page),
+        "list_resources?created_after": resources_page(created_after=since),
+        "list_resources?created_before": resources_page(created_before=until),
+        "list_resources?drifted=true": resources_page(drifted=True),
+        "list_resources?drifted=false": resources_page(drifted=False),
+        "list_jobs": jobs_page(),
+        "list_jobs (cursor)": jobs_page(next_page),
+        "list_jobs?status": jobs_page(status=JobStatus.failed),
+        "list_jobs?created_after": jobs_page(created_after=since),
+        "list_jobs?created_before": jobs_page(created_before=until),
+        "list_jobs?status&created_after": jobs_page(status=JobStatus.failed, created_after=since),
+        "export_resources": select(Resource.id, Resource.name)
+        .where(Resource.tenant_id == tenant_id)
+        .order_by(Resource.created_at, Resource.id),
+        "export_jobs": select(Job.id, Job.status).where(Job.tenant_id == tenant_id).order_by(Job.created_at, Job.id),
+        "metrics rollups": select(TenantRollup).where(
+            TenantRollup.tenant_id == tenant_id, TenantRollup.dimension.in_(("job_status", "job_category"))
+        ),
+        "tenant_metrics queue depth": select(func.count(), func.min(Job.created_at)).where(Job.tenant_id == tenant_id, queued),
+        "tenant_metrics queue wait": select(func.max(Job.dispatched_at - Job.created_at)).where(
+            Job.tenant_id == tenant_id, Job.dispatched_at >= datetime.utcnow() - timedelta(minutes=15)
+        ),
+        "resource jobs": select(Job).where(Job.resource_id == resource_id).order_by(Job.created_at),
+        "job history": select(JobHistory).where(JobHistory.job_id == job_id).order_by(JobHistory.timestamp),
+        "supersede lookup": select(Job).where(
+            Job.id != job_id,
+            Job.tenant_id == tenant_id,
+            Job.category == "compute/vms",
+            Job.resource_name == "res-1",
+            Job.status.in_(in_flight),
+            Job.superseded_by_id.is_(None),
+        ),
+        "search_resources contains": select(Resource)
+        .where(Resource.tenant_id == tenant_id, Resource.last_observed_state.contains(_jsonb({"image": "image-7"})))
+        .order_by(Resource.created_at, Resource.id)
+        .limit(101),
+        "search_resources jsonpath": select(Resource)
+        .where(
+            Resource.tenant_id == tenant_id,
+            Resource.last_observed_state.path_exists(cast(literal("$.disks[*] ? (@.size_gb == 42)"), JSONPATH)),
+        )
+        .order_by(Resource.created_at, Resource.id)
+        .limit(101),
+        "search_jobs contains": select(Job)
+        .where(Job.tenant_id == tenant_id, Job.input_payload.contains(_jsonb({"namespace": "ns-42"})))
+        .order_by(Job.created_at, Job.id)
+        .limit(101),
+        "scheduler in_flight": select(Job.tenant_id, func.count())
+        .where(Job.dispatched_at.is_not(None), Job.status.in_(in_flight))
+        .group_by(Job.tenant_id),
+        "scheduler queued_heads": select(heads).where(heads.c.rank <= 200).order_by(heads.c.created_at),
+        "callback batch update": batch_update(batch, datetime.utcnow()),
+    }
+
+
+def _seq_scans(plan: Dict[str, Any], empty: Set[str] = frozenset()) -> List[str]:
+    """Seq-scanned big tables in *plan*; scanning an *empty* partition is free."""
+    found = []
+    relation = plan.get("Relation Name") or ""
+    if is_partition_table(relation):
+        relation = PARENT_TABLE if relation not in empty else ""
+    if plan.get("Node Type") == "Seq Scan" and relation in BIG_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(_seq_scans(child, empty))
+    return found
+
+
+class _Explain(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON)`` of a statement, sent with its bound parameters.
+
+    Literal rendering loses the types of ``VALUES`` lists (UUIDs and enums
+    would be compared as text), so statements go through the driver as-is.
+    """
+
+    inherit_cache = False
+
+    def __init__(self, statement: Any) -> None:
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element: _Explain, compiler: Any, **kw: Any) -> str:
+    sql = "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+    # The result is the plan, not the rows of an INSERT / UPDATE / DELETE.
+    compiler.isinsert = compiler.isupdate = compiler.isdelete = False
+    return sql
+
+
+async def _explain(conn: AsyncConnection, stmt: Any) -> Dict[str, Any]:
+    raw = (await conn.execute(_Explain(stmt))).scalar()
+    return (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+
+
+async def check(db_url: str, log: Callable[[str], None] = print) -> int:
+    engine = create_async_engine(db_url)
+    try:
+        async with engine.begin() as conn:
+            for sql in SEED_SQL:
+                await conn.execute(text(sql))
+        async with AsyncSession(engine) as db:
+            await rebuild(db)
+            await db.commit()
+        async with engine.begin() as conn:
+            await conn.execute(text("ANALYZE"))
+        async with engine.connect() as conn:
+            tenant_id = (await conn.execute(select(Tenant.id).order_by(Tenant.name).limit(1))).scalar_one()
+            resource_id, job_id = (
+                await conn.execute(select(Job.resource_id, Job.id).where(Job.tenant_id == tenant_id).limit(1))
+            ).one()
+            # A full callback batch spread over many tenants.
+            batch = [
+                Callback(tenant_id=row.tenant_id, job_id=row.id, status=JobStatus.succeeded)
+                for row in await conn.execute(
+                    select(Job.tenant_id, Job.id).where(Job.status == JobStatus.running).limit(CALLBACK_BATCH)
+                )
+            ]
+            # e.g. future job_history partitions, which the seed leaves empty
+            empty = set(
+                (await conn.execute(text("SELECT relname FROM pg_class WHERE relkind = 'r' AND reltuples = 0"))).scalars()
+            )
+            failures = 0
+            for name, stmt in _queries(tenant_id, resource_id, job_id, batch).items():
+                plan = await _explain(conn, stmt)
+                scans = _seq_scans(plan, empty)
+                log(f"{'FAIL' if scans else 'ok  '} {name:<34} cost={plan['Total Cost']:.0f}")
+                if scans:
+                    failures += 1
+                    log(f"     seq scan on {', '.join(sorted(set(scans)))}:")
+                    log(json.dumps(plan, indent=2))
+            return failures
+    finally:
+        await engine.dispose()
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--keep", action="store_true", help="do not drop the throwaway database")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    db_name = f"plan_check_{uuid.uuid4().hex[:8]}"
+    admin = create_async_engine(settings.sqlalchemy_database_uri, isolation_level="AUTOCOMMIT")
+    async with admin.connect() as conn:
+        await conn.execute(text(f'CREATE DATABASE "{db_name}"'))
+    try:
+        subprocess.run(
+            [sys.executable, "-m", "alembic", "upgrade", "head"],
+            cwd=ROOT,
+            env={**os.environ, "DB_NAME": db_name},
+            check=True,
+        )
+        db_url = settings.sqlalchemy_database_uri.rsplit("/", 1)[0] + f"/{db_name}"
+        failures = await check(db_url)
+    finally:
+        if not args.keep:
+            async with admin.connect() as conn:
+                await conn.execute(text(f'DROP DATABASE IF EXISTS "{db_name}"'))
+        await admin.dispose()
+    print(f"{failures} hot quer{'y' if failures == 1 else 'ies'} with sequential scans")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
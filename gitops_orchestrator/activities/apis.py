@@ -13,14 +13,18 @@ logger = logging.getLogger(__name__)
 
 
 @activity.defn
-async def call_external_api(api_name: str, payload: Any) -> Optional[dict]:
+async def call_external_api(api_name: str, payload: Any, category: Optional[str] = None) -> Optional[dict]:
     """Stub activity to call *api_name* with *payload*.
 
-    Replace this stub with real SDK / HTTP calls.
+    Replace this stub with real SDK / HTTP calls.  *category* only labels the
+    latency metrics.
     """
-    logger.info("[API] Pretending to call %s with payload %s", api_name, payload)
-    # Fake response
-    return {"status": "ok", "api": api_name}
+    from ..instrumentation import observe_stage
+
+    with observe_stage("pre_checks" if api_name == "pre_checks" else "external_api", category=category):
+        logger.info("[API] Pretending to call %s with payload %s", api_name, payload)
+        # Fake response
+        return {"status": "ok", "api": api_name}
 
 
 @activity.defn
@@ -32,18 +36,20 @@ async def lookup_tenant_name(tenant_id: str) -> str:  # noqa: D401
     """
     logger.info("[API] Looking up name for tenant %s", tenant_id)
     from ..config import get_settings
+    from ..instrumentation import observe_stage
     import asyncpg
 
     settings = get_settings()
-    conn = await asyncpg.connect(
-        host=settings.db_host,
-        port=settings.db_port,
-        database=settings.db_name,
-        user=settings.db_user,
-        password=settings.db_password,
-    )
-    try:
-        row = await conn.fetchrow("SELECT name FROM tenants WHERE id = $1", tenant_id)
-        return row["name"] if row else tenant_id
-    finally:
-        await conn.close()
+    with observe_stage("tenant_lookup"):
+        conn = await asyncpg.connect(
+            host=settings.db_host,
+            port=settings.db_port,
+            database=settings.db_name,
+            user=settings.db_user,
+            password=settings.db_password,
+        )
+        try:
+            row = await conn.fetchrow("SELECT name FROM tenants WHERE id = $1", tenant_id)
+            return row["name"] if row else tenant_id
+        finally:
+            await conn.close()
@@ -30,12 +30,14 @@ async def render_and_commit(
     logger.info("[GitOps] Rendering %s for repo category %s", template_name, repo_category)
     # Import heavy / env-dependent modules lazily so they run in the activity
     from ..config import get_settings
-    from ..gitops.git_writer import commit_change, format_commit_message
+    from ..gitops.git_writer import MANAGED_COMMIT_PREFIX, commit_change, format_commit_message
+    from ..instrumentation import observe_stage
 
     settings = get_settings()
 
     from ..gitops.templater import render_template
-    manifest = render_template(template_name, context)
+    with observe_stage("render", category=repo_category):
+        manifest = render_template(template_name, context)
 
     repo_url = settings.resource_repo_map.get(repo_category)
     if not repo_url:
@@ -52,7 +54,7 @@ async def render_and_commit(
     strategy = merge_strategy or per_category_strategy or settings.default_git_merge_strategy
 
     commit_msg = format_commit_message(
-        f"GitOps: update {relative_path}",
+        f"{MANAGED_COMMIT_PREFIX}{relative_path}",
         details=f"Template: {template_name}\nResource category: {repo_category}",
     )
 
@@ -64,5 +66,6 @@ async def render_and_commit(
         file_content=manifest,
         commit_message=commit_msg,
         merge_strategy=strategy,
+        category=repo_category,
     )
     return result
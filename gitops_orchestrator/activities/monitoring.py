@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import logging
+import uuid
 from typing import Optional
 
 from temporalio import activity
@@ -11,8 +12,60 @@ logger = logging.getLogger(__name__)
 
 @activity.defn
 async def record_job_status(job_id: str, status: str, message: Optional[str] = None) -> None:  # noqa: D401
-    """Stub to push job status metrics/logs.
+    """Persist *status* for *job_id* and log it.
 
-    Replace with real monitoring/export later.
+    A no-op when the job already has *status* (e.g. a vendor callback recorded
+    it first), so activity retries never duplicate history rows.
     """
     logger.info("[Metrics] job %s -> %s (%s)", job_id, status, message or "")
+    from ..db.job_state import transition_job
+    from ..db.session import async_session
+    from ..models import Job, JobStatus
+
+    try:
+        new_status = JobStatus(status)
+    except ValueError:
+        logger.warning("Ignoring unknown status %r for job %s", status, job_id)
+        return
+
+    async with async_session() as db:
+        job = await db.get(Job, uuid.UUID(job_id))
+        if job is None:
+            logger.warning("Job %s not found; status %s not recorded", job_id, status)
+            return
+        if job.status == new_status:
+            return
+        transition_job(db, job, new_status, message=message)
+        await db.commit()
+
+
+@activity.defn
+async def record_job_superseded(job_id: str, winner_job_id: str) -> None:  # noqa: D401
+    """Mark *job_id* cancelled in favour of the newer job *winner_job_id*."""
+    logger.info("[Metrics] job %s superseded by %s", job_id, winner_job_id)
+    from ..db.job_state import TERMINAL_STATUSES, mark_superseded
+    from ..db.session import async_session
+    from ..models import Job
+
+    async with async_session() as db:
+        job = await db.get(Job, uuid.UUID(job_id))
+        if job is None or job.status in TERMINAL_STATUSES:
+            return
+        mark_superseded(db, job, uuid.UUID(winner_job_id))
+        await db.commit()
+
+
+@activity.defn
+async def poll_job_status(job_id: str) -> Optional[str]:  # noqa: D401
+    """Return the persisted status of *job_id*.
+
+    Fallback for ``JobWorkflow`` while it waits on a callback signal: the
+    callback route writes the status before signalling, so a lost signal is
+    still picked up here.
+    """
+    from ..db.session import async_session
+    from ..models import Job
+
+    async with async_session() as db:
+        job = await db.get(Job, uuid.UUID(job_id))
+        return job.status.value if job else None
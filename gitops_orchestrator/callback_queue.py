@@ -0,0 +1,332 @@
+"""Buffered ingestion of vendor callbacks.
+
+``POST /callbacks/{job_id}`` only validates the payload and enqueues it; the
+vendor gets ``202`` without a DB round trip, or ``429`` while this process's
+queue (``CALLBACK_QUEUE_SIZE``) is full.  One flusher task per API process
+drains the queue in batches of up to ``CALLBACK_BATCH_SIZE`` callbacks,
+waiting at most ``CALLBACK_FLUSH_INTERVAL_SECONDS`` for a batch to fill:
+
+* duplicates within a batch (same job, status and ``external_id`` – vendor
+  retries) are dropped;
+* one transaction per batch: a single ``UPDATE jobs`` joined to the batch's
+  ``VALUES`` list sets the last status of each job, one multi-row ``INSERT``
+  adds a ``job_history`` row per callback, then the rollup deltas and job
+  events of the changed rows are written;
+* callbacks for unknown jobs, or jobs of another tenant, are dropped;
+* after the commit each job's workflow is signalled with its last status.
+
+A failing batch is retried with back-off, then dropped.  Callbacks still
+queued when a process dies are lost (the vendor was already answered);
+``JobWorkflow`` then times out waiting for them.  Shutdown drains the queue.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from prometheus_client import Counter, Gauge
+from sqlalchemy import Update, and_, column, insert, select, update, values
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import get_settings
+from .db.job_events import JobEvent, notify_statement
+from .db.rollups import DIM_JOB_STATUS, RollupDeltas, rollup_upserts
+from .models import Job, JobHistory, JobStatus
+
+logger = logging.getLogger(__name__)
+
+# Back-off between attempts to write a failing batch; dropped after the last.
+_RETRY_DELAYS = (0.5, 2.0, 5.0)
+# How long shutdown waits for queued callbacks to be written.
+_DRAIN_TIMEOUT_SECONDS = 10.0
+
+CALLBACKS = Counter(
+    "gitops_callbacks_total",
+    "Vendor callbacks by outcome (written, duplicate, unknown_job, rejected, failed).",
+    ("outcome",),
+)
+QUEUE_DEPTH = Gauge(
+    "gitops_callback_queue_depth",
+    "Callbacks accepted but not yet written.",
+    multiprocess_mode="livesum",
+)
+
+
+@dataclass
+class Callback:
+    """A validated vendor callback waiting to be written."""
+
+    tenant_id: uuid.UUID
+    job_id: uuid.UUID
+    status: JobStatus
+    external_id: Optional[str] = None
+    metadata: Any = None
+    received_at: datetime = field(default_factory=datetime.utcnow)
+
+    @property
+    def key(self) -> Tuple[uuid.UUID, JobStatus, Optional[str]]:
+        return self.job_id, self.status, self.external_id
+
+
+class CallbackQueueFull(Exception):
+    """The callback queue is full (or shutting down); the vendor should retry."""
+
+
+# -----------------------------------------------------------------------------
+# Batch write
+# -----------------------------------------------------------------------------
+
+
+def batch_update(latest: Iterable[Callback], now: datetime) -> Update:
+    """``UPDATE jobs`` setting each job to the status of its callback in *latest*.
+
+    Returns ``(id, tenant_id, previous, status)`` per job changed; jobs that do
+    not exist or belong to another tenant are left out.
+    """
+    rows = values(
+        column("id", UUID(as_uuid=True)),
+        column("tenant_id", UUID(as_uuid=True)),
+        column("status", Job.__table__.c.status.type),
+        name="v",
+    ).data([(callback.job_id, callback.tenant_id, callback.status) for callback in latest])
+    # Locked in id order so concurrent batches never deadlock; the CTE keeps
+    # the previous status for the rollups and events.
+    locked = (
+        select(Job.id, Job.status.label("previous"), rows.c.status)
+        .join(rows, and_(Job.id == rows.c.id, Job.tenant_id == rows.c.tenant_id))
+        .order_by(Job.id)
+        .with_for_update(of=Job)
+        .cte("locked")
+    )
+    return (
+        update(Job)
+        .where(Job.id == locked.c.id)
+        .values(status=locked.c.status, updated_at=now)
+        .returning(Job.id, Job.tenant_id, locked.c.previous, Job.status)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def write_batch(db: AsyncSession, callbacks: List[Callback]) -> List[Callback]:
+    """Write de-duplicated *callbacks*; return the last one applied to each job.
+
+    Callbacks are applied in list order.  The caller commits.
+    """
+    latest: Dict[uuid.UUID, Callback] = {callback.job_id: callback for callback in callbacks}
+    now = datetime.utcnow()
+    changed = (await db.execute(batch_update(latest.values(), now))).all()
+    if not changed:
+        return []
+
+    known = {row.id for row in changed}
+    await db.execute(
+        insert(JobHistory).values(
+            [
+                {
+                    "job_id": callback.job_id,
+                    "status": callback.status,
+                    "timestamp": callback.received_at,
+                    "message": callback.external_id,
+                    "extra_metadata": callback.metadata,
+                }
+                for callback in callbacks
+                if callback.job_id in known
+            ]
+        )
+    )
+
+    deltas = RollupDeltas()
+    events = []
+    for row in changed:
+        if row.previous == row.status:
+            continue
+        deltas.add(row.tenant_id, DIM_JOB_STATUS, row.previous, -1)
+        deltas.add(row.tenant_id, DIM_JOB_STATUS, row.status, +1)
+        events.append(
+            JobEvent(
+                job_id=str(row.id),
+                tenant_id=str(row.tenant_id),
+                status=row.status.value,
+                previous_status=row.previous.value,
+                message=latest[row.id].external_id,
+                at=now.isoformat(),
+            )
+        )
+    for stmt in rollup_upserts(deltas):
+        await db.execute(stmt)
+    stmt = notify_statement(events)
+    if stmt is not None:
+        await db.execute(stmt)
+    return [latest[row.id] for row in changed]
+
+
+# -----------------------------------------------------------------------------
+# Workflow signals
+# -----------------------------------------------------------------------------
+
+
+async def _signal_workflow(job_id: uuid.UUID, update: Dict[str, Any]) -> None:
+    """Push *update* to the job's running ``JobWorkflow`` (workflow id == job id).
+
+    Failures are logged only: the status is already persisted and the workflow
+    falls back to polling it.
+    """
+    # Lazy import Temporal client and JobWorkflow to avoid sandbox issues
+    from temporalio.client import Client
+    from temporalio.service import RPCError
+    from .workflows.job_workflow import JobWorkflow
+    from .main import get_temporal_client
+
+    try:
+        temporal: Client = await get_temporal_client()
+        await temporal.get_workflow_handle(str(job_id)).signal(JobWorkflow.external_status, update)
+    except (RPCError, RuntimeError) as exc:
+        logger.warning("Could not signal workflow for job %s: %s", job_id, exc)
+
+
+async def signal_workflows(applied: List[Callback]) -> None:
+    """Signal the workflow of each job in *applied* with its new status."""
+    await asyncio.gather(
+        *(
+            _signal_workflow(callback.job_id, {"status": callback.status.value, "external_id": callback.external_id})
+            for callback in applied
+        )
+    )
+
+
+# -----------------------------------------------------------------------------
+# Queue
+# -----------------------------------------------------------------------------
+
+
+class CallbackQueue:
+    """Bounded in-process queue drained in batches by one flusher task."""
+
+    def __init__(self, maxsize: int, batch_size: int, flush_interval: float) -> None:
+        self._queue: asyncio.Queue[Callback] = asyncio.Queue(maxsize)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._task: Optional[asyncio.Task] = None
+        self._signals: Set[asyncio.Task] = set()
+        self._closing = False
+
+    def submit(self, callback: Callback) -> None:
+        """Enqueue *callback*; raise :class:`CallbackQueueFull` if there is no room."""
+        if self._closing:
+            raise CallbackQueueFull("Shutting down")
+        try:
+            self._queue.put_nowait(callback)
+        except asyncio.QueueFull:
+            CALLBACKS.labels("rejected").inc()
+            raise CallbackQueueFull(f"{self._queue.maxsize} callbacks queued") from None
+        QUEUE_DEPTH.inc()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="callback-flusher")
+
+    async def _next_batch(self) -> List[Callback]:
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self._flush_interval
+        while len(batch) < self._batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._flush(batch)
+            except Exception:  # noqa: BLE001 – keep draining
+                logger.exception("Failed to write %d callbacks", len(batch))
+            finally:
+                QUEUE_DEPTH.dec(len(batch))
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: List[Callback]) -> None:
+        from .db.session import async_session
+
+        first: Dict[Tuple[uuid.UUID, JobStatus, Optional[str]], Callback] = {}
+        for callback in batch:
+            first.setdefault(callback.key, callback)
+        unique = list(first.values())
+        CALLBACKS.labels("duplicate").inc(len(batch) - len(unique))
+        for attempt, delay in enumerate((*_RETRY_DELAYS, None), start=1):
+            try:
+                async with async_session() as db:
+                    applied = await write_batch(db, unique)
+                    await db.commit()
+                break
+            except (SQLAlchemyError, OSError) as exc:
+                if delay is None:
+                    CALLBACKS.labels("failed").inc(len(unique))
+                    logger.error("Dropping %d callbacks after %d attempts: %s", len(unique), attempt, exc)
+                    return
+                logger.warning("Writing %d callbacks failed (attempt %d), retrying: %s", len(unique), attempt, exc)
+                await asyncio.sleep(delay)
+
+        known = {callback.job_id for callback in applied}
+        written = sum(callback.job_id in known for callback in unique)
+        CALLBACKS.labels("written").inc(written)
+        if written < len(unique):
+            CALLBACKS.labels("unknown_job").inc(len(unique) - written)
+            logger.warning("Dropped %d callbacks for unknown jobs", len(unique) - written)
+        if applied:
+            # Not awaited: a slow Temporal must not hold up the next batch.
+            task = asyncio.create_task(signal_workflows(applied))
+            self._signals.add(task)
+            task.add_done_callback(self._signals.discard)
+
+    async def close(self) -> None:
+        """Stop accepting callbacks, write the queued ones and finish signalling."""
+        self._closing = True
+        try:
+            await asyncio.wait_for(self._queue.join(), _DRAIN_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.error("Shutting down with %d callbacks not written", self._queue.qsize())
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._signals:
+            await asyncio.gather(*self._signals, return_exceptions=True)
+
+
+_queue: Optional[CallbackQueue] = None
+
+
+def get_queue() -> CallbackQueue:
+    """This process's callback queue (created on first use)."""
+    global _queue  # noqa: PLW0603 – process-wide buffer
+    if _queue is None:
+        settings = get_settings()
+        _queue = CallbackQueue(
+            settings.callback_queue_size, settings.callback_batch_size, settings.callback_flush_interval_seconds
+        )
+    return _queue
+
+
+async def close_queue() -> None:
+    """Drain and close this process's callback queue, if one was started."""
+    global _queue  # noqa: PLW0603
+    if _queue is not None:
+        await _queue.close()
+        _queue = None
@@ -8,8 +8,9 @@ from __future__ import annotations
 
 import json
 import os
+import tempfile
 from functools import lru_cache
-from typing import Dict, Literal, Optional
+from typing import Dict, List, Literal, Optional
 
 from pydantic import Field, ValidationError, computed_field
 from pydantic_settings import BaseSettings
@@ -31,6 +32,37 @@ class AppSettings(BaseSettings):
     db_name: str = Field("gitops_orchestrator", env="DB_NAME")
     db_user: str = Field("postgres", env="DB_USER")
     db_password: str = Field("postgres", env="DB_PASSWORD")
+    # Connection pool, per process and per engine (primary, each replica).
+    db_pool_size: int = Field(10, env="DB_POOL_SIZE")
+    db_max_overflow: int = Field(20, env="DB_MAX_OVERFLOW")
+    db_pool_timeout_seconds: float = Field(30.0, env="DB_POOL_TIMEOUT_SECONDS")
+    # Close connections older than this many seconds on checkout (-1: never).
+    db_pool_recycle_seconds: int = Field(-1, env="DB_POOL_RECYCLE_SECONDS")
+    # Connect through PgBouncer in transaction pooling mode: no prepared
+    # statement caching, unique prepared statement names.
+    db_pgbouncer: bool = Field(False, env="DB_PGBOUNCER")
+    # Raise instead of logging when a request exceeds its route's query
+    # budget or lazy-loads a relationship (``db/accounting.py``); for tests.
+    db_query_budget_strict: bool = Field(False, env="DB_QUERY_BUDGET_STRICT")
+    # Connections per engine opened at start-up, before traffic arrives.
+    warmup_db_connections: int = Field(2, env="WARMUP_DB_CONNECTIONS")
+
+    # ---------------------------------------------------------------------
+    # Read replicas
+    # ---------------------------------------------------------------------
+    # Comma-separated DSNs of streaming replicas that serve the read-only
+    # routes (lists, metrics, search, exports, job polling); plain
+    # ``postgresql://`` DSNs are switched to asyncpg.  Unset: all reads go to
+    # the primary.
+    db_replica_urls: Optional[str] = Field(None, env="DB_REPLICA_URLS")
+    # Replicas further behind than this are skipped; with none left the
+    # primary serves the read.
+    db_replica_max_lag_seconds: float = Field(5.0, env="DB_REPLICA_MAX_LAG_SECONDS")
+    # How long a replica's measured lag is trusted before it is re-checked.
+    db_replica_lag_check_interval_seconds: float = Field(2.0, env="DB_REPLICA_LAG_CHECK_INTERVAL_SECONDS")
+    # After a client submits a job, its reads stay on the primary this long
+    # (read-your-writes cookie).
+    db_read_your_writes_seconds: int = Field(10, env="DB_READ_YOUR_WRITES_SECONDS")
 
     # ---------------------------------------------------------------------
     # Temporal
@@ -39,6 +71,136 @@ class AppSettings(BaseSettings):
     temporal_port: int = Field(7233, env="TEMPORAL_PORT")
     temporal_namespace: str = Field("default", env="TEMPORAL_NAMESPACE")
     temporal_task_queue: str = Field("gitops-jobs", env="TEMPORAL_TASK_QUEUE")
+    # Activities are routed to dedicated queues per class so slow git work
+    # never starves millisecond-scale lookups / status bookkeeping.
+    temporal_git_task_queue: str = Field("gitops-jobs-git", env="TEMPORAL_GIT_TASK_QUEUE")
+    temporal_api_task_queue: str = Field("gitops-jobs-api", env="TEMPORAL_API_TASK_QUEUE")
+    temporal_bookkeeping_task_queue: str = Field(
+        "gitops-jobs-bookkeeping", env="TEMPORAL_BOOKKEEPING_TASK_QUEUE"
+    )
+
+    # ---------------------------------------------------------------------
+    # Temporal worker pools
+    # ---------------------------------------------------------------------
+    # Comma-separated pools this worker process runs: any of
+    # "workflow", "git", "api", "bookkeeping".  Run e.g. WORKER_POOLS=git on
+    # dedicated containers to scale git capacity independently.
+    worker_pools: str = Field("workflow,git,api,bookkeeping", env="WORKER_POOLS")
+    worker_max_concurrent_workflow_tasks: int = Field(100, env="WORKER_MAX_CONCURRENT_WORKFLOW_TASKS")
+    worker_git_max_concurrent_activities: int = Field(4, env="WORKER_GIT_MAX_CONCURRENT_ACTIVITIES")
+    worker_api_max_concurrent_activities: int = Field(100, env="WORKER_API_MAX_CONCURRENT_ACTIVITIES")
+    worker_bookkeeping_max_concurrent_activities: int = Field(
+        200, env="WORKER_BOOKKEEPING_MAX_CONCURRENT_ACTIVITIES"
+    )
+    # Seconds in-flight activities get to finish after SIGTERM before the
+    # worker cancels them.
+    worker_graceful_shutdown_seconds: int = Field(30, env="WORKER_GRACEFUL_SHUTDOWN_SECONDS")
+
+    # ---------------------------------------------------------------------
+    # Multi-process worker supervisor
+    # ---------------------------------------------------------------------
+    # Number of worker processes started by ``worker_supervisor``; 0 means
+    # one per CPU core.
+    worker_processes: int = Field(0, env="WORKER_PROCESSES")
+    # Set by the supervisor for each child; used as a log / metrics label.
+    worker_process_index: int = Field(0, env="WORKER_PROCESS_INDEX")
+    # Base port for the Temporal SDK Prometheus exporter (disabled if unset);
+    # each worker process binds ``port + worker_process_index``.
+    temporal_metrics_port: Optional[int] = Field(None, env="TEMPORAL_METRICS_PORT")
+    # Base port for the worker's own Prometheus endpoint (stage latency
+    # histograms; disabled if unset), bound as ``port + worker_process_index``.
+    worker_metrics_port: Optional[int] = Field(None, env="WORKER_METRICS_PORT")
+
+    # ---------------------------------------------------------------------
+    # Tracing (OpenTelemetry, see ``tracing.py``)
+    # ---------------------------------------------------------------------
+    # "file", "otlp" or "console"; unset disables tracing.  ``otlp`` reads
+    # the standard ``OTEL_EXPORTER_OTLP_*`` variables.
+    tracing_exporter: Optional[str] = Field(None, env="TRACING_EXPORTER")
+    # JSON-lines span file of the ``file`` exporter (shared by all processes).
+    tracing_file: str = Field("traces.jsonl", env="TRACING_FILE")
+
+    # ---------------------------------------------------------------------
+    # Job status streaming (SSE, see ``db/job_events.py``)
+    # ---------------------------------------------------------------------
+    # DSN of the per-process LISTEN connection.  LISTEN does not work through
+    # PgBouncer in transaction pooling mode, so with ``DB_PGBOUNCER`` point
+    # this at Postgres directly.  Unset: the primary's DSN.
+    job_events_database_url: Optional[str] = Field(None, env="JOB_EVENTS_DATABASE_URL")
+    # Seconds between keepalive comments on idle streams (proxies close
+    # silent connections).
+    job_events_keepalive_seconds: float = Field(15.0, env="JOB_EVENTS_KEEPALIVE_SECONDS")
+    # Events buffered per stream; a client falling further behind gets a
+    # ``resync`` event and is disconnected.
+    job_events_subscriber_queue_size: int = Field(256, env="JOB_EVENTS_SUBSCRIBER_QUEUE_SIZE")
+
+    # ---------------------------------------------------------------------
+    # Job completion (vendor callbacks)
+    # ---------------------------------------------------------------------
+    # How long ``JobWorkflow`` waits for a callback signal before failing the
+    # job, and how often it falls back to polling the DB while waiting (covers
+    # callbacks whose signal was lost, e.g. Temporal briefly unreachable).
+    callback_wait_timeout_seconds: int = Field(3600, env="CALLBACK_WAIT_TIMEOUT_SECONDS")
+    callback_poll_interval_seconds: int = Field(300, env="CALLBACK_POLL_INTERVAL_SECONDS")
+    # Callbacks are acknowledged at once and written in batches by each API
+    # process (``callback_queue.py``): queue capacity (full: 429), most
+    # callbacks per batch (≤ 6000: 5 bind parameters per history row) and
+    # how long a batch waits to fill up.
+    callback_queue_size: int = Field(10000, env="CALLBACK_QUEUE_SIZE")
+    callback_batch_size: int = Field(500, env="CALLBACK_BATCH_SIZE")
+    callback_flush_interval_seconds: float = Field(0.05, env="CALLBACK_FLUSH_INTERVAL_SECONDS")
+
+    # ---------------------------------------------------------------------
+    # job_history partitions (``python -m gitops_orchestrator.db.partitions``)
+    # ---------------------------------------------------------------------
+    # Monthly partitions are created this many months ahead.
+    job_history_partition_months_ahead: int = Field(3, env="JOB_HISTORY_PARTITION_MONTHS_AHEAD")
+    # Full months of history kept besides the current one; older partitions
+    # are archived and dropped.  0 keeps everything.
+    job_history_retention_months: int = Field(12, env="JOB_HISTORY_RETENTION_MONTHS")
+    # Where archived partitions (gzipped CSV) go: a local directory or
+    # ``s3://bucket/prefix`` (requires boto3; credentials from the usual AWS
+    # environment), with an optional endpoint for S3-compatible stores.
+    job_history_archive_uri: str = Field("./archive/job_history", env="JOB_HISTORY_ARCHIVE_URI")
+    job_history_archive_s3_endpoint_url: Optional[str] = Field(None, env="JOB_HISTORY_ARCHIVE_S3_ENDPOINT_URL")
+
+    # ---------------------------------------------------------------------
+    # Git drift reconciler (``python -m gitops_orchestrator.reconciler``)
+    # ---------------------------------------------------------------------
+    # Seconds between rounds; a round fetches every resource repo and re-reads
+    # the manifests changed since the commit reconciled last.
+    reconciler_interval_seconds: float = Field(60.0, env="RECONCILER_INTERVAL_SECONDS")
+    # Branch reconciled, i.e. the one the orchestrator commits to.
+    reconciler_branch: str = Field("main", env="RECONCILER_BRANCH")
+    # Bare mirrors of the resource repos; on a persistent volume restarts
+    # only fetch new commits instead of cloning again.
+    reconciler_mirror_dir: str = Field(
+        os.path.join(tempfile.gettempdir(), "gitops_mirrors"), env="RECONCILER_MIRROR_DIR"
+    )
+
+    # ---------------------------------------------------------------------
+    # Tenant-fair job scheduling
+    # ---------------------------------------------------------------------
+    # When enabled, ``_start_job`` only queues jobs and the scheduler process
+    # (``python -m gitops_orchestrator.scheduler``) starts workflows using
+    # weighted fair queuing across tenants.
+    scheduler_enabled: bool = Field(False, env="SCHEDULER_ENABLED")
+    scheduler_poll_interval_seconds: float = Field(1.0, env="SCHEDULER_POLL_INTERVAL_SECONDS")
+    # Global cap on dispatched-but-unfinished jobs, and the default per tenant.
+    scheduler_max_in_flight: int = Field(200, env="SCHEDULER_MAX_IN_FLIGHT")
+    scheduler_tenant_max_in_flight: int = Field(20, env="SCHEDULER_TENANT_MAX_IN_FLIGHT")
+    # JSON mapping of tenant id ➜ {"weight": float, "max_in_flight": int}
+    # Example: '{"804864ec-71cd-49a1-9c50-12f7ef11e627": {"weight": 4, "max_in_flight": 50}}'
+    scheduler_tenant_overrides_json: Optional[str] = Field(None, env="SCHEDULER_TENANT_OVERRIDES_JSON")
+    # JSON mapping of priority class ➜ weight multiplier.  A tenant's share of
+    # dispatch slots is tenant weight × weight of its most urgent queued class.
+    scheduler_priority_classes_json: str = Field(
+        '{"high": 4, "normal": 1, "low": 0.25}', env="SCHEDULER_PRIORITY_CLASSES_JSON"
+    )
+    scheduler_default_priority: str = Field("normal", env="SCHEDULER_DEFAULT_PRIORITY")
+    # Port of the scheduler's Prometheus endpoint (queue wait histogram);
+    # disabled if unset.
+    scheduler_metrics_port: Optional[int] = Field(None, env="SCHEDULER_METRICS_PORT")
 
     # ---------------------------------------------------------------------
     # Git / GitHub
@@ -106,6 +268,19 @@ class AppSettings(BaseSettings):
             f"@{self.db_host}:{self.db_port}/{self.db_name}"
         )
 
+    @computed_field  # type: ignore[misc]
+    @property
+    def sqlalchemy_replica_uris(self) -> List[str]:
+        """Return the async SQLAlchemy URIs of the configured read replicas."""
+        uris = []
+        for dsn in (self.db_replica_urls or "").split(","):
+            dsn = dsn.strip()
+            if dsn.startswith(("postgres://", "postgresql://")):
+                dsn = "postgresql+asyncpg://" + dsn.split("://", 1)[1]
+            if dsn:
+                uris.append(dsn)
+        return uris
+
     @computed_field  # type: ignore[misc]
     @property
     def resource_repo_map(self) -> Dict[str, str]:
@@ -138,6 +313,31 @@ class AppSettings(BaseSettings):
                 }
             ]) from exc
 
+    @computed_field  # type: ignore[misc]
+    @property
+    def scheduler_tenant_overrides(self) -> Dict[str, Dict[str, float]]:
+        """Parse :pyattr:`scheduler_tenant_overrides_json` into a real dict."""
+        return _load_json_map(self.scheduler_tenant_overrides_json, "SCHEDULER_TENANT_OVERRIDES_JSON")
+
+    @computed_field  # type: ignore[misc]
+    @property
+    def scheduler_priority_classes(self) -> Dict[str, float]:
+        """Parse :pyattr:`scheduler_priority_classes_json` into a real dict."""
+        return _load_json_map(self.scheduler_priority_classes_json, "SCHEDULER_PRIORITY_CLASSES_JSON")
+
+
+def _load_json_map(raw: Optional[str], env_name: str) -> Dict[str, object]:
+    """Decode an optional JSON object setting; ``{}`` when unset."""
+    if not raw:
+        return {}
+    try:
+        value = json.loads(raw)
+    except (TypeError, json.JSONDecodeError) as exc:
+        raise ValueError(f"Invalid JSON for {env_name}") from exc
+    if not isinstance(value, dict):
+        raise ValueError(f"{env_name} must be a JSON object")
+    return value
+
 
 @lru_cache()
 def get_settings() -> AppSettings:
@@ -0,0 +1,229 @@
+"""Per-request DB query accounting, query budgets and lazy-load detection.
+
+Every statement executed while serving an HTTP request – on any engine,
+streamed exports included – is counted and timed by
+:class:`QueryAccountingMiddleware`:
+
+* the response carries ``X-DB-Queries`` and ``X-DB-Time-Ms`` (statements
+  issued before the response started; streamed bodies add theirs later);
+* requests above their route's entry in :data:`ROUTE_QUERY_BUDGETS`, or that
+  lazy-loaded a relationship, are logged with ``db_queries``, ``db_time_ms``
+  and ``route`` log fields;
+* with ``DB_QUERY_BUDGET_STRICT=true`` (tests, CI) they raise
+  :class:`QueryBudgetExceeded` / :class:`LazyLoadError` instead, and so does a
+  route without a budget (:func:`check_budgets` at start-up).
+
+Budgets count round trips (``BEGIN`` / ``COMMIT`` are not statements) on the
+worst path a route can take, e.g. a replica miss falling back to the
+primary; a replica lag probe may add one.
+"""
+from __future__ import annotations
+
+import contextvars
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from ..config import get_settings
+
+__all__ = [
+    "QUERIES_HEADER",
+    "DB_TIME_HEADER",
+    "ROUTE_QUERY_BUDGETS",
+    "QueryStats",
+    "QueryBudgetExceeded",
+    "LazyLoadError",
+    "current_stats",
+    "install",
+    "check_budgets",
+    "QueryAccountingMiddleware",
+]
+
+logger = logging.getLogger(__name__)
+
+QUERIES_HEADER = "X-DB-Queries"
+DB_TIME_HEADER = "X-DB-Time-Ms"
+
+_API = "/api/v1/tenants"
+
+# "METHOD route template" ➜ most statements one request may issue.
+ROUTE_QUERY_BUDGETS: Dict[str, int] = {
+    "GET /healthz": 0,
+    "GET /readyz": 0,
+    "GET /metrics": 0,
+    # tenants
+    "POST /api/v1/tenants": 1,  # INSERT
+    "GET /api/v1/tenants": 1,
+    "GET /api/v1/tenants/{tenant_id}": 2,  # replica miss ➜ primary
+    # resources: idempotency lookup, INSERT job + rollups + NOTIFY, supersede
+    # lock + lookup, superseded queued jobs (UPDATE, history, rollups, NOTIFY)
+    f"POST {_API}/{{tenant_id}}/resources/{{category:path}}": 11,
+    f"GET {_API}/{{tenant_id}}/resources/{{category:path}}": 1,
+    f"GET {_API}/{{tenant_id}}/resources/{{category:path}}/{{resource_id}}": 2,
+    f"GET {_API}/{{tenant_id}}/resources/summary": 1,
+    # jobs
+    f"GET {_API}/{{tenant_id}}/jobs": 1,
+    f"GET {_API}/{{tenant_id}}/jobs/{{job_id}}": 2,
+    f"POST {_API}/{{tenant_id}}/jobs/{{job_id}}/retry": 5,  # get, UPDATE, history, rollups, NOTIFY
+    # status streams (statements before the stream starts): snapshot get
+    f"GET {_API}/{{tenant_id}}/jobs/events": 0,
+    f"GET {_API}/{{tenant_id}}/jobs/{{job_id}}/events": 1,
+    # callbacks: queued, written in batches (``callback_queue.py``)
+    f"POST {_API}/{{tenant_id}}/callbacks/{{job_id}}": 0,
+    # metrics, search, exports
+    f"GET {_API}/{{tenant_id}}/metrics": 3,
+    f"GET {_API}/{{tenant_id}}/search/resources": 1,
+    f"GET {_API}/{{tenant_id}}/search/jobs": 1,
+    f"GET {_API}/{{tenant_id}}/export/resources": 1,
+    f"GET {_API}/{{tenant_id}}/export/jobs": 1,
+}
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """A request issued more statements than its route's budget (strict mode)."""
+
+
+class LazyLoadError(RuntimeError):
+    """A request lazy-loaded a relationship (strict mode)."""
+
+
+@dataclass
+class QueryStats:
+    """Statements and DB time of the request being served."""
+
+    queries: int = 0
+    seconds: float = 0.0
+    lazy_loads: List[str] = field(default_factory=list)
+
+
+_current: contextvars.ContextVar[Optional[QueryStats]] = contextvars.ContextVar("db_query_stats", default=None)
+
+
+def current_stats() -> Optional[QueryStats]:
+    """Stats of the request being served, ``None`` outside one."""
+    return _current.get()
+
+
+# -----------------------------------------------------------------------------
+# Hooks
+# -----------------------------------------------------------------------------
+
+
+def _before_cursor_execute(conn: Any, *_: Any) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn: Any, *_: Any) -> None:
+    stats = _current.get()
+    started = conn.info.get("query_started")
+    if stats is not None and started:
+        stats.queries += 1
+        stats.seconds += time.perf_counter() - started.pop()
+
+
+def _on_orm_execute(state: ORMExecuteState) -> None:
+    stats = _current.get()
+    if stats is None or not state.is_select or state.lazy_loaded_from is None:
+        return
+    mapper = state.lazy_loaded_from.mapper.class_.__name__
+    relationship = getattr(state.loader_strategy_path, "prop", None)
+    attribute = f"{mapper}.{relationship.key}" if relationship is not None else mapper
+    stats.lazy_loads.append(attribute)
+    if get_settings().db_query_budget_strict:
+        raise LazyLoadError(f"Lazy load of {attribute}; load it in the route's query instead")
+
+
+def install(engines: Iterable[AsyncEngine]) -> None:
+    """Count the statements of *engines*; watch ORM sessions for lazy loads."""
+    for engine in engines:
+        if not event.contains(engine.sync_engine, "before_cursor_execute", _before_cursor_execute):
+            event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    if not event.contains(Session, "do_orm_execute", _on_orm_execute):
+        event.listen(Session, "do_orm_execute", _on_orm_execute)
+
+
+def check_budgets(routes: Iterable[Any]) -> List[str]:
+    """Return the API routes lacking a budget; raise in strict mode.
+
+    FastAPI's own documentation routes are not checked.
+    """
+    from fastapi.routing import APIRoute
+
+    missing = [
+        f"{method} {route.path}"
+        for route in routes
+        if isinstance(route, APIRoute)
+        for method in sorted(route.methods)
+        if f"{method} {route.path}" not in ROUTE_QUERY_BUDGETS
+    ]
+    if missing and get_settings().db_query_budget_strict:
+        raise QueryBudgetExceeded(f"Routes without a query budget: {', '.join(missing)}")
+    for route in missing:
+        logger.warning("Route %s has no query budget in db/accounting.py", route)
+    return missing
+
+
+# -----------------------------------------------------------------------------
+# Middleware
+# -----------------------------------------------------------------------------
+
+
+class QueryAccountingMiddleware:
+    """Pure ASGI middleware reporting and enforcing per-request DB usage."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (QUERIES_HEADER.encode(), str(stats.queries).encode()),
+                    (DB_TIME_HEADER.encode(), f"{stats.seconds * 1000:.2f}".encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+        self._check(scope, stats)
+
+    @staticmethod
+    def _check(scope: Dict[str, Any], stats: QueryStats) -> None:
+        route = getattr(scope.get("route"), "path", None)
+        if route is None:
+            return  # unmatched (404 / 405)
+        key = f"{scope['method']} {route}"
+        budget = ROUTE_QUERY_BUDGETS.get(key)
+        over = budget is not None and stats.queries > budget
+        if not over and not stats.lazy_loads:
+            return
+        fields = {
+            "route": key,
+            "db_queries": stats.queries,
+            "db_query_budget": budget,
+            "db_time_ms": round(stats.seconds * 1000, 2),
+            "db_lazy_loads": stats.lazy_loads,
+        }
+        if over and get_settings().db_query_budget_strict:
+            raise QueryBudgetExceeded(f"{key} issued {stats.queries} statements (budget {budget})")
+        logger.warning(
+            "%s issued %d statements (budget %s, %d lazy loads)",
+            key, stats.queries, budget, len(stats.lazy_loads), extra=fields,
+        )
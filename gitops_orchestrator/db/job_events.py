@@ -0,0 +1,330 @@
+"""Job status events: Postgres NOTIFY on write, in-process fan-out on read.
+
+Writers: an ORM ``after_flush`` hook turns every new :class:`Job` and every
+status change into a ``NOTIFY job_status`` issued on the flush's connection,
+so events are delivered exactly when (and only if) the write commits.  Code
+changing ``jobs.status`` with Core DML must execute :func:`notify_statement`
+for its events itself.
+
+Readers: each API process keeps a single LISTEN connection
+(:class:`JobEventHub`) and fans every notification out to the in-process
+subscriptions of that job or tenant – the SSE streams in
+:mod:`gitops_orchestrator.routes.events`.  A subscriber that falls behind by
+more than ``JOB_EVENTS_SUBSCRIBER_QUEUE_SIZE`` events, or is subscribed while
+the LISTEN connection drops, is closed with :class:`SubscriptionLost` and is
+expected to reconnect and re-read the current state.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import uuid
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from prometheus_client import Counter, Gauge
+from sqlalchemy import bindparam, inspect, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.types import Text
+
+from ..config import get_settings
+from ..models import Job, JobHistory
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "job_status"
+
+# NOTIFY payloads are limited to 8000 bytes; messages are cut well below.
+_MAX_MESSAGE_LENGTH = 500
+
+# Back-off between LISTEN reconnect attempts, and how often an idle LISTEN
+# connection is probed (catches half-open TCP connections).
+_RECONNECT_DELAYS = (0.5, 1.0, 2.0, 5.0, 10.0)
+_HEALTH_CHECK_SECONDS = 30.0
+_READY_TIMEOUT_SECONDS = 10.0
+
+SUBSCRIBERS = Gauge(
+    "gitops_job_event_subscribers",
+    "Open job status streams.",
+    multiprocess_mode="livesum",
+)
+SUBSCRIBERS_LOST = Counter(
+    "gitops_job_event_subscribers_lost_total",
+    "Job status streams closed because events were lost.",
+    ("reason",),
+)
+
+_NOTIFY_SQL = text(
+    f"SELECT pg_notify('{CHANNEL}', payload) FROM unnest(CAST(:payloads AS text[])) AS payload"
+).bindparams(bindparam("payloads", type_=ARRAY(Text)))
+
+
+@dataclass
+class JobEvent:
+    """A job's status as of a committed write."""
+
+    job_id: str
+    tenant_id: str
+    status: str
+    previous_status: Optional[str] = None
+    message: Optional[str] = None
+    at: Optional[str] = None
+
+    @classmethod
+    def from_payload(cls, payload: str) -> "JobEvent":
+        return cls(**json.loads(payload))
+
+    def payload(self) -> str:
+        return json.dumps(asdict(self), separators=(",", ":"))
+
+
+def _value(status: Any) -> Optional[str]:
+    return getattr(status, "value", status)
+
+
+def job_event(job: Job, previous_status: Any = None, message: Optional[str] = None) -> JobEvent:
+    """Return the event describing *job*'s current status."""
+    return JobEvent(
+        job_id=str(job.id),
+        tenant_id=str(job.tenant_id),
+        status=_value(job.status),
+        previous_status=_value(previous_status),
+        message=message[:_MAX_MESSAGE_LENGTH] if message else None,
+        at=(job.updated_at or datetime.utcnow()).isoformat(),
+    )
+
+
+def notify_statement(events: List[JobEvent]) -> Optional[TextClause]:
+    """Return one statement publishing *events* (``None`` if there are none).
+
+    Postgres queues the notifications until the transaction commits and drops
+    them on rollback.
+    """
+    if not events:
+        return None
+    return _NOTIFY_SQL.params(payloads=[event.payload() for event in events])
+
+
+def collect_events(session: Session) -> List[JobEvent]:
+    """Return the job events of the changes *session* is flushing."""
+    messages = {obj.job_id: obj.message for obj in session.new if isinstance(obj, JobHistory)}
+    events = []
+    for obj in session.new:
+        if isinstance(obj, Job):
+            events.append(job_event(obj, message=messages.get(obj.id)))
+    for obj in session.dirty:
+        if isinstance(obj, Job):
+            history = inspect(obj).attrs["status"].history
+            if history.added:
+                previous = history.deleted[0] if history.deleted else None
+                events.append(job_event(obj, previous, messages.get(obj.id)))
+    return events
+
+
+def notify_flush_events(session: Session) -> None:
+    """Publish the job events of the changes *session* is flushing.
+
+    Runs from the ``after_flush`` hook in :mod:`gitops_orchestrator.models`,
+    next to the rollup upserts; flushes without job changes issue nothing.
+    """
+    stmt = notify_statement(collect_events(session))
+    if stmt is not None:
+        session.connection().execute(stmt)
+
+
+# -----------------------------------------------------------------------------
+# Fan-out
+# -----------------------------------------------------------------------------
+
+
+class SubscriptionLost(Exception):
+    """Events for a subscription were dropped; re-read the state and resubscribe."""
+
+
+class Subscription:
+    """Bounded queue of the events of one job, or of all jobs of one tenant."""
+
+    def __init__(self, tenant_id: uuid.UUID, job_id: Optional[uuid.UUID], maxsize: int) -> None:
+        self.tenant_id = str(tenant_id)
+        self.job_id = str(job_id) if job_id is not None else None
+        self._queue: asyncio.Queue[Optional[JobEvent]] = asyncio.Queue(maxsize)
+        self.lost: Optional[str] = None
+
+    def _put(self, event: JobEvent) -> bool:
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    def _close(self, reason: str) -> None:
+        self.lost = reason
+        try:
+            self._queue.put_nowait(None)  # wake a waiting reader
+        except asyncio.QueueFull:
+            pass  # the reader drains the queue and then sees ``lost``
+
+    async def next(self, timeout: float) -> Optional[JobEvent]:
+        """Return the next event, ``None`` if none arrived within *timeout* seconds.
+
+        Raises :class:`SubscriptionLost` once the buffered events are consumed
+        after events were dropped.
+        """
+        if self.lost and self._queue.empty():
+            raise SubscriptionLost(self.lost)
+        try:
+            event = await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if event is None:
+            raise SubscriptionLost(self.lost)
+        return event
+
+
+class JobEventHub:
+    """One LISTEN connection per process, fanned out to many subscriptions.
+
+    The connection is opened by the first :meth:`subscribe` and re-opened with
+    back-off when it drops; subscriptions open at that moment are closed since
+    their events may have been missed.
+    """
+
+    def __init__(self, dsn: str, queue_size: int) -> None:
+        self._dsn = dsn
+        self._queue_size = queue_size
+        self._by_job: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._by_tenant: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def subscribe(self, tenant_id: uuid.UUID, job_id: Optional[uuid.UUID] = None) -> Subscription:
+        """Subscribe to one job's events, or (``job_id=None``) to the tenant's.
+
+        Returns once the LISTEN connection is up, so every write committed
+        after this call is delivered.  Raises :class:`ConnectionError` if it
+        cannot be established.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="job-events-listener")
+        try:
+            await asyncio.wait_for(self._ready.wait(), _READY_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError as exc:
+            raise ConnectionError("Job event listener is not connected") from exc
+        subscription = Subscription(tenant_id, job_id, self._queue_size)
+        if subscription.job_id is not None:
+            self._by_job[subscription.job_id].add(subscription)
+        else:
+            self._by_tenant[subscription.tenant_id].add(subscription)
+        SUBSCRIBERS.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        key, index = (
+            (subscription.job_id, self._by_job)
+            if subscription.job_id is not None
+            else (subscription.tenant_id, self._by_tenant)
+        )
+        subscribers = index.get(key)
+        if subscribers is None or subscription not in subscribers:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del index[key]
+        SUBSCRIBERS.dec()
+
+    def publish(self, event: JobEvent) -> None:
+        """Deliver *event* to the subscriptions of its job and tenant."""
+        targets = [*self._by_job.get(event.job_id, ()), *self._by_tenant.get(event.tenant_id, ())]
+        for subscription in targets:
+            if subscription.tenant_id == event.tenant_id and not subscription._put(event):
+                self._drop(subscription, "slow_consumer")
+
+    def _drop(self, subscription: Subscription, reason: str) -> None:
+        self.unsubscribe(subscription)
+        subscription._close(reason)
+        SUBSCRIBERS_LOST.labels(reason).inc()
+
+    def _drop_all(self, reason: str) -> None:
+        for index in (self._by_job, self._by_tenant):
+            for subscribers in list(index.values()):
+                for subscription in list(subscribers):
+                    self._drop(subscription, reason)
+
+    def _on_notify(self, _conn: Any, _pid: int, _channel: str, payload: str) -> None:
+        try:
+            event = JobEvent.from_payload(payload)
+        except (TypeError, ValueError):
+            logger.warning("Ignoring malformed %s notification: %.200s", CHANNEL, payload)
+            return
+        self.publish(event)
+
+    async def _run(self) -> None:
+        import asyncpg
+
+        attempt = 0
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(self._dsn)
+                closed = asyncio.Event()
+                conn.add_termination_listener(lambda _: closed.set())
+                await conn.add_listener(CHANNEL, self._on_notify)
+                self._ready.set()
+                if attempt:
+                    logger.info("Job event listener reconnected")
+                attempt = 0
+                while not closed.is_set():
+                    try:
+                        await asyncio.wait_for(closed.wait(), _HEALTH_CHECK_SECONDS)
+                    except asyncio.TimeoutError:
+                        await asyncio.wait_for(conn.execute("SELECT 1"), _HEALTH_CHECK_SECONDS)
+                raise ConnectionError("LISTEN connection closed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001 – reconnect on any failure
+                logger.warning("Job event listener disconnected: %s", exc)
+            finally:
+                self._ready.clear()
+                if conn is not None and not conn.is_closed():
+                    conn.terminate()
+            self._drop_all("listener_reconnect")
+            await asyncio.sleep(_RECONNECT_DELAYS[min(attempt, len(_RECONNECT_DELAYS) - 1)])
+            attempt += 1
+
+    async def close(self) -> None:
+        """Stop listening and end every open subscription."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._drop_all("shutdown")
+
+
+_hub: Optional[JobEventHub] = None
+
+
+def get_hub() -> JobEventHub:
+    """This process's hub (created on first use)."""
+    global _hub  # noqa: PLW0603 – process-wide listener
+    if _hub is None:
+        settings = get_settings()
+        dsn = settings.job_events_database_url or settings.sqlalchemy_database_uri
+        dsn = dsn.replace("postgresql+asyncpg://", "postgresql://", 1)
+        _hub = JobEventHub(dsn, settings.job_events_subscriber_queue_size)
+    return _hub
+
+
+async def close_hub() -> None:
+    """Close this process's hub, if one was started."""
+    global _hub  # noqa: PLW0603
+    if _hub is not None:
+        await _hub.close()
+        _hub = None
@@ -0,0 +1,48 @@
+"""Helpers for persisting job status transitions.
+
+Every status change (workflow bookkeeping, retries) goes through
+:func:`transition_job` so the ``jobs`` row and its ``job_history`` entry are
+always written together.  Vendor callbacks are written in batches by
+:func:`gitops_orchestrator.callback_queue.write_batch`, which does the same
+with Core statements.
+"""
+from __future__ import annotations
+
+import uuid
+from typing import Any, Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import Job, JobHistory, JobStatus
+
+TERMINAL_STATUSES = frozenset({JobStatus.succeeded, JobStatus.failed, JobStatus.cancelled})
+
+
+def transition_job(
+    db: AsyncSession,
+    job: Job,
+    status: JobStatus,
+    *,
+    message: Optional[str] = None,
+    extra_metadata: Optional[Dict[str, Any]] = None,
+) -> JobHistory:
+    """Set *job* to *status* and stage the matching :class:`JobHistory` row.
+
+    The caller owns the transaction; nothing is flushed or committed here.
+    """
+    job.status = status
+    history = JobHistory(job_id=job.id, status=status, message=message, extra_metadata=extra_metadata)
+    db.add(history)
+    return history
+
+
+def mark_superseded(db: AsyncSession, job: Job, winner_id: uuid.UUID) -> JobHistory:
+    """Cancel *job* in favour of the newer job *winner_id* for the same resource."""
+    job.superseded_by_id = winner_id
+    return transition_job(
+        db,
+        job,
+        JobStatus.cancelled,
+        message=f"Superseded by job {winner_id}",
+        extra_metadata={"superseded_by": str(winner_id)},
+    )
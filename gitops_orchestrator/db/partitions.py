@@ -0,0 +1,236 @@
+"""Monthly partitions of ``job_history``: creation, retention and archival.
+
+``job_history`` is range-partitioned on ``timestamp`` into one partition per
+calendar month (``job_history_p202610`` holds October 2026), plus
+``job_history_default`` catching rows outside every partition so a late
+maintenance run never fails a status transition.  Queries on the parent see
+all partitions; filters on ``timestamp`` prune the others.
+
+``maintain`` – run daily, e.g. from cron::
+
+    python -m gitops_orchestrator.db.partitions maintain [--skip-archive]
+
+1. creates the partitions up to ``JOB_HISTORY_PARTITION_MONTHS_AHEAD`` months
+   ahead (rows that already landed in the default partition are moved in);
+2. detaches partitions older than ``JOB_HISTORY_RETENTION_MONTHS``, streams
+   each to ``<partition>.csv.gz`` under ``JOB_HISTORY_ARCHIVE_URI`` (a local
+   directory or ``s3://bucket/prefix``) and drops it.  A detached partition
+   whose archival failed stays in place and is retried on the next run.
+
+Dropping whole partitions instead of ``DELETE``-ing rows leaves no dead
+tuples or index bloat behind.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import logging
+import os
+import re
+import tempfile
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from ..config import AppSettings, get_settings
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "job_history"
+DEFAULT_PARTITION = "job_history_default"
+
+_PARTITION_RE = re.compile(r"^job_history_p(\d{4})(\d{2})$")
+
+# Don't queue writers behind DETACH's ACCESS EXCLUSIVE lock for long.
+_LOCK_TIMEOUT = "5s"
+
+
+def is_partition_table(name: str) -> bool:
+    """Whether *name* is a (possibly detached) ``job_history`` partition."""
+    return name == DEFAULT_PARTITION or _PARTITION_RE.match(name) is not None
+
+
+def add_months(month: date, n: int) -> date:
+    """Return the first day of the month *n* months after *month*'s."""
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_p{month.year:04d}{month.month:02d}"
+
+
+def _partition_month(name: str) -> Optional[date]:
+    match = _PARTITION_RE.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def _bounds(month: date) -> str:
+    return f"FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+
+
+async def list_partitions(conn: AsyncConnection) -> Dict[str, bool]:
+    """Return monthly partition tables mapped to whether they are attached."""
+    rows = await conn.execute(
+        text(
+            """
+            SELECT c.relname, i.inhrelid IS NOT NULL
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            LEFT JOIN pg_inherits i ON i.inhrelid = c.oid AND i.inhparent = CAST(:parent AS regclass)
+            WHERE n.nspname = current_schema() AND c.relkind = 'r' AND c.relname ~ '^job_history_p[0-9]{6}$'
+            """
+        ),
+        {"parent": PARENT_TABLE},
+    )
+    return {name: attached for name, attached in rows.all()}
+
+
+async def _create_partition(conn: AsyncConnection, month: date) -> None:
+    name = partition_name(month)
+    window = {
+        "lo": datetime.combine(month, datetime.min.time()),
+        "hi": datetime.combine(add_months(month, 1), datetime.min.time()),
+    }
+    stranded = (
+        await conn.execute(
+            text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE timestamp >= :lo AND timestamp < :hi)"),
+            window,
+        )
+    ).scalar()
+    if not stranded:
+        await conn.execute(text(f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} FOR VALUES {_bounds(month)}"))
+        return
+    # Attaching would fail while the default partition holds rows of the
+    # range: move them into the new table first.
+    await conn.execute(text(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    moved = await conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE timestamp >= :lo AND timestamp < :hi RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        window,
+    )
+    await conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} FOR VALUES {_bounds(month)}"))
+    logger.info("Moved %d rows from %s into %s", moved.rowcount, DEFAULT_PARTITION, name)
+
+
+async def ensure_partitions(engine: AsyncEngine, today: date, months_ahead: int) -> List[str]:
+    """Create the missing partitions from *today*'s month to *months_ahead* later."""
+    current = today.replace(day=1)
+    created = []
+    async with engine.begin() as conn:
+        existing = await list_partitions(conn)
+        for n in range(months_ahead + 1):
+            month = add_months(current, n)
+            if partition_name(month) not in existing:
+                await conn.execute(text(f"SET LOCAL lock_timeout = '{_LOCK_TIMEOUT}'"))
+                await _create_partition(conn, month)
+                created.append(partition_name(month))
+    return created
+
+
+# -----------------------------------------------------------------------------
+# Retention
+# -----------------------------------------------------------------------------
+
+
+async def _dump(engine: AsyncEngine, table: str, path: Path) -> int:
+    """Stream *table* into a gzipped CSV at *path*; return the row count."""
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        with gzip.open(path, "wb") as fh:
+            status = await raw.driver_connection.copy_from_query(
+                f"SELECT * FROM {table} ORDER BY timestamp, id", output=fh, format="csv", header=True
+            )
+    return int(status.split()[-1])
+
+
+async def _archive(engine: AsyncEngine, table: str, settings: AppSettings) -> str:
+    """Write *table* to ``<table>.csv.gz`` under ``JOB_HISTORY_ARCHIVE_URI``; return its location."""
+    uri = settings.job_history_archive_uri
+    if not uri.startswith("s3://"):
+        target = Path(uri) / f"{table}.csv.gz"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        partial = target.with_name(target.name + ".partial")
+        rows = await _dump(engine, table, partial)
+        os.replace(partial, target)  # never leave a truncated archive under the final name
+        logger.info("Wrote %d rows of %s to %s", rows, table, target)
+        return str(target)
+
+    try:
+        import boto3
+    except ImportError as exc:  # pragma: no cover – optional dependency
+        raise RuntimeError("boto3 is required for s3:// archive targets (pip install boto3)") from exc
+    bucket, _, prefix = uri[len("s3://"):].partition("/")
+    key = "/".join(filter(None, (prefix.strip("/"), f"{table}.csv.gz")))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / f"{table}.csv.gz"
+        rows = await _dump(engine, table, path)
+        client = boto3.client("s3", endpoint_url=settings.job_history_archive_s3_endpoint_url)
+        await asyncio.to_thread(client.upload_file, str(path), bucket, key)
+    logger.info("Uploaded %d rows of %s to s3://%s/%s", rows, table, bucket, key)
+    return f"s3://{bucket}/{key}"
+
+
+async def archive_expired(engine: AsyncEngine, today: date, settings: AppSettings, *, dry_run: bool = False) -> List[str]:
+    """Detach, archive and drop partitions past the retention window."""
+    if settings.job_history_retention_months <= 0:
+        return []
+    cutoff = add_months(today.replace(day=1), -settings.job_history_retention_months)
+    async with engine.connect() as conn:
+        partitions = await list_partitions(conn)
+    expired = sorted(name for name in partitions if add_months(_partition_month(name), 1) <= cutoff)
+    if dry_run:
+        return expired
+
+    archived = []
+    for name in expired:
+        if partitions[name]:
+            async with engine.begin() as conn:
+                await conn.execute(text(f"SET LOCAL lock_timeout = '{_LOCK_TIMEOUT}'"))
+                await conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+            logger.info("Detached %s", name)
+        await _archive(engine, name, settings)
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP TABLE {name}"))
+        logger.info("Dropped %s", name)
+        archived.append(name)
+    return archived
+
+
+async def maintain(engine: AsyncEngine, *, archive: bool = True, dry_run: bool = False) -> None:
+    settings = get_settings()
+    today = datetime.utcnow().date()
+    if dry_run:
+        logger.info("Would archive: %s", ", ".join(await archive_expired(engine, today, settings, dry_run=True)) or "nothing")
+        return
+    created = await ensure_partitions(engine, today, settings.job_history_partition_months_ahead)
+    logger.info("Created partitions: %s", ", ".join(created) or "none needed")
+    if archive:
+        await archive_expired(engine, today, settings)
+
+
+async def _main(argv: Optional[list] = None) -> None:
+    from .session import engine
+
+    parser = argparse.ArgumentParser(prog="python -m gitops_orchestrator.db.partitions")
+    commands = parser.add_subparsers(dest="command", required=True)
+    maintain_cmd = commands.add_parser("maintain", help="create future partitions, archive and drop expired ones")
+    maintain_cmd.add_argument("--skip-archive", action="store_true", help="only create partitions")
+    maintain_cmd.add_argument("--dry-run", action="store_true", help="list the partitions that would be archived")
+    args = parser.parse_args(argv)
+
+    try:
+        await maintain(engine, archive=not args.skip_archive, dry_run=args.dry_run)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main())
@@ -0,0 +1,116 @@
+"""Connection-pool construction and metrics.
+
+Every async engine (primary and replicas) is built by :func:`build_engine`
+from the ``DB_POOL_*`` settings.  Size pools per *process*: with
+``uvicorn --workers N`` plus worker processes the server sees
+``processes × (DB_POOL_SIZE + DB_MAX_OVERFLOW)`` connections at most.
+
+``DB_PGBOUNCER=true`` makes the engines safe behind PgBouncer in transaction
+pooling mode: asyncpg's statement cache and SQLAlchemy's prepared-statement
+cache are disabled and prepared statements get unique names, so a statement
+prepared on one server connection is never looked up on another.
+
+Metrics (labelled by ``pool``, i.e. ``primary`` or the replica's host:port):
+
+* ``gitops_db_pool_checkout_wait_seconds`` – time to get a connection,
+  including opening a new one;
+* ``gitops_db_pool_checkout_timeouts_total`` – checkouts that gave up after
+  ``DB_POOL_TIMEOUT_SECONDS``;
+* ``gitops_db_pool_in_use`` / ``gitops_db_pool_overflow`` – checked-out and
+  overflow connections (summed over live processes in multiprocess mode).
+"""
+from __future__ import annotations
+
+import time
+import uuid
+from typing import Any, Dict
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from ..config import get_settings
+
+POOL_CHECKOUT_WAIT = Histogram(
+    "gitops_db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled DB connection.",
+    ("pool",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+POOL_CHECKOUT_TIMEOUTS = Counter(
+    "gitops_db_pool_checkout_timeouts_total",
+    "Connection checkouts that timed out.",
+    ("pool",),
+)
+POOL_IN_USE = Gauge(
+    "gitops_db_pool_in_use",
+    "DB connections currently checked out.",
+    ("pool",),
+    multiprocess_mode="livesum",
+)
+POOL_OVERFLOW = Gauge(
+    "gitops_db_pool_overflow",
+    "DB connections open beyond the pool size.",
+    ("pool",),
+    multiprocess_mode="livesum",
+)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool publishing checkout latency and occupancy.
+
+    Use :func:`build_engine`; it derives a subclass carrying the ``pool``
+    label so ``engine.dispose()`` (which recreates the pool from its class)
+    keeps reporting under the same name.
+    """
+
+    metrics_name = "primary"
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except sa_exc.TimeoutError:
+            POOL_CHECKOUT_TIMEOUTS.labels(self.metrics_name).inc()
+            raise
+        finally:
+            POOL_CHECKOUT_WAIT.labels(self.metrics_name).observe(time.perf_counter() - start)
+        self._publish()
+        return record
+
+    def _do_return_conn(self, record: Any) -> None:
+        super()._do_return_conn(record)
+        self._publish()
+
+    def _publish(self) -> None:
+        POOL_IN_USE.labels(self.metrics_name).set(self.checkedout())
+        POOL_OVERFLOW.labels(self.metrics_name).set(max(self.overflow(), 0))
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def build_engine(url: str, name: str = "primary") -> AsyncEngine:
+    """Create an async engine for *url* with the configured, instrumented pool."""
+    settings = get_settings()
+    connect_args: Dict[str, Any] = {}
+    if settings.db_pgbouncer:
+        connect_args = {
+            "statement_cache_size": 0,  # asyncpg
+            "prepared_statement_cache_size": 0,  # SQLAlchemy's asyncpg adapter
+            "prepared_statement_name_func": _unique_statement_name,
+        }
+    poolclass = type("InstrumentedQueuePool", (InstrumentedQueuePool,), {"metrics_name": name})
+    return create_async_engine(
+        url,
+        poolclass=poolclass,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_pre_ping=True,
+        connect_args=connect_args,
+        echo=False,
+    )
@@ -0,0 +1,217 @@
+"""Per-tenant metric rollups maintained in the writing transaction.
+
+``tenant_rollups`` holds one counter row per (tenant, dimension, key):
+
+* ``job_status`` – number of jobs per status;
+* ``job_category`` – number of jobs per category plus the newest job's
+  ``created_at`` (``last_job_at``);
+* ``resource_category`` – number of resources per category.
+
+An ORM ``after_flush`` hook turns every ORM insert, delete and status /
+category change of :class:`Job` and :class:`Resource` into counter deltas and
+upserts them on the flush's connection, so the rollups commit (or roll back)
+together with the write.  Code issuing Core DML that changes those columns
+must apply :func:`rollup_upserts` for its deltas itself.
+
+Rows are upserted in primary-key order so concurrent writers never deadlock
+on them.  Drift (e.g. rows changed by hand) is repaired with::
+
+    python -m gitops_orchestrator.db.rollups rebuild [--tenant <uuid>]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import enum
+import logging
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, inspect, select, text
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..models import Job, Resource, TenantRollup
+
+logger = logging.getLogger(__name__)
+
+DIM_JOB_STATUS = "job_status"
+DIM_JOB_CATEGORY = "job_category"
+DIM_RESOURCE_CATEGORY = "resource_category"
+
+RollupKey = Tuple[uuid.UUID, str, str]
+
+# Rows per upsert statement (5 bind parameters each; asyncpg allows 32767).
+_UPSERT_BATCH = 5000
+
+
+class RollupDeltas:
+    """Accumulates counter changes keyed by (tenant, dimension, key)."""
+
+    def __init__(self) -> None:
+        self.counts: Dict[RollupKey, int] = defaultdict(int)
+        self.last_job_at: Dict[RollupKey, datetime] = {}
+
+    def add(
+        self, tenant_id: uuid.UUID, dimension: str, key: Any, n: int = 1, at: Optional[datetime] = None
+    ) -> None:
+        if key is None:
+            return
+        rollup_key = (tenant_id, dimension, key.value if isinstance(key, enum.Enum) else str(key))
+        self.counts[rollup_key] += n
+        if at is not None and (rollup_key not in self.last_job_at or at > self.last_job_at[rollup_key]):
+            self.last_job_at[rollup_key] = at
+
+
+def rollup_upserts(deltas: RollupDeltas) -> List[Insert]:
+    """Return multi-row upserts applying *deltas*, in primary-key order.
+
+    Chunked to stay below the driver's bind-parameter limit; a single flush
+    normally yields one statement.
+    """
+    keys = sorted(k for k in deltas.counts if deltas.counts[k] or k in deltas.last_job_at)
+    statements = []
+    for start in range(0, len(keys), _UPSERT_BATCH):
+        stmt = insert(TenantRollup).values(
+            [
+                {
+                    "tenant_id": tenant_id,
+                    "dimension": dimension,
+                    "key": key,
+                    "count": deltas.counts[(tenant_id, dimension, key)],
+                    "last_job_at": deltas.last_job_at.get((tenant_id, dimension, key)),
+                }
+                for tenant_id, dimension, key in keys[start : start + _UPSERT_BATCH]
+            ]
+        )
+        statements.append(
+            stmt.on_conflict_do_update(
+                index_elements=[TenantRollup.tenant_id, TenantRollup.dimension, TenantRollup.key],
+                set_={
+                    "count": TenantRollup.count + stmt.excluded.count,
+                    # GREATEST ignores NULLs.
+                    "last_job_at": func.greatest(TenantRollup.last_job_at, stmt.excluded.last_job_at),
+                },
+            )
+        )
+    return statements
+
+
+def _add_job(deltas: RollupDeltas, job: Job, n: int) -> None:
+    deltas.add(job.tenant_id, DIM_JOB_STATUS, job.status, n)
+    at = (job.created_at or datetime.utcnow()) if n > 0 else None
+    deltas.add(job.tenant_id, DIM_JOB_CATEGORY, job.category, n, at=at)
+
+
+def _add_changes(deltas: RollupDeltas, obj: Any, attr: str, dimension: str) -> None:
+    history = inspect(obj).attrs[attr].history
+    if not history.has_changes():
+        return
+    if not history.deleted:
+        # Previous value was never loaded; ``rebuild`` repairs the drift.
+        logger.warning("Unknown previous %s of %r; rollups may drift", attr, obj)
+    for old in history.deleted:
+        deltas.add(obj.tenant_id, dimension, old, -1)
+    for new in history.added:
+        deltas.add(obj.tenant_id, dimension, new, +1)
+
+
+def collect_deltas(session: Session) -> RollupDeltas:
+    """Return the rollup deltas for the changes *session* is flushing."""
+    deltas = RollupDeltas()
+    for obj in session.new:
+        if isinstance(obj, Job):
+            _add_job(deltas, obj, +1)
+        elif isinstance(obj, Resource):
+            deltas.add(obj.tenant_id, DIM_RESOURCE_CATEGORY, obj.category, +1)
+    for obj in session.dirty:
+        if isinstance(obj, Job):
+            _add_changes(deltas, obj, "status", DIM_JOB_STATUS)
+            _add_changes(deltas, obj, "category", DIM_JOB_CATEGORY)
+        elif isinstance(obj, Resource):
+            _add_changes(deltas, obj, "category", DIM_RESOURCE_CATEGORY)
+    for obj in session.deleted:
+        if isinstance(obj, Job):
+            _add_job(deltas, obj, -1)
+        elif isinstance(obj, Resource):
+            deltas.add(obj.tenant_id, DIM_RESOURCE_CATEGORY, obj.category, -1)
+    return deltas
+
+
+def apply_flush_rollups(session: Session) -> None:
+    """Upsert the rollup deltas of the changes *session* is flushing.
+
+    Runs from the ``after_flush`` hook in :mod:`gitops_orchestrator.models`:
+    new/dirty/deleted and attribute history still reflect the flushed changes
+    there, and the upsert joins the flush's transaction.
+    """
+    connection = session.connection()
+    for stmt in rollup_upserts(collect_deltas(session)):
+        connection.execute(stmt)
+
+
+# -----------------------------------------------------------------------------
+# Rebuild
+# -----------------------------------------------------------------------------
+
+
+async def rebuild(db: AsyncSession, tenant_id: Optional[uuid.UUID] = None) -> int:
+    """Recompute the rollups of *tenant_id* (all tenants if ``None``) from scratch.
+
+    Holds an EXCLUSIVE lock on ``tenant_rollups`` until the caller commits:
+    concurrent writers queue their upserts behind it and apply their deltas
+    on top of the rebuilt counts.  Returns the number of rollup rows written.
+    """
+    await db.execute(text("LOCK TABLE tenant_rollups IN EXCLUSIVE MODE"))
+    wipe = delete(TenantRollup)
+    job_status = select(Job.tenant_id, Job.status, func.count()).group_by(Job.tenant_id, Job.status)
+    job_category = (
+        select(Job.tenant_id, Job.category, func.count(), func.max(Job.created_at))
+        .where(Job.category.is_not(None))
+        .group_by(Job.tenant_id, Job.category)
+    )
+    resource_category = select(Resource.tenant_id, Resource.category, func.count()).group_by(
+        Resource.tenant_id, Resource.category
+    )
+    if tenant_id is not None:
+        wipe = wipe.where(TenantRollup.tenant_id == tenant_id)
+        job_status = job_status.where(Job.tenant_id == tenant_id)
+        job_category = job_category.where(Job.tenant_id == tenant_id)
+        resource_category = resource_category.where(Resource.tenant_id == tenant_id)
+
+    deltas = RollupDeltas()
+    for tenant, status, count in (await db.execute(job_status)).all():
+        deltas.add(tenant, DIM_JOB_STATUS, status, count)
+    for tenant, category, count, last_at in (await db.execute(job_category)).all():
+        deltas.add(tenant, DIM_JOB_CATEGORY, category, count, at=last_at)
+    for tenant, category, count in (await db.execute(resource_category)).all():
+        deltas.add(tenant, DIM_RESOURCE_CATEGORY, category, count)
+
+    await db.execute(wipe)
+    for stmt in rollup_upserts(deltas):
+        await db.execute(stmt)
+    return len(deltas.counts)
+
+
+async def _main(argv: Optional[list] = None) -> None:
+    from .session import async_session, engine
+
+    parser = argparse.ArgumentParser(prog="python -m gitops_orchestrator.db.rollups")
+    commands = parser.add_subparsers(dest="command", required=True)
+    rebuild_cmd = commands.add_parser("rebuild", help="recompute tenant_rollups from jobs and resources")
+    rebuild_cmd.add_argument("--tenant", type=uuid.UUID, help="only this tenant")
+    args = parser.parse_args(argv)
+
+    async with async_session() as db:
+        rows = await rebuild(db, args.tenant)
+        await db.commit()
+    await engine.dispose()
+    logger.info("Rebuilt %d rollup rows%s", rows, f" for tenant {args.tenant}" if args.tenant else "")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main())
@@ -1,9 +1,33 @@
-"""Async SQLAlchemy engine & session helpers."""
+"""Async SQLAlchemy engine & session helpers.
+
+Writes always use the primary (:data:`engine`, :func:`get_async_session`).
+Read-only routes depend on :func:`get_read_session`, which picks a read
+replica from ``DB_REPLICA_URLS`` when one is configured and caught up:
+
+* each replica's lag is measured at most every
+  ``DB_REPLICA_LAG_CHECK_INTERVAL_SECONDS`` and replicas lagging more than
+  ``DB_REPLICA_MAX_LAG_SECONDS``, unreachable, or not streaming from the
+  primary (lag unknown) are skipped; with none left the primary serves the
+  read;
+* after submitting a job the client gets a short-lived cookie
+  (:func:`mark_write`) that keeps its reads on the primary, so it can poll the
+  job it just created; sending ``X-Read-Consistency: primary`` does the same
+  for clients without a cookie jar.
+"""
 from __future__ import annotations
 
-from typing import AsyncGenerator
+import asyncio
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, AsyncIterator, List, Optional
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from fastapi import Request, Response
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 try:
     from sqlalchemy.ext.asyncio import async_sessionmaker  # SQLAlchemy >=2.0
 except ImportError:  # fallback for older versions
@@ -11,24 +35,28 @@ except ImportError:  # fallback for older versions
 from sqlalchemy.orm import declarative_base
 
 from ..config import get_settings
+from .pool import build_engine
 
 __all__ = [
     "Base",
     "engine",
     "async_session",
     "get_async_session",
+    "read_session",
+    "get_read_session",
+    "wants_primary",
+    "get_or_primary",
+    "mark_write",
+    "all_engines",
+    "dispose_engines",
 ]
 
+logger = logging.getLogger(__name__)
+
 settings = get_settings()
 
-# Create async engine (uses asyncpg driver)
-engine: AsyncEngine = create_async_engine(
-    settings.sqlalchemy_database_uri,
-    pool_size=10,
-    max_overflow=20,
-    pool_pre_ping=True,
-    echo=False,
-)
+# Create async engine (uses asyncpg driver; pool settings in ``db/pool.py``)
+engine: AsyncEngine = build_engine(settings.sqlalchemy_database_uri)
 
 # Session factory
 async_session: async_sessionmaker[AsyncSession] = async_sessionmaker(
@@ -43,3 +71,159 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     """FastAPI dependency that yields an :class:`AsyncSession`."""
     async with async_session() as session:
         yield session
+
+
+# -----------------------------------------------------------------------------
+# Read replicas
+# -----------------------------------------------------------------------------
+
+READ_CONSISTENCY_HEADER = "X-Read-Consistency"
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+# Seconds the replica is behind; 0 when it has replayed everything it
+# received (an idle primary must not look like lag) or is not in recovery.
+# NULL (unknown) while the WAL receiver is not streaming: both LSNs then
+# freeze and look caught up however far behind the replica falls.  Without
+# pg_read_all_stats / pg_monitor ``status`` reads as NULL, so a running
+# receiver process (``pid``) has to do.
+_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver "
+    "WHERE status = 'streaming' OR (status IS NULL AND pid IS NOT NULL)) THEN NULL "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+def _host_port(url: str) -> str:
+    parsed = make_url(url)
+    return f"{parsed.host}:{parsed.port or 5432}"
+
+
+class _Replica:
+    """A replica engine plus its cached replication lag."""
+
+    def __init__(self, url: str) -> None:
+        self.engine: AsyncEngine = build_engine(url, name=_host_port(url))
+        self.name = _host_port(url)
+        self.lag: Optional[float] = None
+        self._checked_at = float("-inf")
+        self._down = False
+        self._lock = asyncio.Lock()
+
+    def _fresh(self) -> bool:
+        return time.monotonic() - self._checked_at < settings.db_replica_lag_check_interval_seconds
+
+    async def _measure(self) -> Optional[float]:
+        async with self.engine.connect() as conn:
+            lag = (await conn.execute(_LAG_SQL)).scalar()
+        return None if lag is None else float(lag)
+
+    async def current_lag(self) -> Optional[float]:
+        """Return the replica's lag in seconds, ``None`` if unknown or unreachable."""
+        if self._fresh():
+            return self.lag
+        async with self._lock:  # one probe per interval, not one per request
+            if not self._fresh():
+                try:
+                    timeout = max(settings.db_replica_lag_check_interval_seconds, 1.0)
+                    self.lag = await asyncio.wait_for(self._measure(), timeout)
+                except (SQLAlchemyError, OSError, asyncio.TimeoutError) as exc:
+                    if not self._down:
+                        logger.warning("Replica %s unavailable, skipping it: %s", self.name, exc)
+                    self._down = True
+                    self.lag = None
+                else:
+                    if self.lag is None:
+                        if not self._down:
+                            logger.warning("Replica %s is not streaming from the primary, skipping it", self.name)
+                        self._down = True
+                    elif self._down:
+                        logger.info("Replica %s is back", self.name)
+                        self._down = False
+                self._checked_at = time.monotonic()
+        return self.lag
+
+
+_replicas: List[_Replica] = [_Replica(url) for url in settings.sqlalchemy_replica_uris]
+_round_robin = itertools.count()
+
+# Sessions on a replica; bound per call to the chosen replica's engine.
+replica_session: async_sessionmaker[AsyncSession] = async_sessionmaker(
+    expire_on_commit=False, class_=AsyncSession
+)
+
+
+async def _pick_replica() -> Optional[_Replica]:
+    """Return the next caught-up replica (round robin), ``None`` if there is none."""
+    if not _replicas:
+        return None
+    start = next(_round_robin)
+    for i in range(len(_replicas)):
+        replica = _replicas[(start + i) % len(_replicas)]
+        lag = await replica.current_lag()
+        if lag is not None and lag <= settings.db_replica_max_lag_seconds:
+            return replica
+    return None
+
+
+@asynccontextmanager
+async def read_session(*, primary: bool = False) -> AsyncIterator[AsyncSession]:
+    """Open a session for read-only work on a replica, or the primary as fallback.
+
+    ``session.info["replica"]`` names the replica in use (absent on the primary).
+    """
+    replica = None if primary else await _pick_replica()
+    if replica is None:
+        async with async_session() as session:
+            yield session
+    else:
+        async with replica_session(bind=replica.engine, info={"replica": replica.name}) as session:
+            yield session
+
+
+def wants_primary(request: Request) -> bool:
+    """Whether *request* asked for read-your-writes consistency."""
+    if request.headers.get(READ_CONSISTENCY_HEADER, "").lower() == "primary":
+        return True
+    try:
+        return float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """FastAPI dependency yielding a read-only session (see :func:`read_session`)."""
+    async with read_session(primary=wants_primary(request)) as session:
+        yield session
+
+
+def mark_write(response: Response) -> Response:
+    """Keep the client's reads on the primary for ``DB_READ_YOUR_WRITES_SECONDS``."""
+    if _replicas:
+        window = settings.db_read_your_writes_seconds
+        response.set_cookie(
+            READ_PRIMARY_COOKIE, str(int(time.time()) + window), max_age=window, httponly=True, samesite="lax"
+        )
+    return response
+
+
+async def get_or_primary(db: AsyncSession, entity: Any, ident: Any) -> Any:
+    """``db.get`` that retries on the primary when a replica has not seen the row yet."""
+    obj = await db.get(entity, ident)
+    if obj is None and "replica" in db.info:
+        async with async_session() as primary:
+            obj = await primary.get(entity, ident)
+    return obj
+
+
+def all_engines() -> List[AsyncEngine]:
+    """The primary engine followed by the replica engines."""
+    return [engine, *(replica.engine for replica in _replicas)]
+
+
+async def dispose_engines() -> None:
+    """Close the primary and replica connection pools."""
+    await engine.dispose()
+    for replica in _replicas:
+        await replica.engine.dispose()
@@ -27,5 +27,5 @@ def get_handler_class(category: str) -> Type[BaseJobHandler]:  # noqa: D401
     """Return the handler class for *category*. Raises KeyError if unknown."""
     dotted_path = _RESOURCE_TO_HANDLER[category]
     module_path, class_name = dotted_path.rsplit(".", 1)
-    module = import_module(f". {module_path}", package=__name__.split(".")[0])
+    module = import_module(f".{module_path}", package=__name__.split(".")[0])
     return getattr(module, class_name)  # type: ignore[return-value]
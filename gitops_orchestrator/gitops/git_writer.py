@@ -19,6 +19,10 @@ from ..config import get_settings
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Subject prefix of the orchestrator's manifest commits (followed by the
+# file's path); the drift reconciler treats other commits as out-of-band edits.
+MANAGED_COMMIT_PREFIX = "GitOps: update "
+
 
 class GitOpsError(RuntimeError):
     """Raised on Git operation failure."""
@@ -32,14 +36,17 @@ async def commit_change(
     commit_message: str,
     merge_strategy: str = "direct",
     branch_name: Optional[str] = None,
+    category: Optional[str] = None,
 ) -> str:
     """Clone (or reuse) *repo_url*, commit *file_content*, push.
 
     If *merge_strategy* is "pr", a branch is created and pushed; for now we
     return the branch name and leave PR creation to an out-of-band process.
+    *category* only labels the clone/commit/push latency metrics.
 
     Returns the commit SHA (direct) or branch ref (pr).
     """
+    from ..instrumentation import observe_stage
 
     # Work in a temp dir per invocation
     workdir = Path(tempfile.mkdtemp(prefix="gitops_"))
@@ -49,7 +56,8 @@ async def commit_change(
         # Import GitPython lazily to avoid loading it during workflow sandbox initialization
         from git import Repo  # type: ignore[import-not-found]
 
-        repo = Repo.clone_from(_with_auth(repo_url), workdir, env=_git_env())
+        with observe_stage("clone", category=category, repo_url=repo_url):
+            repo = Repo.clone_from(_with_auth(repo_url), workdir, env=_git_env())
         # Ensure we're on main
         if repo.head.is_detached:
             repo.git.checkout("-B", "main")
@@ -58,17 +66,19 @@ async def commit_change(
             branch_name = branch_name or f"gitops-{relative_file_path.stem}"
             repo.git.checkout("-B", branch_name)
 
-        full_path = workdir / relative_file_path
-        full_path.parent.mkdir(parents=True, exist_ok=True)
-        full_path.write_text(file_content)
+        with observe_stage("commit", category=category, repo_url=repo_url):
+            full_path = workdir / relative_file_path
+            full_path.parent.mkdir(parents=True, exist_ok=True)
+            full_path.write_text(file_content)
 
-        repo.index.add([str(full_path.relative_to(workdir))])
-        repo.index.commit(commit_message)
+            repo.index.add([str(full_path.relative_to(workdir))])
+            repo.index.commit(commit_message)
 
         origin = repo.remotes.origin
         # Ensure remote URL has auth for push too
         origin.set_url(_with_auth(repo_url))
-        origin.push(refspec=f"HEAD:{repo.active_branch.name}")
+        with observe_stage("push", category=category, repo_url=repo_url):
+            origin.push(refspec=f"HEAD:{repo.active_branch.name}")
         logger.info("Pushed changes to %s (%s)", repo_url, repo.active_branch)
 
         return repo.head.commit.hexsha if merge_strategy == "direct" else branch_name  # type: ignore[return-value]
@@ -0,0 +1,148 @@
+"""Prometheus metrics for the API and the Temporal workers.
+
+* ``gitops_stage_duration_seconds`` – time spent in each job stage
+  (``tenant_lookup``, ``pre_checks``, ``render``, ``clone``, ``commit``,
+  ``push``, ``external_api``), labelled by resource category and Git repo;
+* ``gitops_http_request_duration_seconds`` – API latency per route template;
+* ``gitops_job_queue_wait_seconds`` – time jobs spent queued before the
+  scheduler dispatched them, labelled by priority class.
+
+Label values are clamped to known sets (resource categories, repos named in
+``RESOURCE_REPO_MAP_JSON``, route templates, priority classes) so cardinality stays bounded no
+matter what clients send.
+
+The API serves ``/metrics``; workers expose ``WORKER_METRICS_PORT`` and the
+scheduler ``SCHEDULER_METRICS_PORT``.  With
+several processes per host (``uvicorn --workers``, ``worker_supervisor``) set
+``PROMETHEUS_MULTIPROC_DIR`` to a shared, empty directory so the API endpoint
+aggregates all of them.
+"""
+from __future__ import annotations
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+from .config import get_settings
+from .models import ResourceCategory
+from .tracing import span
+
+STAGES = frozenset({"tenant_lookup", "pre_checks", "render", "clone", "commit", "push", "external_api"})
+
+_STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+STAGE_DURATION = Histogram(
+    "gitops_stage_duration_seconds",
+    "Time spent in a job stage.",
+    ("stage", "category", "repo", "outcome"),
+    buckets=_STAGE_BUCKETS,
+)
+JOB_QUEUE_WAIT = Histogram(
+    "gitops_job_queue_wait_seconds",
+    "Time a job waited in the scheduler queue before dispatch.",
+    ("priority",),
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0, 7200.0),
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "gitops_http_request_duration_seconds",
+    "API request latency by route template.",
+    ("method", "route", "status"),
+)
+
+_CATEGORIES = frozenset(c.value for c in ResourceCategory)
+
+
+def category_label(category: Optional[str]) -> str:
+    """Return *category* if it is a known resource category, else ``other``."""
+    if not category:
+        return "none"
+    return category if category in _CATEGORIES else "other"
+
+
+def repo_label(repo_url: Optional[str]) -> str:
+    """Return the short name of a configured GitOps repo, else ``other``."""
+    if not repo_url:
+        return "none"
+    if repo_url not in get_settings().resource_repo_map.values():
+        return "other"
+    return repo_url.rstrip("/").rsplit("/", 1)[-1].removesuffix(".git")
+
+
+def priority_label(priority: Optional[str]) -> str:
+    """Return *priority* if it is a configured priority class, else ``other``."""
+    return priority if priority in get_settings().scheduler_priority_classes else "other"
+
+
+@contextmanager
+def observe_stage(stage: str, *, category: Optional[str] = None, repo_url: Optional[str] = None) -> Iterator[None]:
+    """Record the duration of the enclosed block as *stage* (and trace it as a span).
+
+    Works around ``await`` too; failures are recorded with ``outcome="error"``.
+    """
+    if stage not in STAGES:
+        raise ValueError(f"Unknown stage '{stage}'")
+    outcome = "error"
+    start = time.perf_counter()
+    try:
+        with span(stage, attributes={"gitops.category": category, "gitops.repo": repo_url and repo_label(repo_url)}):
+            yield
+        outcome = "ok"
+    finally:
+        STAGE_DURATION.labels(stage, category_label(category), repo_label(repo_url), outcome).observe(
+            time.perf_counter() - start
+        )
+
+
+# -----------------------------------------------------------------------------
+# API
+# -----------------------------------------------------------------------------
+
+ASGIApp = Callable[[Dict[str, Any], Callable[[], Awaitable[Any]], Callable[[Any], Awaitable[None]]], Awaitable[None]]
+
+
+class PrometheusMiddleware:
+    """Pure ASGI middleware timing each HTTP request, streamed bodies included.
+
+    Labelled by the matched route template (``/api/v1/tenants/{tenant_id}/jobs``),
+    never the raw path.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = ["500"]
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = str(message["status"])
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"], getattr(route, "path", "unmatched"), status[0]
+            ).observe(time.perf_counter() - start)
+
+
+def render_latest() -> Tuple[bytes, str]:
+    """Return the exposition payload and its content type.
+
+    Aggregates all processes when ``PROMETHEUS_MULTIPROC_DIR`` is set.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -61,7 +61,9 @@ class BaseJobHandler(abc.ABC):
     async def wait_for_completion(self) -> None:  # noqa: D401
         """Poll for external workflow completion.
 
-        Default immediate return; override for long-running tasks.
+        Default immediate return. ``JobWorkflow`` normally waits for the vendor
+        callback signal instead; override only for systems that cannot call
+        back and must be polled.
         """
         logger.debug("wait_for_completion immediate return for %s", self.__class__.__name__)
 
@@ -8,6 +8,7 @@ from ...config import get_settings
 from ...gitops.template_fetcher import get_template_dir
 from ...gitops.templater import render_template
 from ...gitops.git_writer import commit_change, format_commit_message
+from ...tracing import http_transport
 
 from ..base import BaseJobHandler
 
@@ -44,7 +45,9 @@ class ComputeVMsJobHandler(BaseJobHandler):
         if not settings.vm_api_base:
             return None  # API not configured
         headers = {"Authorization": f"Bearer {settings.vm_api_token}"} if settings.vm_api_token else {}
-        async with httpx.AsyncClient(base_url=settings.vm_api_base, headers=headers, timeout=30) as client:
+        async with httpx.AsyncClient(
+            base_url=settings.vm_api_base, headers=headers, timeout=30, transport=http_transport()
+        ) as client:
             resp = await client.post("/v1/vms", json=self.payload)
             resp.raise_for_status()
             return resp.json()
@@ -1,20 +1,59 @@
 """FastAPI application entry point for Hybrid Infra Orchestrator."""
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import logging
+from typing import AsyncIterator
 
-from fastapi import Depends, FastAPI
+from fastapi import Depends, FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from temporalio.client import Client
 
+from .callback_queue import close_queue
 from .config import get_settings
-from .db.session import get_async_session
-from .routes import callbacks, jobs, metrics, resources, tenants
+from .db.accounting import DB_TIME_HEADER, QUERIES_HEADER, QueryAccountingMiddleware, check_budgets, install
+from .db.job_events import close_hub
+from .db.session import all_engines, dispose_engines, get_read_session
+from .instrumentation import PrometheusMiddleware, render_latest
+from .pagination import NEXT_CURSOR_HEADER
+from .routes import callbacks, events, exports, jobs, metrics, resources, search, tenants
+from .serialization import ORJSONResponse
+from .tracing import TracingMiddleware, configure_tracing, shutdown_tracing, temporal_interceptors
+from .warmup import READINESS, import_handlers, is_ready, run_warmup, warm_db
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
+configure_tracing("gitops-api")
 
-app = FastAPI(title="Hybrid Infra Orchestrator", version="0.1.0")
+
+@contextlib.asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """Warm up in the background (see ``/readyz``).
+
+    On shutdown: write queued callbacks, end event streams, close the DB pools.
+    """
+    warmup = asyncio.create_task(
+        run_warmup({"temporal": get_temporal_client, "db": warm_db, "imports": import_handlers}, retry=True)
+    )
+    try:
+        yield
+    finally:
+        warmup.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await warmup
+        await close_queue()
+        await close_hub()
+        await dispose_engines()
+        shutdown_tracing()
+
+
+app = FastAPI(
+    title="Hybrid Infra Orchestrator",
+    version="0.1.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
 
 # CORS (adjust as needed)
 app.add_middleware(
@@ -23,16 +62,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, QUERIES_HEADER, DB_TIME_HEADER],
 )
+app.add_middleware(PrometheusMiddleware)
+install(all_engines())
+app.add_middleware(QueryAccountingMiddleware)
+app.add_middleware(TracingMiddleware)  # outermost: the span covers the whole request
 
 # Dependency: Temporal client (singleton)
 _temporal_client: Client | None = None
+_temporal_lock = asyncio.Lock()
 
 
 async def get_temporal_client() -> Client:  # noqa: D401
     global _temporal_client  # noqa: PLW0603 – module-level singleton
     if _temporal_client is None:
-        _temporal_client = await Client.connect(f"{settings.temporal_host}:{settings.temporal_port}")
+        # Concurrent first callers share one connection attempt.
+        async with _temporal_lock:
+            if _temporal_client is None:
+                _temporal_client = await Client.connect(
+                    f"{settings.temporal_host}:{settings.temporal_port}", interceptors=temporal_interceptors()
+                )
     return _temporal_client
 
 
@@ -40,13 +90,40 @@ async def get_temporal_client() -> Client:  # noqa: D401
 # Include routers
 # ------------------------------------------------------------------
 app.include_router(tenants.router, prefix="/api/v1")
-app.include_router(resources.router, prefix="/api/v1", dependencies=[Depends(get_temporal_client), Depends(get_async_session)])
-app.include_router(jobs.router, prefix="/api/v1", dependencies=[Depends(get_temporal_client), Depends(get_async_session)])
+# Before ``resources``: its ``/{category:path}`` route would swallow
+# ``/resources/summary``.
+app.include_router(metrics.router, prefix="/api/v1", dependencies=[Depends(get_read_session)])
+app.include_router(resources.router, prefix="/api/v1", dependencies=[Depends(get_temporal_client)])
+# Before ``jobs``: its ``/{job_id}`` route would swallow ``/jobs/events``.
+app.include_router(events.router, prefix="/api/v1")
+app.include_router(jobs.router, prefix="/api/v1", dependencies=[Depends(get_temporal_client)])
 app.include_router(callbacks.router, prefix="/api/v1")
-app.include_router(metrics.router, prefix="/api/v1", dependencies=[Depends(get_async_session)])
+app.include_router(exports.router, prefix="/api/v1")
+app.include_router(search.router, prefix="/api/v1", dependencies=[Depends(get_read_session)])
 
 
 @app.get("/healthz", tags=["system"])
 async def healthz() -> dict[str, str]:  # noqa: D401
     """Simple health check."""
     return {"status": "ok"}
+
+
+@app.get("/readyz", tags=["system"])
+async def readyz() -> Response:  # noqa: D401
+    """Readiness: 200 once warm-up (Temporal, DB pool, handler imports) is done, else 503."""
+    return ORJSONResponse(
+        {"status": "ready" if is_ready() else "warming_up", "checks": READINESS},
+        status_code=200 if is_ready() else 503,
+    )
+
+
+@app.get("/metrics", tags=["system"], include_in_schema=False)
+async def prometheus_metrics() -> Response:  # noqa: D401
+    """Prometheus exposition (route latency, plus stage histograms in-process)."""
+    payload, content_type = render_latest()
+    return Response(content=payload, media_type=content_type)
+
+
+# Last, once every route is registered: warns (strict mode: raises) about
+# routes missing from ``ROUTE_QUERY_BUDGETS``.
+check_budgets(app.routes)
@@ -6,10 +6,10 @@ import uuid
 from datetime import datetime
 from typing import Any, Dict, Optional
 
-from pydantic import BaseModel, field_validator
-from sqlalchemy import JSON, Enum, ForeignKey, String, Text
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from pydantic import BaseModel, Field, field_validator
+from sqlalchemy import JSON, BigInteger, Enum, ForeignKey, Index, String, Text, UniqueConstraint, event, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, Session, mapped_column, relationship
 
 from .db.session import Base
 
@@ -51,10 +51,18 @@ class JobType(str, enum.Enum):
 # -----------------------------------------------------------------------------
 # SQLAlchemy Models
 # -----------------------------------------------------------------------------
+#
+# Indexes are declared next to each model and mirrored by the Alembic
+# migrations in ``migrations/``; each one names the queries it serves.  Run
+# ``python dev/check_query_plans.py`` after changing a hot query.
 
 
 class Tenant(Base):
     __tablename__ = "tenants"
+    __table_args__ = (
+        # list_tenants keyset pagination
+        Index("ix_tenants_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name: Mapped[str] = mapped_column(String(100), unique=True, nullable=False)
@@ -67,12 +75,38 @@ class Tenant(Base):
 
 class Resource(Base):
     __tablename__ = "resources"
+    __table_args__ = (
+        # list_resources pages; rollup rebuild group-by (index-only on the
+        # (tenant_id, category) prefix)
+        Index("ix_resources_tenant_category_created", "tenant_id", "category", "created_at", "id"),
+        # export_resources (whole tenant, keyset order)
+        Index("ix_resources_tenant_created", "tenant_id", "created_at", "id"),
+        # search_resources containment / JSONPath filters (@>, @?, @@)
+        Index(
+            "ix_resources_last_observed_state",
+            "last_observed_state",
+            postgresql_using="gin",
+            postgresql_ops={"last_observed_state": "jsonb_path_ops"},
+        ),
+        # reconciler bulk upserts (one manifest per resource)
+        UniqueConstraint("tenant_id", "category", "name", name="uq_resources_tenant_category_name"),
+        # list_resources?drifted=true
+        Index("ix_resources_drifted", "tenant_id", "category", postgresql_where=text("drift_commit IS NOT NULL")),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     tenant_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("tenants.id", ondelete="CASCADE"))
     category: Mapped[ResourceCategory] = mapped_column(Enum(ResourceCategory, name="resource_category"))
     name: Mapped[str] = mapped_column(String(200))
-    last_observed_state: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
+    last_observed_state: Mapped[Dict[str, Any]] = mapped_column(JSONB, default=dict)
+    # Maintained by :mod:`gitops_orchestrator.reconciler`: the manifest's path
+    # and the commit it was last read at, plus the out-of-band commit (not
+    # made by the orchestrator) that last changed it – NULL while Git holds
+    # what the orchestrator wrote.
+    git_path: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    git_commit: Mapped[Optional[str]] = mapped_column(String(40), nullable=True)
+    drift_commit: Mapped[Optional[str]] = mapped_column(String(40), nullable=True)
+    drift_detected_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -82,14 +116,82 @@ class Resource(Base):
 
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "idempotency_key", name="uq_jobs_tenant_idempotency_key"),
+        # list_jobs / export_jobs keyset pages, queue-wait stats
+        Index("ix_jobs_tenant_created", "tenant_id", "created_at", "id"),
+        # list_jobs?status=… pages; rollup rebuild status counts (index-only)
+        Index("ix_jobs_tenant_status_created", "tenant_id", "status", "created_at", "id"),
+        # jobs of a resource; FK cascade / SET NULL from resources
+        Index("ix_jobs_resource_created", "resource_id", "created_at"),
+        # tenant_metrics recent queue-wait window
+        Index("ix_jobs_tenant_dispatched", "tenant_id", "dispatched_at"),
+        # scheduler queued heads per (tenant, priority); tenant_metrics queue depth
+        Index(
+            "ix_jobs_queued",
+            "tenant_id",
+            "priority",
+            "created_at",
+            "id",
+            postgresql_where=text("dispatched_at IS NULL AND status = 'pending'"),
+        ),
+        # scheduler: in-flight count per tenant
+        Index(
+            "ix_jobs_in_flight",
+            "tenant_id",
+            postgresql_where=text("dispatched_at IS NOT NULL AND status IN ('pending', 'running')"),
+        ),
+        # _start_job: in-flight jobs for the same resource (supersede)
+        Index(
+            "ix_jobs_active_resource",
+            "tenant_id",
+            "category",
+            "resource_name",
+            postgresql_where=text("status IN ('pending', 'running')"),
+        ),
+        # ON DELETE SET NULL of superseded_by_id
+        Index("ix_jobs_superseded_by", "superseded_by_id", postgresql_where=text("superseded_by_id IS NOT NULL")),
+        # search_jobs containment / JSONPath filters (@>, @?, @@)
+        Index(
+            "ix_jobs_input_payload",
+            "input_payload",
+            postgresql_using="gin",
+            postgresql_ops={"input_payload": "jsonb_path_ops"},
+        ),
+        Index(
+            "ix_jobs_result_payload",
+            "result_payload",
+            postgresql_using="gin",
+            postgresql_ops={"result_payload": "jsonb_path_ops"},
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     tenant_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("tenants.id", ondelete="CASCADE"))
     resource_id: Mapped[Optional[uuid.UUID]] = mapped_column(ForeignKey("resources.id", ondelete="SET NULL"))
     job_type: Mapped[JobType] = mapped_column(Enum(JobType, name="job_type"))
+    # Resource category path (e.g. ``compute/vms``) the job acts on.
+    category: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    # Name of the resource within (tenant, category); identifies jobs that
+    # supersede each other.
+    resource_name: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
     status: Mapped[JobStatus] = mapped_column(Enum(JobStatus, name="job_status"), default=JobStatus.pending)
-    input_payload: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
-    result_payload: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
+    # Scheduling: priority class and when the workflow was started (NULL while
+    # the job waits in the tenant-fair queue).
+    priority: Mapped[str] = mapped_column(String(32), default="normal")
+    dispatched_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
+    input_payload: Mapped[Dict[str, Any]] = mapped_column(JSONB, default=dict)
+    result_payload: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB, nullable=True)
+    # Client-supplied ``Idempotency-Key``; the job id is derived from it.
+    idempotency_key: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    # Newer job for the same resource that made this one obsolete (status
+    # ``cancelled``).
+    superseded_by_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        ForeignKey("jobs.id", ondelete="SET NULL"), nullable=True
+    )
+    # W3C ``traceparent`` of the submitting request; the workflow started
+    # later by the scheduler continues that trace (see ``tracing.py``).
+    traceparent: Mapped[Optional[str]] = mapped_column(String(55), nullable=True)
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -99,18 +201,71 @@ class Job(Base):
 
 
 class JobHistory(Base):
+    """Status transitions and callbacks of a job.
+
+    Range-partitioned by month on ``timestamp``, hence the composite primary
+    key; partitions are created and retired by :mod:`gitops_orchestrator.db.partitions`.
+    """
+
     __tablename__ = "job_history"
+    __table_args__ = (
+        # history of one job in order; FK cascade from jobs
+        Index("ix_job_history_job_timestamp", "job_id", "timestamp"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
 
-    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     job_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("jobs.id", ondelete="CASCADE"))
     status: Mapped[JobStatus] = mapped_column(Enum(JobStatus, name="job_status_history"))
-    timestamp: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    timestamp: Mapped[datetime] = mapped_column(primary_key=True, default=datetime.utcnow)
     message: Mapped[Optional[str]] = mapped_column(Text)
     extra_metadata: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON)  # renamed from 'metadata' to avoid SQLAlchemy reserved name
 
     job: Mapped["Job"] = relationship(back_populates="history")
 
 
+class RepoReconcileState(Base):
+    """Last commit of a resource repo reconciled into ``resources``."""
+
+    __tablename__ = "repo_reconcile_state"
+
+    repo_url: Mapped[str] = mapped_column(String(500), primary_key=True)
+    commit: Mapped[str] = mapped_column(String(40))
+    reconciled_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+
+
+class TenantRollup(Base):
+    """Pre-aggregated per-tenant counters for the metrics endpoints.
+
+    One row per (tenant, dimension, key), e.g. ``("job_status", "failed")``.
+    Maintained in the writing transaction by :mod:`gitops_orchestrator.db.rollups`.
+    """
+
+    __tablename__ = "tenant_rollups"
+
+    tenant_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("tenants.id", ondelete="CASCADE"), primary_key=True)
+    dimension: Mapped[str] = mapped_column(String(32), primary_key=True)
+    key: Mapped[str] = mapped_column(String(100), primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger, default=0)
+    last_job_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
+
+
+@event.listens_for(Session, "after_flush")
+def _update_tenant_rollups(session: Session, flush_context: Any) -> None:
+    """Keep ``tenant_rollups`` in sync with every ORM write (same transaction)."""
+    from .db.rollups import apply_flush_rollups
+
+    apply_flush_rollups(session)
+
+
+@event.listens_for(Session, "after_flush")
+def _notify_job_events(session: Session, flush_context: Any) -> None:
+    """``NOTIFY`` job creations and status changes (delivered on commit)."""
+    from .db.job_events import notify_flush_events
+
+    notify_flush_events(session)
+
+
 # -----------------------------------------------------------------------------
 # Pydantic Schemas (API layer)
 # -----------------------------------------------------------------------------
@@ -132,9 +287,15 @@ class ResourceCreateSchema(BaseModel):
 
 
 class ResourceSchema(ResourceCreateSchema):
+    # Resources do not persist the request payload; their state lives in
+    # ``last_observed_state``.
+    payload: Dict[str, Any] = Field(default_factory=dict)
     id: uuid.UUID
     tenant_id: uuid.UUID
     last_observed_state: Dict[str, Any]
+    git_commit: Optional[str] = None
+    drift_commit: Optional[str] = None
+    drift_detected_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
 
@@ -159,6 +320,7 @@ class JobSchema(JobCreateSchema):
     resource_id: Optional[uuid.UUID]
     status: JobStatus
     result_payload: Optional[Dict[str, Any]]
+    superseded_by_id: Optional[uuid.UUID] = None
     created_at: datetime
     updated_at: datetime
 
@@ -166,6 +328,16 @@ class JobSchema(JobCreateSchema):
         from_attributes = True
 
 
+class CallbackAcceptedSchema(BaseModel):
+    job_id: uuid.UUID
+    status: JobStatus
+    external_id: Optional[str]
+    received_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class JobHistorySchema(BaseModel):
     id: int
     job_id: uuid.UUID
@@ -0,0 +1,92 @@
+"""Keyset (cursor) pagination helpers for list endpoints.
+
+Pages are ordered by ``(created_at, id)`` and continue strictly after the
+last row of the previous page, so each page is a bounded index range scan no
+matter how many rows a tenant has.  Cursors are opaque, URL-safe strings; the
+next one is returned in the ``X-Next-Cursor`` response header (absent on the
+last page).
+
+Time filters (``created_after`` …) are typed :data:`UTCDateTime`.
+"""
+# No ``from __future__ import annotations``: FastAPI resolves the
+# ``PageParams.__init__`` annotations at runtime and a class has no
+# ``__globals__`` to look string annotations up in.
+import base64
+import uuid
+from datetime import datetime, timezone
+from typing import Annotated, Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query, Response
+from pydantic import AfterValidator
+from sqlalchemy import Select, tuple_
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Return *value* as naive UTC, the form the ``timestamp`` columns store.
+
+    Naive values are taken to be UTC already; comparing an aware value with
+    a naive column fails in the driver.
+    """
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+# Query parameter type for time filters: accepts ``Z`` / ``+02:00`` offsets.
+UTCDateTime = Annotated[datetime, AfterValidator(to_naive_utc)]
+
+
+class PageParams:
+    """FastAPI dependency bundling ``cursor`` and ``limit`` query parameters."""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description=f"Opaque cursor from a previous `{NEXT_CURSOR_HEADER}` header"),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum rows per page"),
+    ) -> None:
+        self.cursor = cursor
+        self.limit = limit
+
+
+def encode_cursor(created_at: datetime, row_id: Any) -> str:
+    """Return the opaque cursor pointing just after (*created_at*, *row_id*)."""
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Inverse of :func:`encode_cursor`; raises HTTP 400 on malformed input."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), uuid.UUID(row_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+def paginate(stmt: Select, created_col: Any, id_col: Any, page: PageParams) -> Select:
+    """Apply keyset ordering, the cursor predicate and ``limit + 1`` to *stmt*.
+
+    The extra row tells :func:`finish_page` whether another page exists.
+    """
+    if page.cursor:
+        created_at, row_id = decode_cursor(page.cursor)
+        stmt = stmt.where(tuple_(created_col, id_col) > tuple_(created_at, row_id))
+    return stmt.order_by(created_col, id_col).limit(page.limit + 1)
+
+
+def finish_page(rows: Sequence[Any], page: PageParams, response: Response) -> List[Any]:
+    """Trim the look-ahead row and set ``X-Next-Cursor`` when more rows exist.
+
+    *rows* must expose ``created_at`` and ``id`` attributes (ORM objects or
+    Core rows).
+    """
+    items = list(rows[: page.limit])
+    if len(rows) > page.limit:
+        last = items[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+    return items
@@ -0,0 +1,437 @@
+"""Incremental drift reconciliation between the GitOps repos and ``resources``.
+
+Every resource repo (``RESOURCE_REPO_MAP_JSON``) holds one manifest per
+resource at ``<tenant>/<category>/<name>.yaml`` (``.yml`` and ``.json`` work
+too): ``<tenant>`` is the tenant's name or id, ``<category>`` the category
+path or its last segment (``acme/vms/web-1.yaml``).  The reconciler keeps a
+bare mirror of each repo and remembers the last commit it reconciled
+(``repo_reconcile_state``).  A round fetches the branch and only re-reads
+what ``git diff --name-only <last>..<head>`` lists, so it costs time
+proportional to the change, not to the repo:
+
+* changed manifests are upserted into ``resources`` in bulk
+  (``last_observed_state`` is the parsed manifest);
+* a manifest whose newest change in the range is not an orchestrator commit
+  (subject ``GitOps: update <path>``) was edited out of band: its resource
+  gets ``drift_commit`` / ``drift_detected_at``, cleared again by the next
+  orchestrator commit to it.  Merge commits are ignored, so manifests merged
+  from an orchestrator PR branch count as the orchestrator's;
+* a manifest removed by the orchestrator deletes its resource; one removed by
+  hand flags it;
+* a repo's first round (or one after a force-push dropped the last commit)
+  reads the whole tree once and flags nothing.
+
+The rows and the new commit are written in one transaction, so a failed round
+is simply redone by the next.  Like the scheduler, one reconciler is active at
+a time (Postgres advisory lock)::
+
+    python -m gitops_orchestrator.reconciler [--once]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import subprocess
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import yaml
+from sqlalchemy import case, delete, func, literal_column, or_, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import AppSettings, get_settings
+from .db.rollups import DIM_RESOURCE_CATEGORY, RollupDeltas, rollup_upserts
+from .db.session import async_session, engine
+from .gitops.git_writer import MANAGED_COMMIT_PREFIX, GitOpsError, _git_env, _with_auth
+from .models import RepoReconcileState, Resource, ResourceCategory, Tenant
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary constant identifying the reconciler leader lock.
+_LEADER_LOCK_KEY = 0x6A0B5C4E
+
+_PARSERS = {".yaml": yaml.safe_load, ".yml": yaml.safe_load, ".json": json.loads}
+
+# Rows per upsert statement (11 bind parameters each; asyncpg allows 32767).
+_UPSERT_BATCH = 2500
+
+# (tenant segment, category, resource name) of a manifest path.
+ManifestKey = Tuple[str, ResourceCategory, str]
+
+
+def repo_layouts(repo_map: Mapping[str, str]) -> Dict[str, Dict[str, ResourceCategory]]:
+    """Map each repo URL to its manifest directory names and their categories.
+
+    Keys of *repo_map* are categories or category groups (``k8s``).
+    """
+    layouts: Dict[str, Dict[str, ResourceCategory]] = defaultdict(dict)
+    for key, url in repo_map.items():
+        for category in ResourceCategory:
+            if category.value == key or category.value.startswith(f"{key}/"):
+                layouts[url][category.value] = category
+                layouts[url][category.value.rsplit("/", 1)[-1]] = category
+    return dict(layouts)
+
+
+def parse_manifest_path(path: str, layout: Mapping[str, ResourceCategory]) -> Optional[ManifestKey]:
+    """Return the key of the resource *path* describes, ``None`` for other files."""
+    parts = path.split("/")
+    if len(parts) < 3:
+        return None
+    name, dot, suffix = parts[-1].rpartition(".")
+    category = layout.get("/".join(parts[1:-1]))
+    if not dot or f".{suffix}" not in _PARSERS or category is None:
+        return None
+    return parts[0], category, name
+
+
+def is_managed_commit(subject: str, path: str) -> bool:
+    """Whether a commit with *subject* changing *path* was made by the orchestrator."""
+    managed = f"{MANAGED_COMMIT_PREFIX}{path}"
+    # Squash-merged PRs append " (#123)" to the subject.
+    return subject == managed or subject.startswith(f"{managed} ")
+
+
+# -----------------------------------------------------------------------------
+# Git
+# -----------------------------------------------------------------------------
+
+
+def _git(repo: Path, *args: str, stdin: Optional[bytes] = None) -> bytes:
+    proc = subprocess.run(
+        ["git", "-c", "core.quotepath=off", *args],
+        cwd=repo,
+        input=stdin,
+        capture_output=True,
+        env=_git_env(),
+    )
+    if proc.returncode:
+        error = proc.stderr.decode(errors="replace").strip()
+        if get_settings().git_pat:
+            error = error.replace(get_settings().git_pat, "***")
+        raise GitOpsError(f"git {args[0]} failed: {error}")
+    return proc.stdout
+
+
+class RepoMirror:
+    """Bare mirror of one branch of a resource repo."""
+
+    def __init__(self, url: str, branch: str, root: Path) -> None:
+        self.url = url
+        self.branch = branch
+        digest = hashlib.sha1(url.encode()).hexdigest()[:12]
+        self.path = root / f"{url.rsplit('/', 1)[-1].removesuffix('.git')}-{digest}"
+
+    def fetch(self) -> str:
+        """Fetch the branch (incrementally after the first time); return its head."""
+        if not self.path.exists():
+            self.path.mkdir(parents=True)
+            _git(self.path, "init", "--quiet", "--bare")
+        ref = f"refs/heads/{self.branch}"
+        _git(self.path, "fetch", "--quiet", "--no-tags", _with_auth(self.url), f"+{ref}:{ref}")
+        return _git(self.path, "rev-parse", ref).decode().strip()
+
+    def has_commit(self, sha: str) -> bool:
+        try:
+            _git(self.path, "cat-file", "-e", f"{sha}^{{commit}}")
+        except GitOpsError:
+            return False
+        return True
+
+    def changed_paths(self, old: str, new: str) -> List[str]:
+        return _git(self.path, "diff", "--name-only", "--no-renames", old, new).decode().splitlines()
+
+    def all_paths(self, commit: str) -> List[str]:
+        return _git(self.path, "ls-tree", "-r", "--name-only", commit).decode().splitlines()
+
+    def last_changes(self, old: str, new: str) -> Dict[str, Tuple[str, str]]:
+        """Map each path changed in ``old..new`` to the (sha, subject) of its newest non-merge commit."""
+        out = _git(
+            self.path, "log", "--reverse", "--topo-order", "--no-merges", "--no-renames",
+            "--name-only", "--format=%x1e%H%x1f%s", f"{old}..{new}",
+        ).decode()
+        changes: Dict[str, Tuple[str, str]] = {}
+        for entry in out.split("\x1e")[1:]:
+            header, _, names = entry.partition("\n")
+            sha, _, subject = header.partition("\x1f")
+            for path in names.splitlines():
+                if path:
+                    changes[path] = (sha, subject)
+        return changes
+
+    def read_files(self, commit: str, paths: Iterable[str]) -> Dict[str, Optional[bytes]]:
+        """Return the content of *paths* at *commit* (``None`` if absent), in one ``cat-file`` call."""
+        paths = list(paths)
+        if not paths:
+            return {}
+        out = _git(self.path, "cat-file", "--batch", stdin="".join(f"{commit}:{p}\n" for p in paths).encode())
+        files: Dict[str, Optional[bytes]] = {}
+        pos = 0
+        for path in paths:
+            end = out.index(b"\n", pos)
+            header = out[pos:end].split()
+            if header[-1] == b"missing":
+                files[path] = None
+                pos = end + 1
+                continue
+            size = int(header[2])
+            files[path] = out[end + 1 : end + 1 + size]
+            pos = end + 1 + size + 1
+        return files
+
+
+# -----------------------------------------------------------------------------
+# Reconciliation
+# -----------------------------------------------------------------------------
+
+
+def _parse(path: str, content: bytes) -> Optional[Dict[str, Any]]:
+    try:
+        state = _PARSERS["." + path.rpartition(".")[2]](content)
+    except (ValueError, yaml.YAMLError) as exc:
+        logger.warning("Skipping unparseable manifest %s: %s", path, exc)
+        return None
+    if not isinstance(state, dict):
+        logger.warning("Skipping manifest %s: not a mapping", path)
+        return None
+    return state
+
+
+async def _tenant_ids(db: AsyncSession, segments: Iterable[str]) -> Dict[str, uuid.UUID]:
+    """Resolve tenant path segments (names or ids) to tenant ids."""
+    segments = set(segments)
+    ids = set()
+    for segment in segments:
+        try:
+            ids.add(uuid.UUID(segment))
+        except ValueError:
+            pass
+    if not segments:
+        return {}
+    rows = await db.execute(select(Tenant.id, Tenant.name).where(or_(Tenant.name.in_(segments), Tenant.id.in_(ids))))
+    resolved = {}
+    for tenant_id, name in rows.all():
+        resolved[name] = tenant_id
+        resolved[str(tenant_id)] = tenant_id
+    return resolved
+
+
+def _upsert(rows: List[Dict[str, Any]], *, track_drift: bool) -> Any:
+    stmt = insert(Resource).values(rows)
+    set_ = {
+        "last_observed_state": stmt.excluded.last_observed_state,
+        "git_path": stmt.excluded.git_path,
+        "git_commit": stmt.excluded.git_commit,
+        "updated_at": stmt.excluded.updated_at,
+    }
+    if track_drift:
+        set_["drift_commit"] = stmt.excluded.drift_commit
+        # Keep when the resource first drifted until the drift is cleared.
+        set_["drift_detected_at"] = case(
+            (stmt.excluded.drift_commit.is_(None), None),
+            else_=func.coalesce(Resource.drift_detected_at, stmt.excluded.drift_detected_at),
+        )
+    return stmt.on_conflict_do_update(constraint="uq_resources_tenant_category_name", set_=set_).returning(
+        Resource.tenant_id, Resource.category, literal_column("xmax = 0").label("inserted")
+    )
+
+
+class ReconcileResult:
+    """Outcome of one repo's round."""
+
+    def __init__(self, old: Optional[str], new: str) -> None:
+        self.old = old
+        self.new = new
+        self.changed = 0
+        self.upserted = 0
+        self.deleted = 0
+        self.out_of_band: List[str] = []
+
+
+class Reconciler:
+    """Reconciles the configured resource repos into ``resources``."""
+
+    def __init__(self, settings: AppSettings) -> None:
+        self.settings = settings
+        self.layouts = repo_layouts(settings.resource_repo_map)
+        root = Path(settings.reconciler_mirror_dir)
+        self.mirrors = {url: RepoMirror(url, settings.reconciler_branch, root) for url in self.layouts}
+
+    async def reconcile_repo(self, url: str) -> Optional[ReconcileResult]:
+        """Bring ``resources`` up to date with *url*'s branch; ``None`` if nothing changed."""
+        mirror = self.mirrors[url]
+        layout = self.layouts[url]
+        head = await asyncio.to_thread(mirror.fetch)
+
+        async with async_session() as db:
+            state = await db.get(RepoReconcileState, url)
+            if state is not None and state.commit == head:
+                return None
+            result = ReconcileResult(state.commit if state else None, head)
+            incremental = state is not None and await asyncio.to_thread(mirror.has_commit, state.commit)
+            if incremental:
+                paths = await asyncio.to_thread(mirror.changed_paths, state.commit, head)
+                commits = await asyncio.to_thread(mirror.last_changes, state.commit, head)
+            else:
+                if state is not None:
+                    logger.warning("Commit %s of %s is gone (force-push?); re-reading the whole tree", state.commit, url)
+                paths = await asyncio.to_thread(mirror.all_paths, head)
+                commits = {}
+
+            manifests = {path: key for path in paths if (key := parse_manifest_path(path, layout))}
+            result.changed = len(manifests)
+            files = await asyncio.to_thread(mirror.read_files, head, manifests)
+            tenants = await _tenant_ids(db, (key[0] for key in manifests.values()))
+
+            now = datetime.utcnow()
+            rows: Dict[Tuple[uuid.UUID, ResourceCategory, str], Dict[str, Any]] = {}
+            removed: List[Tuple[uuid.UUID, ResourceCategory, str]] = []
+            removed_by_hand: Dict[str, List[Tuple[uuid.UUID, ResourceCategory, str]]] = defaultdict(list)
+            for path, (segment, category, name) in manifests.items():
+                tenant_id = tenants.get(segment)
+                if tenant_id is None:
+                    logger.debug("Skipping %s: unknown tenant '%s'", path, segment)
+                    continue
+                sha, subject = commits.get(path, (None, ""))
+                drift = sha if sha is not None and not is_managed_commit(subject, path) else None
+                if drift is not None:
+                    result.out_of_band.append(path)
+                content = files[path]
+                if content is None:
+                    if drift is None:
+                        removed.append((tenant_id, category, name))
+                    else:
+                        removed_by_hand[drift].append((tenant_id, category, name))
+                    continue
+                observed = _parse(path, content)
+                if observed is None:
+                    continue
+                # One row per resource, even if several paths name it.
+                rows[(tenant_id, category, name)] = {
+                    "id": uuid.uuid4(),
+                    "tenant_id": tenant_id,
+                    "category": category,
+                    "name": name,
+                    "last_observed_state": observed,
+                    "git_path": path,
+                    "git_commit": head,
+                    "drift_commit": drift,
+                    "drift_detected_at": now if drift else None,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+
+            deltas = RollupDeltas()
+            key_columns = tuple_(Resource.tenant_id, Resource.category, Resource.name)
+            # A manifest moved to another path (e.g. .yml -> .yaml) keeps its resource.
+            removed = [key for key in removed if key not in rows]
+            if removed:
+                stmt = delete(Resource).where(key_columns.in_(removed)).returning(Resource.tenant_id, Resource.category)
+                for tenant_id, category in (await db.execute(stmt)).all():
+                    deltas.add(tenant_id, DIM_RESOURCE_CATEGORY, category, -1)
+                    result.deleted += 1
+            values = list(rows.values())
+            for start in range(0, len(values), _UPSERT_BATCH):
+                stmt = _upsert(values[start : start + _UPSERT_BATCH], track_drift=incremental)
+                for tenant_id, category, inserted in (await db.execute(stmt)).all():
+                    if inserted:
+                        deltas.add(tenant_id, DIM_RESOURCE_CATEGORY, category, +1)
+            result.upserted = len(values)
+            for drift, keys in removed_by_hand.items():
+                await db.execute(
+                    update(Resource)
+                    .where(key_columns.in_(keys))
+                    .values(
+                        git_commit=head,
+                        drift_commit=drift,
+                        drift_detected_at=func.coalesce(Resource.drift_detected_at, now),
+                        updated_at=now,
+                    )
+                )
+            # Core DML bypasses the ORM rollup hook.
+            for stmt in rollup_upserts(deltas):
+                await db.execute(stmt)
+
+            upsert_state = insert(RepoReconcileState).values(repo_url=url, commit=head, reconciled_at=now)
+            await db.execute(
+                upsert_state.on_conflict_do_update(
+                    index_elements=[RepoReconcileState.repo_url],
+                    set_={"commit": upsert_state.excluded.commit, "reconciled_at": upsert_state.excluded.reconciled_at},
+                )
+            )
+            await db.commit()
+        return result
+
+    async def reconcile_once(self) -> None:
+        """Reconcile every repo once (concurrently); failures are logged per repo."""
+
+        async def one(url: str) -> None:
+            start = time.perf_counter()
+            try:
+                result = await self.reconcile_repo(url)
+            except Exception:  # noqa: BLE001 – other repos go on; retried next round
+                logger.exception("Reconciling %s failed", url)
+                return
+            if result is None:
+                return
+            logger.info(
+                "Reconciled %s %s..%s in %.2fs: %d manifests changed, %d upserted, %d deleted",
+                url, (result.old or "(full)")[:12], result.new[:12], time.perf_counter() - start,
+                result.changed, result.upserted, result.deleted,
+            )
+            if result.out_of_band:
+                logger.warning(
+                    "Out-of-band edits in %s: %s", url, ", ".join(sorted(result.out_of_band)[:20])
+                    + (" …" if len(result.out_of_band) > 20 else "")
+                )
+
+        await asyncio.gather(*(one(url) for url in self.mirrors))
+
+    async def run(self) -> None:
+        """Reconcile every ``RECONCILER_INTERVAL_SECONDS`` while holding the leader lock."""
+        interval = self.settings.reconciler_interval_seconds
+        lock = {"key": _LEADER_LOCK_KEY}
+        while True:
+            async with engine.connect() as lock_conn:
+                leader = (await lock_conn.execute(text("SELECT pg_try_advisory_lock(:key)"), lock)).scalar()
+                await lock_conn.commit()
+                if leader:
+                    logger.info("Acquired reconciler leader lock")
+                    try:
+                        while True:
+                            started = time.monotonic()
+                            await self.reconcile_once()
+                            await asyncio.sleep(max(interval - (time.monotonic() - started), 0))
+                    finally:
+                        await lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), lock)
+                        await lock_conn.commit()
+            logger.debug("Another reconciler holds the leader lock; standing by")
+            await asyncio.sleep(interval)
+
+
+async def main(argv: Optional[list] = None) -> None:  # noqa: D401
+    parser = argparse.ArgumentParser(prog="python -m gitops_orchestrator.reconciler")
+    parser.add_argument("--once", action="store_true", help="run a single round and exit")
+    args = parser.parse_args(argv)
+
+    reconciler = Reconciler(get_settings())
+    try:
+        if args.once:
+            await reconciler.reconcile_once()
+        else:
+            await reconciler.run()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
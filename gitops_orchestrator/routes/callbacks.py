@@ -4,38 +4,44 @@ from __future__ import annotations
 import uuid
 from typing import Dict
 
-from fastapi import APIRouter, HTTPException, Path, status, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, HTTPException, Path, status
 
-from ..db.session import get_async_session
-from ..models import Job, JobHistory, JobStatus, JobHistorySchema
+from ..callback_queue import Callback, CallbackQueueFull, get_queue
+from ..models import CallbackAcceptedSchema, JobStatus
+from ..serialization import model_response
 
 router = APIRouter(prefix="/tenants/{tenant_id}/callbacks", tags=["callbacks"])
 
+# Seconds vendors are asked to wait before retrying a rejected callback.
+_RETRY_AFTER_SECONDS = 1
 
-@router.post("/{job_id}", response_model=JobHistorySchema, status_code=status.HTTP_202_ACCEPTED)
+
+@router.post("/{job_id}", response_model=CallbackAcceptedSchema, status_code=status.HTTP_202_ACCEPTED)
 async def post_callback(
     tenant_id: uuid.UUID,
     job_id: uuid.UUID = Path(...),
     payload: Dict[str, object] | None = None,
-    db: AsyncSession = Depends(get_async_session),
 ):  # noqa: D401
-    job = await db.get(Job, job_id)
-    if not job or job.tenant_id != tenant_id:
-        raise HTTPException(status_code=404, detail="Job not found")
-
+    """Accept a vendor status update; it is written in the background (``callback_queue.py``)."""
+    payload = payload or {}
     status_str = str(payload.get("status", "")).lower()
     if status_str not in JobStatus.__members__:
         raise HTTPException(status_code=400, detail="Invalid status value")
-
-    job.status = JobStatus[status_str]
-    history = JobHistory(
-        job_id=job.id,
-        status=job.status,
-        message=payload.get("external_id"),
-        extra_metadata=payload.get("metadata"),
+    external_id = payload.get("external_id")
+
+    callback = Callback(
+        tenant_id=tenant_id,
+        job_id=job_id,
+        status=JobStatus[status_str],
+        external_id=str(external_id) if external_id is not None else None,
+        metadata=payload.get("metadata"),
     )
-    db.add(history)
-    await db.commit()
-    await db.refresh(history)
-    return JobHistorySchema.model_validate(history)
+    try:
+        get_queue().submit(callback)
+    except CallbackQueueFull as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Callback queue full, retry later ({exc})",
+            headers={"Retry-After": str(_RETRY_AFTER_SECONDS)},
+        ) from exc
+    return model_response(CallbackAcceptedSchema, callback, status_code=status.HTTP_202_ACCEPTED)
@@ -0,0 +1,113 @@
+"""Server-Sent Events streams of job status changes.
+
+Clients wait for a job with one idle connection instead of polling
+``GET /jobs/{job_id}``::
+
+    curl -N /api/v1/tenants/<tenant>/jobs/<job>/events
+
+Each event is ``event: status`` with a JSON body (``job_id``, ``tenant_id``,
+``status``, ``previous_status``, ``message``, ``at``).  The job stream starts
+with the current status and ends after a terminal one; the tenant stream
+(``/jobs/events``) carries every job of the tenant until the client leaves.
+Comment lines keep idle streams open.  An ``event: resync`` means events
+were lost (slow client, listener reconnect, shutdown): reconnect and re-read
+the state.  See :mod:`gitops_orchestrator.db.job_events` for the plumbing.
+"""
+from __future__ import annotations
+
+import uuid
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from ..config import get_settings
+from ..db.job_events import JobEvent, Subscription, SubscriptionLost, get_hub, job_event
+from ..db.job_state import TERMINAL_STATUSES
+from ..db.session import async_session
+from ..models import Job
+
+router = APIRouter(prefix="/tenants/{tenant_id}/jobs", tags=["jobs"])
+
+EVENT_STREAM_MEDIA_TYPE = "text/event-stream"
+
+_STREAM_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # nginx: do not buffer the stream
+}
+
+# Client reconnect delay (milliseconds) announced at the start of a stream.
+_RETRY_MS = 3000
+
+
+def _sse(event: str, data: str) -> bytes:
+    return f"event: {event}\ndata: {data}\n\n".encode()
+
+
+async def _subscribe(tenant_id: uuid.UUID, job_id: Optional[uuid.UUID] = None) -> Subscription:
+    try:
+        return await get_hub().subscribe(tenant_id, job_id)
+    except ConnectionError as exc:
+        raise HTTPException(status_code=503, detail="Job event stream unavailable") from exc
+
+
+async def _stream(subscription: Subscription, first: Optional[JobEvent] = None) -> AsyncIterator[bytes]:
+    """Yield *first*, then the subscription's events as they arrive."""
+    keepalive = get_settings().job_events_keepalive_seconds
+    terminal = {status.value for status in TERMINAL_STATUSES}
+    yield f"retry: {_RETRY_MS}\n\n".encode()
+    last_status = None
+    event = first
+    while True:
+        # A transition committed between subscribing and the job's snapshot
+        # arrives once more; repeated statuses of a job are skipped.
+        if event is not None and (subscription.job_id is None or event.status != last_status):
+            yield _sse("status", event.payload())
+            last_status = event.status
+            if subscription.job_id is not None and event.status in terminal:
+                return
+        try:
+            event = await subscription.next(keepalive)
+        except SubscriptionLost as exc:
+            yield _sse("resync", f'{{"reason":"{exc}"}}')
+            return
+        if event is None:
+            yield b": keepalive\n\n"
+
+
+def _response(subscription: Subscription, first: Optional[JobEvent] = None) -> StreamingResponse:
+    # The background task runs once the stream ends or the client disconnects,
+    # even if the body was never started.
+    return StreamingResponse(
+        _stream(subscription, first),
+        media_type=EVENT_STREAM_MEDIA_TYPE,
+        headers=_STREAM_HEADERS,
+        background=BackgroundTask(get_hub().unsubscribe, subscription),
+    )
+
+
+@router.get("/events", response_class=StreamingResponse)
+async def tenant_job_events(tenant_id: uuid.UUID) -> StreamingResponse:  # noqa: D401
+    """Stream status changes of every job of the tenant (Server-Sent Events)."""
+    subscription = await _subscribe(tenant_id)
+    return _response(subscription)
+
+
+@router.get("/{job_id}/events", response_class=StreamingResponse)
+async def job_events(tenant_id: uuid.UUID, job_id: uuid.UUID) -> StreamingResponse:  # noqa: D401
+    """Stream the job's current status, then its changes until it finishes (Server-Sent Events)."""
+    # Subscribe before reading the snapshot so no transition falls in between;
+    # read it on the primary, which is what the notifications reflect.  The
+    # session is closed before streaming starts.
+    subscription = await _subscribe(tenant_id, job_id)
+    try:
+        async with async_session() as db:
+            job = await db.get(Job, job_id)
+    except BaseException:
+        get_hub().unsubscribe(subscription)
+        raise
+    if not job or job.tenant_id != tenant_id:
+        get_hub().unsubscribe(subscription)
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _response(subscription, job_event(job))
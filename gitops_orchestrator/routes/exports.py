@@ -0,0 +1,125 @@
+"""Bulk NDJSON export of a tenant's resources and jobs.
+
+Rows are streamed from a server-side cursor (``AsyncSession.stream`` with
+``yield_per``) and serialised straight from Core rows, without building ORM
+objects or validating Pydantic models, so memory stays flat regardless of
+tenant size.  The ASGI server only pulls the next chunk once the previous one
+has been written to the socket, which gives natural backpressure.
+"""
+from __future__ import annotations
+
+import enum
+import json
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional
+
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, select
+
+from ..db.session import read_session, wants_primary
+from ..models import Job, JobStatus, Resource, ResourceCategory
+from ..pagination import UTCDateTime
+
+router = APIRouter(prefix="/tenants/{tenant_id}/export", tags=["export"])
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Rows fetched per round trip from the server-side cursor.
+_YIELD_PER = 1000
+# Approximate size of each chunk handed to the ASGI server.
+_CHUNK_BYTES = 64 * 1024
+
+_RESOURCE_COLUMNS = (
+    Resource.id,
+    Resource.tenant_id,
+    Resource.category,
+    Resource.name,
+    Resource.last_observed_state,
+    Resource.git_commit,
+    Resource.drift_commit,
+    Resource.drift_detected_at,
+    Resource.created_at,
+    Resource.updated_at,
+)
+_JOB_COLUMNS = (
+    Job.id,
+    Job.tenant_id,
+    Job.resource_id,
+    Job.job_type,
+    Job.category,
+    Job.resource_name,
+    Job.status,
+    Job.priority,
+    Job.input_payload,
+    Job.result_payload,
+    Job.superseded_by_id,
+    Job.created_at,
+    Job.updated_at,
+)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+async def _ndjson_rows(stmt: Select, *, primary: bool = False) -> AsyncIterator[bytes]:
+    """Yield *stmt* rows as NDJSON, batched into ~``_CHUNK_BYTES`` chunks.
+
+    Opens its own (replica, unless *primary*) session: dependency-managed
+    sessions are closed before a streaming response body is sent.
+    """
+    async with read_session(primary=primary) as db:
+        result = await db.stream(stmt.execution_options(yield_per=_YIELD_PER))
+        chunk: list[str] = []
+        size = 0
+        async for row in result:
+            line = json.dumps(row._asdict(), default=_json_default, separators=(",", ":")) + "\n"
+            chunk.append(line)
+            size += len(line)
+            if size >= _CHUNK_BYTES:
+                yield "".join(chunk).encode()
+                chunk, size = [], 0
+        if chunk:
+            yield "".join(chunk).encode()
+
+
+@router.get("/resources", response_class=StreamingResponse)
+async def export_resources(
+    tenant_id: uuid.UUID,
+    request: Request,
+    category: Optional[ResourceCategory] = Query(None),
+    updated_after: Optional[UTCDateTime] = Query(None, description="Only resources updated at or after this time"),
+) -> StreamingResponse:  # noqa: D401
+    """Stream every resource of the tenant as one JSON object per line."""
+    stmt = select(*_RESOURCE_COLUMNS).where(Resource.tenant_id == tenant_id)
+    if category is not None:
+        stmt = stmt.where(Resource.category == category)
+    if updated_after is not None:
+        stmt = stmt.where(Resource.updated_at >= updated_after)
+    stmt = stmt.order_by(Resource.created_at, Resource.id)
+    return StreamingResponse(_ndjson_rows(stmt, primary=wants_primary(request)), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.get("/jobs", response_class=StreamingResponse)
+async def export_jobs(
+    tenant_id: uuid.UUID,
+    request: Request,
+    status: Optional[JobStatus] = Query(None),
+    created_after: Optional[UTCDateTime] = Query(None, description="Only jobs created at or after this time"),
+) -> StreamingResponse:  # noqa: D401
+    """Stream every job of the tenant as one JSON object per line."""
+    stmt = select(*_JOB_COLUMNS).where(Job.tenant_id == tenant_id)
+    if status is not None:
+        stmt = stmt.where(Job.status == status)
+    if created_after is not None:
+        stmt = stmt.where(Job.created_at >= created_after)
+    stmt = stmt.order_by(Job.created_at, Job.id)
+    return StreamingResponse(_ndjson_rows(stmt, primary=wants_primary(request)), media_type=NDJSON_MEDIA_TYPE)
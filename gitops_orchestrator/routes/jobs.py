@@ -2,30 +2,65 @@
 from __future__ import annotations
 
 import uuid
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Path
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response
+from sqlalchemy import Select
 from sqlalchemy.ext.asyncio import AsyncSession
-from ..db.session import get_async_session
-from ..models import Job, JobSchema, JobStatus
+from ..config import get_settings
+from ..db.job_state import transition_job
+from ..db.session import get_async_session, get_or_primary, get_read_session, mark_write
+from ..models import Job, JobSchema, JobStatus, JobType
+from ..pagination import PageParams, UTCDateTime, finish_page, paginate
+from ..serialization import JOB_COLUMNS, json_response, model_response
+from ..scheduler import start_job_workflow
 
 router = APIRouter(prefix="/tenants/{tenant_id}/jobs", tags=["jobs"])
 
 
+def list_jobs_query(
+    tenant_id: uuid.UUID,
+    status: Optional[JobStatus] = None,
+    job_type: Optional[JobType] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+) -> Select:
+    """The ``list_jobs`` statement before pagination (also EXPLAINed by ``dev/check_query_plans.py``)."""
+    stmt = JOB_COLUMNS.select().where(Job.tenant_id == tenant_id)
+    if status is not None:
+        stmt = stmt.where(Job.status == status)
+    if job_type is not None:
+        stmt = stmt.where(Job.job_type == job_type)
+    if created_after is not None:
+        stmt = stmt.where(Job.created_at >= created_after)
+    if created_before is not None:
+        stmt = stmt.where(Job.created_at < created_before)
+    return stmt
+
+
 @router.get("", response_model=List[JobSchema])
-async def list_jobs(tenant_id: uuid.UUID, db: AsyncSession = Depends(get_async_session)) -> List[JobSchema]:  # noqa: D401
-    stmt = select(Job).where(Job.tenant_id == tenant_id)
-    jobs = (await db.execute(stmt)).scalars().all()
-    return [JobSchema.model_validate(j) for j in jobs]
+async def list_jobs(
+    tenant_id: uuid.UUID,
+    response: Response,
+    status: Optional[JobStatus] = Query(None),
+    job_type: Optional[JobType] = Query(None),
+    created_after: Optional[UTCDateTime] = Query(None, description="Only jobs created at or after this time"),
+    created_before: Optional[UTCDateTime] = Query(None, description="Only jobs created before this time"),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_session),
+) -> List[JobSchema]:  # noqa: D401
+    stmt = list_jobs_query(tenant_id, status, job_type, created_after, created_before)
+    rows = (await db.execute(paginate(stmt, Job.created_at, Job.id, page))).all()
+    return json_response(JOB_COLUMNS.dump(finish_page(rows, page, response)), response)
 
 
 @router.get("/{job_id}", response_model=JobSchema)
-async def get_job(tenant_id: uuid.UUID, job_id: uuid.UUID, db: AsyncSession = Depends(get_async_session)) -> JobSchema:  # noqa: D401
-    job = await db.get(Job, job_id)
+async def get_job(tenant_id: uuid.UUID, job_id: uuid.UUID, db: AsyncSession = Depends(get_read_session)) -> JobSchema:  # noqa: D401
+    job = await get_or_primary(db, Job, job_id)
     if not job or job.tenant_id != tenant_id:
         raise HTTPException(status_code=404, detail="Job not found")
-    return JobSchema.model_validate(job)
+    return model_response(JobSchema, job)
 
 
 @router.post("/{job_id}/retry", response_model=JobSchema)
@@ -40,27 +75,18 @@ async def retry_job(
     if job.status != JobStatus.failed:
         raise HTTPException(status_code=400, detail="Only failed jobs can be retried")
 
-    # Restart workflow with same parameters
-    # Lazy import Temporal client and JobWorkflow to avoid sandbox issues
-    from temporalio.client import Client
-    from ..workflows.job_workflow import JobWorkflow
-    from ..main import get_temporal_client
-
-    temporal: Client = await get_temporal_client()
-    await temporal.start_workflow(
-        JobWorkflow.run,
-        id=str(uuid.uuid4()),  # new workflow ID
-        task_queue="gitops-jobs",
-        args=[],
-        kwargs={
-            "job_id": str(job.id),
-            "tenant_id": str(tenant_id),
-            "category": job.input_payload.get("category"),
-            "job_type": job.job_type.value,
-            "payload": job.input_payload,
-        },
-    )
-    job.status = JobStatus.pending
+    # Re-queue first so the restarted workflow's "running" is never overwritten.
+    settings = get_settings()
+    transition_job(db, job, JobStatus.pending, message="Retry requested")
+    job.dispatched_at = None if settings.scheduler_enabled else datetime.utcnow()
     await db.commit()
-    await db.refresh(job)
-    return JobSchema.model_validate(job)
+
+    if not settings.scheduler_enabled:
+        # Lazy import Temporal client to avoid sandbox issues
+        from temporalio.client import Client
+        from ..main import get_temporal_client
+
+        temporal: Client = await get_temporal_client()
+        # Reuses the job id as workflow id so vendor callbacks can signal the retry.
+        await start_job_workflow(temporal, job)
+    return mark_write(model_response(JobSchema, job))
@@ -2,51 +2,81 @@
 from __future__ import annotations
 
 import uuid
-from typing import Dict, List
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
 
 from fastapi import APIRouter, Depends
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..db.session import get_async_session
-from ..models import Job, JobStatus, Resource, ResourceCategory
+from ..db.rollups import DIM_JOB_CATEGORY, DIM_JOB_STATUS, DIM_RESOURCE_CATEGORY
+from ..db.session import get_read_session
+from ..models import Job, JobStatus, TenantRollup
 
 router = APIRouter(prefix="/tenants/{tenant_id}", tags=["metrics"])
 
+# Window for the recent queue-wait statistics in ``tenant_metrics``.
+_QUEUE_WAIT_WINDOW = timedelta(minutes=15)
+
 
 @router.get("/resources/summary")
-async def resource_summary(tenant_id: uuid.UUID, db: AsyncSession = Depends(get_async_session)) -> Dict[str, int]:  # noqa: D401
-    stmt = (
-        select(Resource.category, func.count())
-        .where(Resource.tenant_id == tenant_id)
-        .group_by(Resource.category)
-    )
-    rows = (await db.execute(stmt)).all()
-    return {row[0]: row[1] for row in rows}
+async def resource_summary(tenant_id: uuid.UUID, db: AsyncSession = Depends(get_read_session)) -> Dict[str, int]:  # noqa: D401
+    rows = await _rollups(db, tenant_id, DIM_RESOURCE_CATEGORY)
+    return {row.key: row.count for row in rows if row.count > 0}
 
 
 @router.get("/metrics")
-async def tenant_metrics(tenant_id: uuid.UUID, db: AsyncSession = Depends(get_async_session)) -> Dict[str, object]:  # noqa: D401
+async def tenant_metrics(tenant_id: uuid.UUID, db: AsyncSession = Depends(get_read_session)) -> Dict[str, object]:  # noqa: D401
+    rows = await _rollups(db, tenant_id, DIM_JOB_STATUS, DIM_JOB_CATEGORY)
     # Job counts by status
-    stmt_jobs = (
-        select(Job.status, func.count())
-        .where(Job.tenant_id == tenant_id)
-        .group_by(Job.status)
-    )
-    job_rows = (await db.execute(stmt_jobs)).all()
-    jobs_by_status = {row[0]: row[1] for row in job_rows}
-
+    jobs_by_status = {row.key: row.count for row in rows if row.dimension == DIM_JOB_STATUS and row.count > 0}
     # Last job timestamp per resource type
-    stmt_last = (
-        select(Resource.category, func.max(Job.created_at))
-        .join(Job, Resource.id == Job.resource_id)
-        .where(Resource.tenant_id == tenant_id)
-        .group_by(Resource.category)
-    )
-    last_rows = (await db.execute(stmt_last)).all()
-    last_job_ts = {row[0]: row[1].isoformat() if row[1] else None for row in last_rows}
+    last_job_ts = {
+        row.key: row.last_job_at.isoformat() if row.last_job_at else None
+        for row in rows
+        if row.dimension == DIM_JOB_CATEGORY and row.count > 0
+    }
 
     return {
         "jobs": jobs_by_status,
         "last_job_ts": last_job_ts,
+        "queue": await _queue_stats(db, tenant_id),
+    }
+
+
+async def _rollups(db: AsyncSession, tenant_id: uuid.UUID, *dimensions: str) -> List[Any]:
+    """Pre-aggregated counters (see :mod:`..db.rollups`) instead of GROUP BYs over jobs."""
+    stmt = select(TenantRollup.dimension, TenantRollup.key, TenantRollup.count, TenantRollup.last_job_at).where(
+        TenantRollup.tenant_id == tenant_id, TenantRollup.dimension.in_(dimensions)
+    )
+    return list((await db.execute(stmt)).all())
+
+
+async def _queue_stats(db: AsyncSession, tenant_id: uuid.UUID) -> Dict[str, object]:
+    """Scheduler queue depth and wait (``created_at`` ➜ ``dispatched_at``) for a tenant.
+
+    Two narrow queries served by ``ix_jobs_queued`` and
+    ``ix_jobs_tenant_dispatched`` rather than one pass over all tenant jobs.
+    """
+    now = datetime.utcnow()
+    queued_count, oldest = (
+        await db.execute(
+            select(func.count(), func.min(Job.created_at)).where(
+                Job.tenant_id == tenant_id, Job.dispatched_at.is_(None), Job.status == JobStatus.pending
+            )
+        )
+    ).one()
+    wait_seconds = func.extract("epoch", Job.dispatched_at - Job.created_at)
+    avg_wait, max_wait = (
+        await db.execute(
+            select(func.avg(wait_seconds), func.max(wait_seconds)).where(
+                Job.tenant_id == tenant_id, Job.dispatched_at >= now - _QUEUE_WAIT_WINDOW
+            )
+        )
+    ).one()
+    return {
+        "queued": queued_count,
+        "oldest_wait_seconds": (now - oldest).total_seconds() if oldest else 0.0,
+        "avg_wait_seconds_15m": float(avg_wait or 0.0),
+        "max_wait_seconds_15m": float(max_wait or 0.0),
     }
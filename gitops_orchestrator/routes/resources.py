@@ -1,19 +1,39 @@
 """Resource API routes (CRUDL) scoped by tenant."""
 from __future__ import annotations
 
+import logging
 import uuid
-from typing import Any, Dict, List
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Path, status, Body
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Header, Path, Query, Response, status, Body
+from sqlalchemy import Select, select, text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..db.session import get_async_session
-from ..models import Job, JobCreateSchema, JobSchema, Resource, ResourceCategory, ResourceCreateSchema, ResourceSchema
+from ..config import get_settings
+from ..db.job_state import mark_superseded
+from ..db.session import get_async_session, get_or_primary, get_read_session, mark_write
+from ..models import Job, JobCreateSchema, JobSchema, JobStatus, Resource, ResourceCategory, ResourceCreateSchema, ResourceSchema
+from ..pagination import PageParams, UTCDateTime, finish_page, paginate
+from ..scheduler import start_job_workflow
+from ..serialization import RESOURCE_COLUMNS, json_response, model_response
+from ..tracing import current_traceparent
 from ..workflows.job_workflow import JobWorkflow
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/tenants/{tenant_id}/resources", tags=["resources"])
 
+# Namespace for deriving job ids from idempotency keys (never change it: the
+# derived id doubles as the Temporal workflow id used for dedupe).
+_IDEMPOTENCY_NAMESPACE = uuid.UUID("6f1c2a5e-3d4b-4f7a-9c1e-8b2d0e5a7c34")
+
+
+def _job_id_for_key(tenant_id: uuid.UUID, idempotency_key: str) -> uuid.UUID:
+    """Return the deterministic job (and workflow) id for an idempotency key."""
+    return uuid.uuid5(_IDEMPOTENCY_NAMESPACE, f"{tenant_id}:{idempotency_key}")
+
 
 async def _start_job(
     *,
@@ -22,42 +42,138 @@ async def _start_job(
     category: str,
     job_type: str,
     payload: Dict[str, Any],
+    resource_name: Optional[str] = None,
+    idempotency_key: Optional[str] = None,
+    priority: Optional[str] = None,
 ) -> Job:
-    # Lazy import Temporal client and JobWorkflow when needed
-    from temporalio.client import Client
-    from ..workflows.job_workflow import JobWorkflow
-    from ..main import get_temporal_client
-
-    temporal: Client = await get_temporal_client()
-
-    # Persist job row
+    """Persist a job and start its workflow (or queue it for the scheduler).
+
+    With *idempotency_key* the job id is derived from the key, so a repeated
+    request is answered from a primary-key lookup (see :func:`_replay`).
+    Older in-flight jobs for the same *resource_name* are superseded by this
+    one.
+    """
+    job_id = _job_id_for_key(tenant_id, idempotency_key) if idempotency_key else uuid.uuid4()
+    request = {"category": category, "job_type": job_type, "resource_name": resource_name, "payload": payload}
+    if idempotency_key:
+        existing = await db.get(Job, job_id)
+        if existing is not None:
+            return await _replay(existing, **request)
+
+    settings = get_settings()
+    priority = priority or settings.scheduler_default_priority
+    if priority not in settings.scheduler_priority_classes:
+        raise HTTPException(status_code=400, detail=f"Unknown priority class '{priority}'")
+
+    # Persist job row; with the scheduler enabled it stays queued
+    # (dispatched_at NULL) until the scheduler grants it a slot.
     job = Job(
+        id=job_id,
         tenant_id=tenant_id,
         resource_id=None,
         job_type=job_type,
+        category=category,
+        resource_name=resource_name,
         status="pending",
+        priority=priority,
+        dispatched_at=None if settings.scheduler_enabled else datetime.utcnow(),
         input_payload=payload,
+        idempotency_key=idempotency_key,
+        traceparent=current_traceparent(),
     )
     db.add(job)
+    try:
+        await db.flush()
+    except IntegrityError:
+        # A concurrent retry with the same key won the insert.
+        await db.rollback()
+        existing = await db.get(Job, job_id) if idempotency_key else None
+        if existing is None:
+            raise
+        return await _replay(existing, **request)
+    superseded_running = await _supersede_in_flight(db, job) if resource_name else []
     await db.commit()
-    await db.refresh(job)
-
-    # Kick off workflow
-    params = {
-        "job_id": str(job.id),
-        "tenant_id": str(tenant_id),
-        "category": category,
-        "job_type": job_type,
-        "payload": payload,
+
+    if superseded_running or not settings.scheduler_enabled:
+        # Lazy import Temporal client when needed
+        from temporalio.client import Client
+        from ..main import get_temporal_client
+
+        temporal: Client = await get_temporal_client()
+        for older in superseded_running:
+            await _signal_supersede(temporal, older.id, job.id)
+        if not settings.scheduler_enabled:
+            await start_job_workflow(temporal, job)
+    return job
+
+
+async def _replay(
+    job: Job, *, category: str, job_type: str, resource_name: Optional[str], payload: Dict[str, Any]
+) -> Job:
+    """Answer a repeated idempotent request with its original *job*.
+
+    Raises 422 when the key was used for a different request.  A job still
+    ``pending`` outside the scheduler's queue may have been persisted by a
+    request that failed before starting its workflow, so the workflow is
+    started again (a no-op if it is already running).
+    """
+    original = {
+        "category": job.category,
+        "job_type": getattr(job.job_type, "value", job.job_type),
+        "resource_name": job.resource_name,
+        "payload": job.input_payload,
     }
+    if original != {"category": category, "job_type": job_type, "resource_name": resource_name, "payload": payload}:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used for a different request",
+        )
+    if job.status == JobStatus.pending and (job.dispatched_at is not None or not get_settings().scheduler_enabled):
+        from temporalio.client import Client
+        from ..main import get_temporal_client
+
+        temporal: Client = await get_temporal_client()
+        await start_job_workflow(temporal, job)
+    return job
+
 
-    await temporal.start_workflow(
-        JobWorkflow.run,
-        params,
-        id=str(job.id),
-        task_queue="gitops-jobs",
+async def _supersede_in_flight(db: AsyncSession, job: Job) -> List[Job]:
+    """Supersede older in-flight jobs for the same (tenant, category, name).
+
+    Queued jobs (never dispatched) are cancelled right here.  Jobs whose
+    workflow is already running are returned so the caller can signal them
+    after commit; the workflow cancels itself if it has not reached its git
+    step yet.  Must run in the transaction that inserts *job*.
+    """
+    # Serialise concurrent submissions for the same resource.
+    lock_key = f"{job.tenant_id}:{job.category}:{job.resource_name}"
+    await db.execute(text("SELECT pg_advisory_xact_lock(hashtextextended(:key, 0))"), {"key": lock_key})
+    stmt = select(Job).where(
+        Job.id != job.id,
+        Job.tenant_id == job.tenant_id,
+        Job.category == job.category,
+        Job.resource_name == job.resource_name,
+        Job.status.in_((JobStatus.pending, JobStatus.running)),
+        Job.superseded_by_id.is_(None),
     )
-    return job
+    running: List[Job] = []
+    for older in (await db.execute(stmt)).scalars():
+        if older.dispatched_at is None:
+            mark_superseded(db, older, job.id)
+        else:
+            running.append(older)
+    return running
+
+
+async def _signal_supersede(temporal: Any, older_job_id: uuid.UUID, winner_job_id: uuid.UUID) -> None:
+    """Ask the older job's workflow to stop before its git step."""
+    from temporalio.service import RPCError
+
+    try:
+        await temporal.get_workflow_handle(str(older_job_id)).signal(JobWorkflow.supersede, str(winner_job_id))
+    except RPCError as exc:
+        # Already finished (or not started yet) – nothing left to cancel.
+        logger.info("Could not supersede job %s: %s", older_job_id, exc)
 
 
 @router.post("/{category:path}", response_model=JobSchema, status_code=status.HTTP_202_ACCEPTED)
@@ -65,28 +181,61 @@ async def create_resource(
     tenant_id: uuid.UUID,
     category: str = Path(..., description="Resource category (e.g., compute/vms)"),
     body: ResourceCreateSchema = Body(...),
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=255,
+        description="Client-chosen key; retries with the same key return the original job",
+    ),
+    priority: Optional[str] = Query(None, description="Scheduling priority class (e.g. high, normal, low)"),
     db: AsyncSession = Depends(get_async_session),
 ):
     job = await _start_job(
-        
         db=db,
         tenant_id=tenant_id,
         category=category,
         job_type="create",
         payload=body.payload,
+        resource_name=body.name,
+        idempotency_key=idempotency_key,
+        priority=priority,
     )
-    return JobSchema.model_validate(job)
+    # The client typically polls the job next; keep it off lagging replicas.
+    return mark_write(model_response(JobSchema, job, status_code=status.HTTP_202_ACCEPTED))
+
+
+def list_resources_query(
+    tenant_id: uuid.UUID,
+    category: ResourceCategory,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    drifted: Optional[bool] = None,
+) -> Select:
+    """The ``list_resources`` statement before pagination (also EXPLAINed by ``dev/check_query_plans.py``)."""
+    stmt = RESOURCE_COLUMNS.select().where(Resource.tenant_id == tenant_id, Resource.category == category)
+    if created_after is not None:
+        stmt = stmt.where(Resource.created_at >= created_after)
+    if created_before is not None:
+        stmt = stmt.where(Resource.created_at < created_before)
+    if drifted is not None:
+        stmt = stmt.where(Resource.drift_commit.is_not(None) if drifted else Resource.drift_commit.is_(None))
+    return stmt
 
 
 @router.get("/{category:path}", response_model=List[ResourceSchema])
 async def list_resources(
     tenant_id: uuid.UUID,
     category: ResourceCategory,
-    db: AsyncSession = Depends(get_async_session),
+    response: Response,
+    created_after: Optional[UTCDateTime] = Query(None, description="Only resources created at or after this time"),
+    created_before: Optional[UTCDateTime] = Query(None, description="Only resources created before this time"),
+    drifted: Optional[bool] = Query(None, description="Only resources whose manifest was (not) edited out of band"),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_session),
 ):
-    stmt = select(Resource).where(Resource.tenant_id == tenant_id, Resource.category == category)
-    resources = (await db.execute(stmt)).scalars().all()
-    return [ResourceSchema.model_validate(r) for r in resources]
+    stmt = list_resources_query(tenant_id, category, created_after, created_before, drifted)
+    rows = (await db.execute(paginate(stmt, Resource.created_at, Resource.id, page))).all()
+    return json_response(RESOURCE_COLUMNS.dump(finish_page(rows, page, response)), response)
 
 
 @router.get("/{category:path}/{resource_id}", response_model=ResourceSchema)
@@ -94,9 +243,9 @@ async def get_resource(
     tenant_id: uuid.UUID,
     category: ResourceCategory,
     resource_id: uuid.UUID,
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
-    res = await db.get(Resource, resource_id)
+    res = await get_or_primary(db, Resource, resource_id)
     if not res or res.tenant_id != tenant_id or res.category != category:
         raise HTTPException(status_code=404, detail="Resource not found")
-    return ResourceSchema.model_validate(res)
+    return model_response(ResourceSchema, res)
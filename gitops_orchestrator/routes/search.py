@@ -0,0 +1,108 @@
+"""Payload search endpoints.
+
+Filters are pushed down to Postgres and served by the GIN (``jsonb_path_ops``)
+indexes on the JSONB payload columns:
+
+* ``*contains`` – JSON document the payload must contain (``@>``), e.g.
+  ``{"image": "rhel-9"}`` or ``{"disks": [{"size_gb": 100}]}``;
+* ``*jsonpath`` – SQL/JSON path that must match at least one item (``@?``),
+  e.g. ``$.disks[*] ? (@.size_gb > 100)``.
+
+Results are keyset-paginated like the list endpoints.
+"""
+from __future__ import annotations
+
+import json
+import uuid
+from typing import Any, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import Select, cast
+from sqlalchemy.dialects.postgresql import JSONPATH
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db.session import get_read_session
+from ..models import Job, JobSchema, JobStatus, JobType, Resource, ResourceCategory, ResourceSchema
+from ..pagination import PageParams, finish_page, paginate
+from ..serialization import JOB_COLUMNS, RESOURCE_COLUMNS, json_response
+
+router = APIRouter(prefix="/tenants/{tenant_id}/search", tags=["search"])
+
+_CONTAINS_HELP = "JSON document the payload must contain (`@>`)"
+_JSONPATH_HELP = "SQL/JSON path that must match (`@?`), e.g. `$.disks[*] ? (@.size_gb > 100)`"
+
+
+def _parse_contains(name: str, raw: str) -> Any:
+    try:
+        value = json.loads(raw)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"{name} is not valid JSON") from exc
+    if not isinstance(value, (dict, list)):
+        raise HTTPException(status_code=400, detail=f"{name} must be a JSON object or array")
+    return value
+
+
+def _payload_filter(
+    stmt: Select, column: Any, contains: Optional[str], jsonpath: Optional[str], *, param: str = "contains"
+) -> Select:
+    if contains is not None:
+        stmt = stmt.where(column.contains(_parse_contains(param, contains)))
+    if jsonpath is not None:
+        stmt = stmt.where(column.path_exists(cast(jsonpath, JSONPATH)))
+    return stmt
+
+
+async def _fetch(db: AsyncSession, stmt: Select) -> List[Any]:
+    """Run *stmt*, mapping Postgres jsonpath syntax errors to HTTP 400."""
+    try:
+        return list((await db.execute(stmt)).all())
+    except DBAPIError as exc:
+        await db.rollback()
+        if getattr(exc.orig, "sqlstate", None) in ("42601", "22P02") or "jsonpath" in str(exc.orig):
+            raise HTTPException(status_code=400, detail="Invalid jsonpath expression") from exc
+        raise
+
+
+@router.get("/resources", response_model=List[ResourceSchema])
+async def search_resources(
+    tenant_id: uuid.UUID,
+    response: Response,
+    category: Optional[ResourceCategory] = Query(None),
+    contains: Optional[str] = Query(None, description=f"{_CONTAINS_HELP}, matched against `last_observed_state`"),
+    jsonpath: Optional[str] = Query(None, description=f"{_JSONPATH_HELP}, evaluated on `last_observed_state`"),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_session),
+) -> List[ResourceSchema]:  # noqa: D401
+    """Find resources by their last observed state."""
+    stmt = RESOURCE_COLUMNS.select().where(Resource.tenant_id == tenant_id)
+    if category is not None:
+        stmt = stmt.where(Resource.category == category)
+    stmt = _payload_filter(stmt, Resource.last_observed_state, contains, jsonpath)
+    rows = await _fetch(db, paginate(stmt, Resource.created_at, Resource.id, page))
+    return json_response(RESOURCE_COLUMNS.dump(finish_page(rows, page, response)), response)
+
+
+@router.get("/jobs", response_model=List[JobSchema])
+async def search_jobs(
+    tenant_id: uuid.UUID,
+    response: Response,
+    status: Optional[JobStatus] = Query(None),
+    job_type: Optional[JobType] = Query(None),
+    input_contains: Optional[str] = Query(None, description=f"{_CONTAINS_HELP}, matched against `input_payload`"),
+    input_jsonpath: Optional[str] = Query(None, description=f"{_JSONPATH_HELP}, evaluated on `input_payload`"),
+    result_contains: Optional[str] = Query(None, description=f"{_CONTAINS_HELP}, matched against `result_payload`"),
+    result_jsonpath: Optional[str] = Query(None, description=f"{_JSONPATH_HELP}, evaluated on `result_payload`"),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_session),
+) -> List[JobSchema]:  # noqa: D401
+    """Find jobs by their input or result payload."""
+    stmt = JOB_COLUMNS.select().where(Job.tenant_id == tenant_id)
+    if status is not None:
+        stmt = stmt.where(Job.status == status)
+    if job_type is not None:
+        stmt = stmt.where(Job.job_type == job_type)
+    stmt = _payload_filter(stmt, Job.input_payload, input_contains, input_jsonpath, param="input_contains")
+    stmt = _payload_filter(stmt, Job.result_payload, result_contains, result_jsonpath, param="result_contains")
+    rows = await _fetch(db, paginate(stmt, Job.created_at, Job.id, page))
+    return json_response(JOB_COLUMNS.dump(finish_page(rows, page, response)), response)
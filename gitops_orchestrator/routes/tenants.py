@@ -3,12 +3,13 @@ from __future__ import annotations
 
 from uuid import UUID, uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..db.session import get_async_session
+from ..db.session import get_async_session, get_or_primary, get_read_session
 from ..models import Tenant, TenantSchema
+from ..pagination import PageParams, finish_page, paginate
+from ..serialization import TENANT_COLUMNS, json_response, model_response
 
 router = APIRouter(prefix="/tenants", tags=["tenants"])
 
@@ -17,20 +18,24 @@ router = APIRouter(prefix="/tenants", tags=["tenants"])
 async def create_tenant(name: str, db: AsyncSession = Depends(get_async_session)) -> TenantSchema:  # noqa: D401
     tenant = Tenant(id=uuid4(), name=name)
     db.add(tenant)
-    await db.commit()
-    await db.refresh(tenant)
-    return TenantSchema.model_validate(tenant)
+    await db.commit()  # expire_on_commit=False: no reload needed
+    return model_response(TenantSchema, tenant, status_code=status.HTTP_201_CREATED)
 
 
 @router.get("", response_model=list[TenantSchema])
-async def list_tenants(db: AsyncSession = Depends(get_async_session)) -> list[TenantSchema]:  # noqa: D401
-    tenants = (await db.execute(select(Tenant))).scalars().all()
-    return [TenantSchema.model_validate(t) for t in tenants]
+async def list_tenants(
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_session),
+) -> list[TenantSchema]:  # noqa: D401
+    stmt = paginate(TENANT_COLUMNS.select(), Tenant.created_at, Tenant.id, page)
+    rows = (await db.execute(stmt)).all()
+    return json_response(TENANT_COLUMNS.dump(finish_page(rows, page, response)), response)
 
 
 @router.get("/{tenant_id}", response_model=TenantSchema)
-async def get_tenant(tenant_id: UUID, db: AsyncSession = Depends(get_async_session)) -> TenantSchema:  # noqa: D401
-    tenant = await db.get(Tenant, tenant_id)
+async def get_tenant(tenant_id: UUID, db: AsyncSession = Depends(get_read_session)) -> TenantSchema:  # noqa: D401
+    tenant = await get_or_primary(db, Tenant, tenant_id)
     if not tenant:
         raise HTTPException(status_code=404, detail="Tenant not found")
-    return TenantSchema.model_validate(tenant)
+    return model_response(TenantSchema, tenant)
@@ -0,0 +1,281 @@
+"""Tenant-fair dispatch of queued jobs to Temporal.
+
+With ``SCHEDULER_ENABLED`` the API only persists jobs; this process decides
+when each job's ``JobWorkflow`` starts.  Slots are handed out by weighted fair
+queuing (start-time fair queuing) across tenants, so a tenant importing
+thousands of resources gets its weighted share while a small tenant's single
+job is dispatched on the next tick:
+
+* each tenant has a weight and an in-flight cap (``SCHEDULER_TENANT_*``);
+* within a tenant, higher priority classes go first and the class weight
+  multiplies the tenant's share (``SCHEDULER_PRIORITY_CLASSES_JSON``);
+* ``SCHEDULER_MAX_IN_FLIGHT`` bounds the total number of running workflows.
+
+Only one scheduler is active at a time (Postgres advisory lock), so several
+replicas can run for availability::
+
+    python -m gitops_orchestrator.scheduler
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from collections import defaultdict, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List
+
+from sqlalchemy import func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import AppSettings, get_settings
+from .db.session import async_session, engine
+from .instrumentation import JOB_QUEUE_WAIT, priority_label
+from .models import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary constant identifying the scheduler leader lock.
+_LEADER_LOCK_KEY = 0x6A0B5C4D
+
+_IN_FLIGHT_STATUSES = (JobStatus.pending, JobStatus.running)
+
+
+def workflow_params(job: Job) -> Dict[str, Any]:
+    """Return the ``JobWorkflow.run`` argument for *job*."""
+    return {
+        "job_id": str(job.id),
+        "tenant_id": str(job.tenant_id),
+        "category": job.category,
+        "name": job.resource_name or job.input_payload.get("name", "resource"),
+        "job_type": job.job_type.value if hasattr(job.job_type, "value") else job.job_type,
+        "payload": job.input_payload,
+    }
+
+
+async def start_job_workflow(temporal: Any, job: Job) -> None:
+    """Start ``JobWorkflow`` for *job* (workflow id == job id).
+
+    Already-running workflows (idempotent replays, scheduler restarts) are
+    left alone.
+    """
+    from temporalio.exceptions import WorkflowAlreadyStartedError
+    from .tracing import job_trace
+    from .workflows.job_workflow import JobWorkflow
+
+    try:
+        # Queued jobs rejoin the trace of the request that submitted them.
+        with job_trace(job.traceparent):
+            await temporal.start_workflow(
+                JobWorkflow.run,
+                workflow_params(job),
+                id=str(job.id),
+                task_queue=get_settings().temporal_task_queue,
+            )
+    except WorkflowAlreadyStartedError:
+        logger.debug("Workflow for job %s already started", job.id)
+
+
+class FairScheduler:
+    """Weighted fair queuing of pending jobs across tenants."""
+
+    def __init__(self, temporal: Any, settings: AppSettings) -> None:
+        self.temporal = temporal
+        self.settings = settings
+        # Start-time fair queuing state: per-tenant finish tag + virtual clock.
+        self._finish: Dict[uuid.UUID, float] = {}
+        self._vtime = 0.0
+
+    # ------------------------------------------------------------------
+    # Weights / caps
+    # ------------------------------------------------------------------
+    def _tenant_weight(self, overrides: Dict[str, Dict[str, float]], tenant_id: uuid.UUID) -> float:
+        return float(overrides.get(str(tenant_id), {}).get("weight", 1.0))
+
+    def _tenant_cap(self, overrides: Dict[str, Dict[str, float]], tenant_id: uuid.UUID) -> int:
+        return int(overrides.get(str(tenant_id), {}).get("max_in_flight", self.settings.scheduler_tenant_max_in_flight))
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+    async def _in_flight(self, db: AsyncSession) -> Dict[uuid.UUID, int]:
+        stmt = (
+            select(Job.tenant_id, func.count())
+            .where(Job.dispatched_at.is_not(None), Job.status.in_(_IN_FLIGHT_STATUSES))
+            .group_by(Job.tenant_id)
+        )
+        return {row[0]: row[1] for row in (await db.execute(stmt)).all()}
+
+    async def _queued_heads(self, db: AsyncSession, limit: int) -> List[Any]:
+        """Return up to *limit* oldest queued jobs per (tenant, priority)."""
+        rank = (
+            func.row_number()
+            .over(partition_by=(Job.tenant_id, Job.priority), order_by=(Job.created_at, Job.id))
+            .label("rank")
+        )
+        queued = (
+            select(Job.id, Job.tenant_id, Job.priority, Job.created_at, rank)
+            .where(Job.dispatched_at.is_(None), Job.status == JobStatus.pending)
+            .subquery()
+        )
+        stmt = select(queued).where(queued.c.rank <= limit).order_by(queued.c.created_at)
+        return list((await db.execute(stmt)).all())
+
+    def _select(self, heads: List[Any], in_flight: Dict[uuid.UUID, int], free: int) -> List[Any]:
+        """Pick up to *free* jobs from *heads* in weighted-fair order."""
+        classes = self.settings.scheduler_priority_classes
+        overrides = self.settings.scheduler_tenant_overrides
+        queues: Dict[uuid.UUID, Dict[str, Deque[Any]]] = defaultdict(lambda: defaultdict(deque))
+        for row in heads:
+            queues[row.tenant_id][row.priority].append(row)
+
+        picked: List[Any] = []
+        while len(picked) < free:
+            best = None
+            for tenant_id, by_class in queues.items():
+                if in_flight.get(tenant_id, 0) >= self._tenant_cap(overrides, tenant_id):
+                    continue
+                ready = [p for p, q in by_class.items() if q]
+                if not ready:
+                    continue
+                priority = max(ready, key=lambda p: float(classes.get(p, 1.0)))
+                weight = self._tenant_weight(overrides, tenant_id) * float(classes.get(priority, 1.0))
+                start = max(self._vtime, self._finish.get(tenant_id, 0.0))
+                tag = start + 1.0 / max(weight, 1e-6)
+                if best is None or tag < best[0]:
+                    best = (tag, start, tenant_id, priority)
+            if best is None:
+                break
+            tag, start, tenant_id, priority = best
+            picked.append(queues[tenant_id][priority].popleft())
+            self._finish[tenant_id] = tag
+            self._vtime = start
+            in_flight[tenant_id] = in_flight.get(tenant_id, 0) + 1
+        return picked
+
+    async def dispatch_once(self) -> int:
+        """Run one scheduling round; return the number of workflows started."""
+        async with async_session() as db:
+            in_flight = await self._in_flight(db)
+            free = self.settings.scheduler_max_in_flight - sum(in_flight.values())
+            if free <= 0:
+                return 0
+            heads = await self._queued_heads(db, free)
+            picked = self._select(heads, in_flight, free)
+            if not picked:
+                return 0
+
+            # Claim; jobs cancelled/superseded meanwhile drop out here.
+            now = datetime.utcnow()
+            claimed = (
+                await db.execute(
+                    update(Job)
+                    .where(
+                        Job.id.in_([row.id for row in picked]),
+                        Job.dispatched_at.is_(None),
+                        Job.status == JobStatus.pending,
+                    )
+                    .values(dispatched_at=now)
+                    .returning(Job.id)
+                    .execution_options(synchronize_session=False)
+                )
+            ).scalars().all()
+            await db.commit()
+
+            jobs = (await db.execute(select(Job).where(Job.id.in_(claimed)))).scalars().all()
+            order = {row.id: i for i, row in enumerate(picked)}
+            jobs = sorted(jobs, key=lambda job: order[job.id])
+            for job in jobs:
+                try:
+                    await start_job_workflow(self.temporal, job)
+                except Exception:  # noqa: BLE001 – put the job back in the queue
+                    logger.exception("Failed to start workflow for job %s; re-queueing", job.id)
+                    job.dispatched_at = None
+                    continue
+                waited = (now - job.created_at).total_seconds()
+                JOB_QUEUE_WAIT.labels(priority_label(job.priority)).observe(max(waited, 0.0))
+                logger.info(
+                    "Dispatched job %s (tenant %s, priority %s) after %.1fs in queue",
+                    job.id, job.tenant_id, job.priority, waited,
+                )
+            await db.commit()
+            return len(jobs)
+
+    async def recover_claims(self) -> int:
+        """Start the workflows of claimed jobs that may never have been started.
+
+        A leader that dies (or loses its lock) between committing a claim and
+        starting the workflow leaves the job ``pending`` with ``dispatched_at``
+        set, holding an in-flight slot forever.  Run on gaining leadership:
+        starting is idempotent (workflow id == job id), so jobs whose workflow
+        is running are left alone; jobs that cannot be started are re-queued.
+        Returns the number of claims checked.
+        """
+        async with async_session() as db:
+            jobs = (
+                await db.execute(
+                    select(Job).where(Job.dispatched_at.is_not(None), Job.status == JobStatus.pending)
+                )
+            ).scalars().all()
+            for job in jobs:
+                try:
+                    await start_job_workflow(self.temporal, job)
+                except Exception:  # noqa: BLE001 – put the job back in the queue
+                    logger.exception("Failed to start workflow for claimed job %s; re-queueing", job.id)
+                    job.dispatched_at = None
+            await db.commit()
+        if jobs:
+            logger.info("Checked %d claimed pending jobs from a previous leader", len(jobs))
+        return len(jobs)
+
+    async def run(self) -> None:
+        """Dispatch forever while holding the leader lock."""
+        interval = self.settings.scheduler_poll_interval_seconds
+        lock = {"key": _LEADER_LOCK_KEY}
+        while True:
+            async with engine.connect() as lock_conn:
+                leader = (await lock_conn.execute(text("SELECT pg_try_advisory_lock(:key)"), lock)).scalar()
+                await lock_conn.commit()
+                if leader:
+                    logger.info("Acquired scheduler leader lock")
+                    try:
+                        try:
+                            await self.recover_claims()
+                        except Exception:  # noqa: BLE001 – retried on the next leadership
+                            logger.exception("Recovering claimed jobs failed")
+                        while True:
+                            try:
+                                started = await self.dispatch_once()
+                            except Exception:  # noqa: BLE001 – keep leading across DB blips
+                                logger.exception("Scheduling round failed")
+                                started = 0
+                            if not started:
+                                await asyncio.sleep(interval)
+                    finally:
+                        await lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), lock)
+                        await lock_conn.commit()
+            logger.debug("Another scheduler holds the leader lock; standing by")
+            await asyncio.sleep(interval * 5)
+
+
+async def main() -> None:  # noqa: D401
+    from temporalio.client import Client
+
+    from .tracing import configure_tracing, temporal_interceptors
+
+    settings = get_settings()
+    if settings.scheduler_metrics_port is not None:
+        from prometheus_client import start_http_server
+
+        start_http_server(settings.scheduler_metrics_port)
+        logger.info("Serving scheduler metrics on :%d/metrics", settings.scheduler_metrics_port)
+    configure_tracing("gitops-scheduler")
+    temporal = await Client.connect(
+        f"{settings.temporal_host}:{settings.temporal_port}", interceptors=temporal_interceptors()
+    )
+    await FairScheduler(temporal, settings).run()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+"""Fast JSON response helpers for the API routes.
+
+Routes return ready-made responses instead of handing models to FastAPI, so a
+payload is never validated twice nor round-tripped through
+``jsonable_encoder``:
+
+* list endpoints select the Core columns matching their response schema
+  (:class:`SchemaColumns`) and encode the rows with orjson – no ORM objects,
+  no Pydantic models;
+* single-object endpoints validate once and serialise with a cached
+  pydantic-core serializer (:func:`model_response`).
+
+``response_model`` stays on the decorators for the OpenAPI schema only.
+"""
+from __future__ import annotations
+
+import uuid
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Tuple, Type
+
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import PydanticUndefined
+from sqlalchemy import Select, select
+
+from .models import Job, JobSchema, Resource, ResourceSchema, Tenant, TenantSchema
+
+
+def _default(obj: Any) -> Any:
+    # asyncpg returns its own ``uuid.UUID`` subclass, which orjson rejects.
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(obj: Any) -> bytes:
+    """``orjson.dumps`` accepting the driver's UUID type and non-string keys."""
+    return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered by orjson; pre-encoded ``bytes`` pass through."""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
+
+
+class SchemaColumns:
+    """The Core columns of *model* that make up *schema*'s JSON objects.
+
+    Schema fields without a column must have a default, which is emitted as a
+    constant; anything else is a schema/model mismatch and fails at import.
+    """
+
+    def __init__(self, schema: Type[BaseModel], model: Any) -> None:
+        columns = []
+        self.constants: Dict[str, Any] = {}
+        for name, field in schema.model_fields.items():
+            if name in model.__table__.columns:
+                columns.append(getattr(model, name))
+            elif field.default is not PydanticUndefined or field.default_factory is not None:
+                self.constants[name] = field.get_default(call_default_factory=True)
+            else:
+                raise TypeError(f"{schema.__name__}.{name} has no column on {model.__name__}")
+        self.columns: Tuple[Any, ...] = tuple(columns)
+
+    def select(self) -> Select:
+        return select(*self.columns)
+
+    def dump(self, rows: Iterable[Any]) -> bytes:
+        """Encode Core *rows* (from :meth:`select`) as a JSON array."""
+        if self.constants:
+            return dumps([{**self.constants, **row._asdict()} for row in rows])
+        return dumps([row._asdict() for row in rows])
+
+
+TENANT_COLUMNS = SchemaColumns(TenantSchema, Tenant)
+RESOURCE_COLUMNS = SchemaColumns(ResourceSchema, Resource)
+JOB_COLUMNS = SchemaColumns(JobSchema, Job)
+
+
+def json_response(content: bytes, response: Optional[Response] = None, *, status_code: int = 200) -> ORJSONResponse:
+    """Wrap encoded *content*, carrying over headers set on the injected *response*."""
+    headers = {k: v for k, v in response.headers.items() if k != "content-length"} if response else None
+    return ORJSONResponse(content, status_code=status_code, headers=headers)
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def model_response(schema: Type[BaseModel], obj: Any, *, status_code: int = 200) -> ORJSONResponse:
+    """Validate *obj* into *schema* once and serialise it with a cached serializer."""
+    adapter = _adapter(schema)
+    model = adapter.validate_python(obj, from_attributes=True)
+    return ORJSONResponse(adapter.dump_json(model), status_code=status_code)
@@ -4,6 +4,8 @@ from __future__ import annotations
 import os
 import asyncio
 import logging
+import signal
+from datetime import timedelta
 
 # Disable workflow sandbox entirely for local dev (Temporal SDK 1.3)
 os.environ.setdefault("TEMPORAL_PYTHON_DISABLE_SANDBOX", "1")
@@ -11,38 +13,153 @@ os.environ.setdefault("TEMPORAL_PYTHON_DISABLE_SANDBOX", "1")
 
 
 from temporalio.client import Client
+from temporalio.runtime import PrometheusConfig, Runtime, TelemetryConfig
 from temporalio.worker import Worker
 
 from .activities import apis as apis_act
 from .activities import gitops as gitops_act
 from .activities import monitoring as mon_act
-from .config import get_settings
+from .config import AppSettings, get_settings
+from .tracing import configure_tracing, shutdown_tracing, temporal_interceptors
+from .warmup import import_handlers, prefetch_templates, run_warmup, warm_db
 from .workflows.job_workflow import JobWorkflow
 
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
 settings = get_settings()
+logging.basicConfig(
+    level=logging.INFO,
+    format=f"%(asctime)s %(levelname)s [worker-{settings.worker_process_index}] %(name)s: %(message)s",
+)
+logger = logging.getLogger(__name__)
 
 
 aSYNC_DEF_TIMEOUT = 60  # seconds
 
+# Activity classes served by each pool; must match the ``task_queue`` each
+# activity is scheduled on in ``JobWorkflow``.
+_POOL_ACTIVITIES = {
+    "git": [gitops_act.render_and_commit],
+    "api": [apis_act.call_external_api],
+    "bookkeeping": [
+        mon_act.record_job_status,
+        mon_act.record_job_superseded,
+        mon_act.poll_job_status,
+        apis_act.lookup_tenant_name,
+    ],
+}
+
+
+def _pool_queue(pool: str, cfg: AppSettings) -> str:
+    return {
+        "workflow": cfg.temporal_task_queue,
+        "git": cfg.temporal_git_task_queue,
+        "api": cfg.temporal_api_task_queue,
+        "bookkeeping": cfg.temporal_bookkeeping_task_queue,
+    }[pool]
+
+
+def build_workers(client: Client, cfg: AppSettings) -> list[Worker]:
+    """Create one :class:`Worker` per pool enabled in ``WORKER_POOLS``."""
+    pools = [p.strip() for p in cfg.worker_pools.split(",") if p.strip()]
+    unknown = set(pools) - {"workflow", *_POOL_ACTIVITIES}
+    if unknown:
+        raise ValueError(f"Unknown worker pool(s) in WORKER_POOLS: {', '.join(sorted(unknown))}")
+
+    limits = {
+        "git": cfg.worker_git_max_concurrent_activities,
+        "api": cfg.worker_api_max_concurrent_activities,
+        "bookkeeping": cfg.worker_bookkeeping_max_concurrent_activities,
+    }
+    graceful = timedelta(seconds=cfg.worker_graceful_shutdown_seconds)
+    workers: list[Worker] = []
+    for pool in pools:
+        queue = _pool_queue(pool, cfg)
+        if pool == "workflow":
+            worker = Worker(
+                client,
+                task_queue=queue,
+                workflows=[JobWorkflow],
+                max_concurrent_workflow_tasks=cfg.worker_max_concurrent_workflow_tasks,
+                graceful_shutdown_timeout=graceful,
+            )
+            logger.info("Pool 'workflow' on queue '%s' (workflow tasks=%d)", queue, cfg.worker_max_concurrent_workflow_tasks)
+        else:
+            worker = Worker(
+                client,
+                task_queue=queue,
+                activities=_POOL_ACTIVITIES[pool],
+                max_concurrent_activities=limits[pool],
+                graceful_shutdown_timeout=graceful,
+            )
+            logger.info("Pool '%s' on queue '%s' (activities=%d)", pool, queue, limits[pool])
+        workers.append(worker)
+    return workers
+
+
+def _runtime(cfg: AppSettings) -> Runtime | None:
+    """Return a Temporal runtime exporting SDK metrics, if configured.
+
+    Every series carries a ``worker_process`` label so processes started by
+    ``worker_supervisor`` can be told apart.
+    """
+    if cfg.temporal_metrics_port is None:
+        return None
+    bind = f"0.0.0.0:{cfg.temporal_metrics_port + cfg.worker_process_index}"
+    logger.info("Exporting Temporal SDK metrics on %s", bind)
+    return Runtime(
+        telemetry=TelemetryConfig(
+            metrics=PrometheusConfig(bind_address=bind),
+            global_tags={"worker_process": str(cfg.worker_process_index)},
+        )
+    )
+
+
+def _start_metrics_server(cfg: AppSettings) -> None:
+    """Serve this process's stage histograms for Prometheus, if configured."""
+    if cfg.worker_metrics_port is None:
+        return
+    from prometheus_client import start_http_server
+
+    port = cfg.worker_metrics_port + cfg.worker_process_index
+    start_http_server(port)
+    logger.info("Serving stage metrics on :%d/metrics", port)
+
 
 async def main() -> None:  # noqa: D401
-    client = await Client.connect(f"{settings.temporal_host}:{settings.temporal_port}")
-
-    worker = Worker(
-        client,
-        task_queue=settings.temporal_task_queue,
-        workflows=[JobWorkflow],
-        activities=[
-            gitops_act.render_and_commit,
-            apis_act.call_external_api,
-            mon_act.record_job_status,
-            apis_act.lookup_tenant_name,
-        ],
+    _start_metrics_server(settings)
+    configure_tracing("gitops-worker")
+    client = await Client.connect(
+        f"{settings.temporal_host}:{settings.temporal_port}",
+        runtime=_runtime(settings),
+        # Also applied to the workers built on this client.
+        interceptors=temporal_interceptors(),
     )
-    logger.info("Starting Temporal worker on queue '%s'", settings.temporal_task_queue)
-    await worker.run()
+    # Warm before polling so the first tasks don't pay for cold pools,
+    # imports and template clones; failures fall back to the lazy path.
+    if not await run_warmup(
+        {"db": warm_db, "handlers": import_handlers, "templates": prefetch_templates}, retry=False
+    ):
+        logger.warning("Warm-up incomplete; continuing with lazy initialisation")
+
+    workers = build_workers(client, settings)
+    logger.info("Starting %d Temporal worker pool(s)", len(workers))
+
+    # SIGTERM / SIGINT drain: stop polling, let in-flight tasks finish (up to
+    # WORKER_GRACEFUL_SHUTDOWN_SECONDS), then exit cleanly.
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    run_tasks = [asyncio.create_task(worker.run()) for worker in workers]
+    stop_task = asyncio.create_task(stop.wait())
+    await asyncio.wait([*run_tasks, stop_task], return_when=asyncio.FIRST_COMPLETED)
+    if stop.is_set():
+        logger.info("Shutdown requested; draining %d worker pool(s)", len(workers))
+    stop_task.cancel()
+    await asyncio.gather(*(worker.shutdown() for worker in workers if worker.is_running))
+    shutdown_tracing()
+    # Re-raise a crashed pool so the process exits non-zero (and is restarted).
+    await asyncio.gather(*run_tasks)
 
 
 if __name__ == "__main__":
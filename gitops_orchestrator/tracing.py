@@ -0,0 +1,312 @@
+"""OpenTelemetry tracing from the API request to the git push.
+
+Off unless ``TRACING_EXPORTER`` is set (requires ``opentelemetry-sdk``):
+
+* ``file`` – spans appended as JSON lines to ``TRACING_FILE``; processes may
+  share the file;
+* ``otlp`` – OTLP/HTTP to ``OTEL_EXPORTER_OTLP_ENDPOINT`` (also requires
+  ``opentelemetry-exporter-otlp-proto-http``);
+* ``console`` – spans printed to stdout.
+
+One trace per job: the API request span (:class:`TracingMiddleware`) parents
+``StartWorkflow:JobWorkflow``; the Temporal SDK's ``TracingInterceptor``
+carries the context in workflow and activity headers, so ``RunWorkflow``,
+each ``StartActivity`` / ``RunActivity`` and, inside activities, the stage
+spans (``observe_stage``: render, clone, commit, push, external_api, …), DB
+statements and outgoing HTTP calls all join it.  Jobs queued for the
+scheduler keep the request's ``traceparent`` on the row and resume the trace
+when they are dispatched.
+
+Without an exporter every helper here is a cheap no-op.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import httpx
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Longest statement text recorded on DB spans.
+_MAX_STATEMENT_LENGTH = 2000
+
+_tracer: Any = None
+
+
+def enabled() -> bool:
+    """Whether this process exports spans."""
+    return _tracer is not None
+
+
+def configure_tracing(service_name: str) -> bool:
+    """Install the tracer provider for this process; return whether tracing is on.
+
+    Also traces the statements of every DB engine (primary and replicas).
+    Safe to call more than once.
+    """
+    global _tracer  # noqa: PLW0603 – process-wide provider
+    if _tracer is not None:
+        return True
+    settings = get_settings()
+    if not settings.tracing_exporter:
+        return False
+    try:
+        from opentelemetry import trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError as exc:
+        raise RuntimeError(
+            "opentelemetry-sdk is required for TRACING_EXPORTER (pip install opentelemetry-sdk)"
+        ) from exc
+
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    provider.add_span_processor(BatchSpanProcessor(_exporter(settings.tracing_exporter, settings.tracing_file)))
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer("gitops_orchestrator")
+
+    from .db.session import all_engines
+
+    for engine in all_engines():
+        trace_engine(engine)
+    logger.info("Tracing enabled (%s exporter, service %s)", settings.tracing_exporter, service_name)
+    return True
+
+
+def _exporter(kind: str, path: str) -> Any:
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter, SpanExporter, SpanExportResult
+
+    if kind == "console":
+        return ConsoleSpanExporter()
+    if kind == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError as exc:
+            raise RuntimeError(
+                "opentelemetry-exporter-otlp-proto-http is required for TRACING_EXPORTER=otlp "
+                "(pip install opentelemetry-exporter-otlp-proto-http)"
+            ) from exc
+        return OTLPSpanExporter()
+    if kind != "file":
+        raise ValueError(f"Unknown TRACING_EXPORTER '{kind}' (file, otlp or console)")
+
+    class FileSpanExporter(SpanExporter):
+        """One JSON span per line; each batch is a single ``O_APPEND`` write."""
+
+        def __init__(self) -> None:
+            self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+
+        def export(self, spans: Any) -> SpanExportResult:
+            lines = "".join(json.dumps(json.loads(span.to_json()), separators=(",", ":")) + "\n" for span in spans)
+            os.write(self._fd, lines.encode())
+            return SpanExportResult.SUCCESS
+
+        def shutdown(self) -> None:
+            os.close(self._fd)
+
+    return FileSpanExporter()
+
+
+def shutdown_tracing() -> None:
+    """Flush buffered spans (call before the process exits)."""
+    if _tracer is None:
+        return
+    from opentelemetry import trace
+
+    provider = trace.get_tracer_provider()
+    if hasattr(provider, "shutdown"):
+        provider.shutdown()
+
+
+def temporal_interceptors() -> List[Any]:
+    """Client interceptors propagating the trace through workflows and activities."""
+    if _tracer is None:
+        return []
+    from temporalio.contrib.opentelemetry import TracingInterceptor
+
+    return [TracingInterceptor()]
+
+
+@contextmanager
+def span(name: str, *, kind: Any = None, attributes: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+    """Run the block in a child span of the current one (yields ``None`` when off).
+
+    Exceptions are recorded on the span and mark it as failed.
+    """
+    if _tracer is None:
+        yield None
+        return
+    from opentelemetry.trace import SpanKind
+
+    attrs = {key: value for key, value in (attributes or {}).items() if value is not None}
+    with _tracer.start_as_current_span(name, kind=kind or SpanKind.INTERNAL, attributes=attrs) as current:
+        yield current
+
+
+# -----------------------------------------------------------------------------
+# Queued jobs
+# -----------------------------------------------------------------------------
+
+
+def current_traceparent() -> Optional[str]:
+    """W3C ``traceparent`` of the current span, to store with a queued job."""
+    if _tracer is None:
+        return None
+    from opentelemetry import propagate
+
+    carrier: Dict[str, str] = {}
+    propagate.inject(carrier)
+    return carrier.get("traceparent")
+
+
+@contextmanager
+def job_trace(traceparent: Optional[str]) -> Iterator[None]:
+    """Continue a job's trace from its stored *traceparent*.
+
+    Only outside a span (e.g. in the scheduler loop): a request that restarts
+    a job (``/retry``) traces under its own span.
+    """
+    if _tracer is None or not traceparent:
+        yield
+        return
+    from opentelemetry import context, propagate, trace
+
+    if trace.get_current_span().get_span_context().is_valid:
+        yield
+        return
+    token = context.attach(propagate.extract({"traceparent": traceparent}))
+    try:
+        yield
+    finally:
+        context.detach(token)
+
+
+# -----------------------------------------------------------------------------
+# DB statements
+# -----------------------------------------------------------------------------
+
+
+def trace_engine(engine: Any) -> None:
+    """Record each statement *engine* executes as a ``db`` client span."""
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+    from sqlalchemy import event
+
+    def before(conn: Any, cursor: Any, statement: str, *_: Any) -> None:
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+        current = _tracer.start_span(
+            f"db {operation}",
+            kind=SpanKind.CLIENT,
+            attributes={
+                "db.system": "postgresql",
+                "db.name": engine.url.database or "",
+                "db.statement": statement[:_MAX_STATEMENT_LENGTH],
+            },
+        )
+        conn.info.setdefault("otel_spans", []).append(current)
+
+    def after(conn: Any, *_: Any) -> None:
+        spans = conn.info.get("otel_spans")
+        if spans:
+            spans.pop().end()
+
+    def error(context: Any) -> None:
+        spans = context.connection.info.get("otel_spans") if context.connection is not None else None
+        if spans:
+            current = spans.pop()
+            current.record_exception(context.original_exception)
+            current.set_status(Status(StatusCode.ERROR))
+            current.end()
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before)
+    event.listen(engine.sync_engine, "after_cursor_execute", after)
+    event.listen(engine.sync_engine, "handle_error", error)
+
+
+# -----------------------------------------------------------------------------
+# HTTP
+# -----------------------------------------------------------------------------
+
+
+class _TracingTransport(httpx.AsyncBaseTransport):
+    """Wrap an httpx transport: one client span per request, context injected."""
+
+    def __init__(self, inner: httpx.AsyncBaseTransport) -> None:
+        self._inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        from opentelemetry import propagate
+        from opentelemetry.trace import SpanKind, Status, StatusCode
+
+        url = str(request.url.copy_with(query=None, fragment=None))
+        attributes = {"http.method": request.method, "http.url": url}
+        with span(f"HTTP {request.method}", kind=SpanKind.CLIENT, attributes=attributes) as current:
+            propagate.inject(request.headers)
+            response = await self._inner.handle_async_request(request)
+            current.set_attribute("http.status_code", response.status_code)
+            if response.status_code >= 500:
+                current.set_status(Status(StatusCode.ERROR))
+            return response
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+def http_transport(**kwargs: Any) -> httpx.AsyncBaseTransport:
+    """Transport for outgoing ``httpx.AsyncClient`` calls; traced when tracing is on."""
+    transport = httpx.AsyncHTTPTransport(**kwargs)
+    return _TracingTransport(transport) if _tracer is not None else transport
+
+
+# -----------------------------------------------------------------------------
+# API
+# -----------------------------------------------------------------------------
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware opening a server span per HTTP request.
+
+    Continues an incoming ``traceparent``; the span is named after the matched
+    route template once routing has happened.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if _tracer is None or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        from opentelemetry import context, propagate
+        from opentelemetry.trace import SpanKind, Status, StatusCode
+
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope.get("headers", [])}
+        token = context.attach(propagate.extract(headers))
+        try:
+            with _tracer.start_as_current_span(
+                f"{scope['method']} {scope['path']}",
+                kind=SpanKind.SERVER,
+                attributes={"http.method": scope["method"], "http.target": scope["path"]},
+            ) as current:
+
+                async def send_wrapper(message: Dict[str, Any]) -> None:
+                    if message["type"] == "http.response.start":
+                        current.set_attribute("http.status_code", message["status"])
+                        if message["status"] >= 500:
+                            current.set_status(Status(StatusCode.ERROR))
+                    await send(message)
+
+                try:
+                    await self.app(scope, receive, send_wrapper)
+                finally:
+                    route = getattr(scope.get("route"), "path", None)
+                    if route:
+                        current.update_name(f"{scope['method']} {route}")
+                        current.set_attribute("http.route", route)
+        finally:
+            context.detach(token)
@@ -0,0 +1,104 @@
+"""Start-up warm-up shared by the API and the Temporal worker.
+
+Cold processes used to pay for everything on their first requests: the
+Temporal connection, new DB connections, importing handler modules and
+cloning template repos.  :func:`run_warmup` does that work up front:
+
+* the API runs it from its lifespan hook in the background – ``/healthz``
+  answers at once, ``/readyz`` only once every step succeeded (failed steps
+  are retried with backoff, e.g. while Temporal is still coming up);
+* the worker runs it before it starts polling its task queues; a failed step
+  is logged and left to the lazy path.
+
+:data:`READINESS` maps each step to ``pending``, ``ok`` or its last error.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from importlib import import_module
+from typing import Any, Awaitable, Callable, Dict, Mapping
+
+from sqlalchemy import text
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+Step = Callable[[], Awaitable[Any]]
+
+READINESS: Dict[str, str] = {}
+
+_MAX_RETRY_DELAY = 30.0
+
+
+def is_ready() -> bool:
+    """Whether warm-up ran and every step succeeded."""
+    return bool(READINESS) and all(state == "ok" for state in READINESS.values())
+
+
+async def warm_db() -> None:
+    """Open ``WARMUP_DB_CONNECTIONS`` pooled connections per engine (primary, replicas)."""
+    from .db.session import all_engines
+
+    settings = get_settings()
+    count = min(settings.warmup_db_connections, settings.db_pool_size)
+
+    async def ping(engine: Any) -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    # Concurrent checkouts, so the pool has to open *count* distinct connections.
+    await asyncio.gather(*(ping(engine) for engine in all_engines() for _ in range(count)))
+
+
+async def import_handlers() -> None:
+    """Import every job handler in the dispatcher map, and the workflow module."""
+    from .dispatcher import _RESOURCE_TO_HANDLER, get_handler_class
+
+    for category in _RESOURCE_TO_HANDLER:
+        get_handler_class(category)
+    import_module(".workflows.job_workflow", package=__package__)
+
+
+async def prefetch_templates() -> None:
+    """Clone every configured template repo into the local cache."""
+    from .gitops.template_fetcher import get_template_dir
+
+    by_url: Dict[str, str] = {}
+    for category, url in get_settings().template_repo_map.items():
+        by_url.setdefault(url, category)  # one clone per repo
+    for category in by_url.values():
+        await asyncio.to_thread(get_template_dir, category)
+
+
+async def _run_step(name: str, step: Step, *, retry: bool) -> None:
+    delay = 1.0
+    while True:
+        start = time.perf_counter()
+        try:
+            await step()
+        except Exception as exc:  # noqa: BLE001 – reported through READINESS
+            READINESS[name] = f"error: {exc}"
+            logger.warning("Warm-up step '%s' failed: %s", name, exc)
+            if not retry:
+                return
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, _MAX_RETRY_DELAY)
+            continue
+        READINESS[name] = "ok"
+        logger.info("Warm-up step '%s' done in %.2fs", name, time.perf_counter() - start)
+        return
+
+
+async def run_warmup(steps: Mapping[str, Step], *, retry: bool) -> bool:
+    """Run *steps* concurrently; return whether all of them succeeded.
+
+    With *retry* failing steps are retried until they succeed (or the task is
+    cancelled), otherwise each runs once.
+    """
+    for name in steps:
+        READINESS[name] = "pending"
+    await asyncio.gather(*(_run_step(name, step, retry=retry) for name, step in steps.items()))
+    return is_ready()
@@ -0,0 +1,134 @@
+"""Multi-process supervisor for the Temporal worker.
+
+Templating, YAML handling and GitPython bookkeeping are CPU-bound, so a single
+asyncio process is limited to one core by the GIL.  This entry point starts
+``WORKER_PROCESSES`` copies of :mod:`gitops_orchestrator.temporal_worker`
+(default: one per core) sharing the same settings, restarts any that crash and
+drains them all on SIGTERM::
+
+    python -m gitops_orchestrator.worker_supervisor
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from multiprocessing.connection import wait
+from multiprocessing.process import BaseProcess
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Restart backoff: doubles per consecutive crash of the same slot, capped.
+_MIN_BACKOFF_SECONDS = 1.0
+_MAX_BACKOFF_SECONDS = 30.0
+# A process that stayed up this long is considered healthy again.
+_HEALTHY_UPTIME_SECONDS = 60.0
+# Extra time on top of the graceful shutdown window before SIGKILL.
+_KILL_GRACE_SECONDS = 15.0
+
+
+def _run_worker(index: int) -> None:
+    """Child entry point: run one worker process labelled *index*."""
+    # Set before importing the worker so its settings / log format pick it up.
+    os.environ["WORKER_PROCESS_INDEX"] = str(index)
+    from . import temporal_worker
+
+    asyncio.run(temporal_worker.main())
+
+
+class WorkerSupervisor:
+    """Start, watch and restart a fixed number of worker processes."""
+
+    def __init__(self, processes: int, graceful_shutdown_seconds: int) -> None:
+        self.processes = processes
+        self.graceful_shutdown_seconds = graceful_shutdown_seconds
+        self._ctx = multiprocessing.get_context("spawn")
+        self._procs: dict[int, BaseProcess] = {}
+        self._started_at: dict[int, float] = {}
+        self._failures: dict[int, int] = {}
+        self._restart_at: dict[int, float] = {}
+        self._stopping = False
+
+    # ------------------------------------------------------------------
+    # Process management
+    # ------------------------------------------------------------------
+    def _start(self, index: int) -> None:
+        proc = self._ctx.Process(target=_run_worker, args=(index,), name=f"temporal-worker-{index}")
+        proc.start()
+        self._procs[index] = proc
+        self._started_at[index] = time.monotonic()
+        logger.info("Started worker %d (pid %s)", index, proc.pid)
+
+    def _reap(self, index: int, proc: BaseProcess) -> None:
+        """Handle exit of worker *index*; schedule a restart unless stopping."""
+        proc.join()
+        del self._procs[index]
+        if self._stopping:
+            logger.info("Worker %d exited (code %s)", index, proc.exitcode)
+            return
+        uptime = time.monotonic() - self._started_at[index]
+        failures = 0 if uptime >= _HEALTHY_UPTIME_SECONDS else self._failures.get(index, 0) + 1
+        self._failures[index] = failures
+        delay = min(_MIN_BACKOFF_SECONDS * 2 ** max(failures - 1, 0), _MAX_BACKOFF_SECONDS)
+        logger.warning(
+            "Worker %d exited unexpectedly (code %s, uptime %.0fs); restarting in %.0fs",
+            index, proc.exitcode, uptime, delay,
+        )
+        self._restart_at[index] = time.monotonic() + delay
+
+    def _request_stop(self, signum: int, _frame: object) -> None:
+        if self._stopping:
+            return
+        logger.info("Received %s; draining %d worker(s)", signal.Signals(signum).name, len(self._procs))
+        self._stopping = True
+        self._restart_at.clear()
+        for proc in self._procs.values():
+            if proc.is_alive() and proc.pid is not None:
+                os.kill(proc.pid, signal.SIGTERM)
+
+    # ------------------------------------------------------------------
+    # Main loop
+    # ------------------------------------------------------------------
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+
+        for index in range(self.processes):
+            self._start(index)
+
+        while not self._stopping:
+            now = time.monotonic()
+            for index, due in list(self._restart_at.items()):
+                if due <= now:
+                    del self._restart_at[index]
+                    self._start(index)
+            sentinels = {proc.sentinel: index for index, proc in self._procs.items()}
+            for sentinel in wait(list(sentinels), timeout=1.0):
+                index = sentinels[sentinel]
+                self._reap(index, self._procs[index])
+
+        deadline = time.monotonic() + self.graceful_shutdown_seconds + _KILL_GRACE_SECONDS
+        for index, proc in list(self._procs.items()):
+            proc.join(max(deadline - time.monotonic(), 0))
+            if proc.is_alive():
+                logger.warning("Worker %d did not drain in time; killing", index)
+                proc.kill()
+                proc.join()
+            self._reap(index, proc)
+        logger.info("All workers stopped")
+
+
+def main() -> None:  # noqa: D401
+    settings = get_settings()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [supervisor] %(name)s: %(message)s")
+    processes = settings.worker_processes or os.cpu_count() or 1
+    WorkerSupervisor(processes, settings.worker_graceful_shutdown_seconds).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,24 @@
 """Temporal workflow orchestrating a resource job lifecycle."""
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Dict, Optional, Any
 from datetime import timedelta
 
 from temporalio import workflow
+from temporalio.exceptions import ActivityError, ApplicationError
 
 
 from ..config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# ``call_external_api`` results with one of these statuses mean the vendor
+# finishes asynchronously and will report back via ``routes/callbacks``.
+_ASYNC_API_STATUSES = frozenset({"accepted", "pending", "running"})
+_TERMINAL_STATUSES = frozenset({"succeeded", "failed", "cancelled"})
+
 
 @workflow.defn
 class JobWorkflow:  # noqa: D101 – Temporal workflow class
@@ -19,6 +26,27 @@ class JobWorkflow:  # noqa: D101 – Temporal workflow class
 
     def __init__(self) -> None:  # noqa: D401
         self._job_id: str | None = None
+        self._external_status: str | None = None
+        self._superseded_by: str | None = None
+
+    @workflow.signal
+    def external_status(self, update: Dict[str, Any]) -> None:
+        """Receive a vendor status, pushed once its callback is written.
+
+        Only terminal statuses complete the wait; intermediate updates are
+        already recorded in ``job_history`` with the callback.
+        """
+        status = str(update.get("status", "")).lower()
+        if status in _TERMINAL_STATUSES:
+            self._external_status = status
+
+    @workflow.signal
+    def supersede(self, winner_job_id: str) -> None:
+        """Mark this job obsolete: a newer job targets the same resource.
+
+        Honoured up to the git step; past it the job simply runs to completion.
+        """
+        self._superseded_by = winner_job_id
 
     @workflow.run
     async def run(
@@ -31,10 +59,17 @@ class JobWorkflow:  # noqa: D101 – Temporal workflow class
         # ----- Activity imports (must precede first use) -----
         from ..activities import apis as apis_act, monitoring as mon_act, gitops as gitops_act
 
+        # Each activity class runs on its own queue / worker pool (see
+        # ``temporal_worker``). Settings are static per deployment, so reading
+        # them here is replay-safe.
+        settings = get_settings()
+        bookkeeping_queue = settings.temporal_bookkeeping_task_queue
+
         tenant_name = await workflow.execute_activity(
             apis_act.lookup_tenant_name,
             args=[tenant_id],
             schedule_to_close_timeout=timedelta(seconds=30),
+            task_queue=bookkeeping_queue,
         )
         category = params["category"]
         job_type = params["job_type"]
@@ -48,44 +83,107 @@ class JobWorkflow:  # noqa: D101 – Temporal workflow class
             mon_act.record_job_status,
             args=[job_id, "running", f"Category: {category}"],
             schedule_to_close_timeout=timedelta(seconds=60),
+            task_queue=bookkeeping_queue,
         )
-        
 
-        # Pre-checks via API activity
-        await workflow.execute_activity(
-            apis_act.call_external_api,
-            args=["pre_checks", {"category": category, "payload": payload}],
-            schedule_to_close_timeout=timedelta(seconds=60),
-        )
+        try:
+            # Pre-checks via API activity
+            await workflow.execute_activity(
+                apis_act.call_external_api,
+                args=["pre_checks", {"category": category, "payload": payload}, category],
+                schedule_to_close_timeout=timedelta(seconds=60),
+                task_queue=settings.temporal_api_task_queue,
+            )
 
-        git_result: Optional[str] = None
-        if "k8s" in category or "storage" in category or "compute" in category:
-            # Assume GitOps path for these; using full category for repo lookup
-            git_result = await workflow.execute_activity(
-                gitops_act.render_and_commit,
-                args=[
-                    f"{category}.yaml.j2",
-                    {"vm": {"name": params.get("name", payload.get("name", "resource")), **payload}},
-                    category,
-                    f"{tenant_name}/{category.split('/')[-1]}/{params.get('name', payload.get('name', 'resource'))}.yaml",
-                    None,
-                ],
+            if self._superseded_by:
+                await workflow.execute_activity(
+                    mon_act.record_job_superseded,
+                    args=[job_id, self._superseded_by],
+                    schedule_to_close_timeout=timedelta(seconds=60),
+                    task_queue=bookkeeping_queue,
+                )
+                logger.info("[WF] Job %s superseded by %s", job_id, self._superseded_by)
+                return "cancelled"
+
+            git_result: Optional[str] = None
+            if "k8s" in category or "storage" in category or "compute" in category:
+                # Assume GitOps path for these; using full category for repo lookup
+                git_result = await workflow.execute_activity(
+                    gitops_act.render_and_commit,
+                    args=[
+                        f"{category}.yaml.j2",
+                        {"vm": {"name": params.get("name", payload.get("name", "resource")), **payload}},
+                        category,
+                        f"{tenant_name}/{category.split('/')[-1]}/{params.get('name', payload.get('name', 'resource'))}.yaml",
+                        None,
+                    ],
+                    schedule_to_close_timeout=timedelta(seconds=300),
+                    task_queue=settings.temporal_git_task_queue,
+                )
+
+            # External API calls if needed (stub)
+            api_result = await workflow.execute_activity(
+                apis_act.call_external_api,
+                args=["resource_api", payload, category],
                 schedule_to_close_timeout=timedelta(seconds=300),
+                task_queue=settings.temporal_api_task_queue,
             )
 
-        # External API calls if needed (stub)
-        api_result = await workflow.execute_activity(
-            apis_act.call_external_api,
-            args=["resource_api", payload],
-            schedule_to_close_timeout=timedelta(seconds=300),
-        )
+            # Long-running vendor operations report back through a callback
+            # signal instead of keeping a poll timer / activity slot busy.
+            final_status = "succeeded"
+            if isinstance(api_result, dict) and str(api_result.get("status", "")).lower() in _ASYNC_API_STATUSES:
+                final_status = await self._wait_for_callback(job_id)
+                if final_status != "succeeded":
+                    raise ApplicationError(f"External system reported job {final_status}", non_retryable=True)
+        except (ActivityError, ApplicationError) as exc:
+            await workflow.execute_activity(
+                mon_act.record_job_status,
+                args=[job_id, "failed", str(exc)],
+                schedule_to_close_timeout=timedelta(seconds=60),
+                task_queue=bookkeeping_queue,
+            )
+            raise
 
-        # Wait / poll – simulated by a monitoring activity
         await workflow.execute_activity(
             mon_act.record_job_status,
-            args=[job_id, "completed", str(api_result or git_result)],
+            args=[job_id, final_status, str(api_result or git_result)],
             schedule_to_close_timeout=timedelta(seconds=60),
+            task_queue=bookkeeping_queue,
         )
 
         logger.info("[WF] Job %s completed", job_id)
-        return "succeeded"
+        return final_status
+
+    async def _wait_for_callback(self, job_id: str) -> str:
+        """Block until a terminal callback arrives, polling the DB as fallback.
+
+        Raises :class:`ApplicationError` once ``callback_wait_timeout_seconds``
+        elapses without a terminal status.
+        """
+        from ..activities import monitoring as mon_act
+
+        settings = get_settings()
+        deadline = workflow.now() + timedelta(seconds=settings.callback_wait_timeout_seconds)
+        poll_interval = timedelta(seconds=settings.callback_poll_interval_seconds)
+
+        while self._external_status is None:
+            remaining = deadline - workflow.now()
+            if remaining <= timedelta(0):
+                raise ApplicationError(f"Timed out waiting for callback for job {job_id}", non_retryable=True)
+            try:
+                await workflow.wait_condition(
+                    lambda: self._external_status is not None,
+                    timeout=min(poll_interval, remaining),
+                )
+            except asyncio.TimeoutError:
+                status = await workflow.execute_activity(
+                    mon_act.poll_job_status,
+                    args=[job_id],
+                    schedule_to_close_timeout=timedelta(seconds=30),
+                    task_queue=settings.temporal_bookkeeping_task_queue,
+                )
+                if status in _TERMINAL_STATUSES:
+                    self._external_status = status
+
+        return self._external_status
@@ -0,0 +1,56 @@
+"""Alembic environment: runs migrations over the application's async engine."""
+from __future__ import annotations
+
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import pool
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import gitops_orchestrator.models  # noqa: F401 – registers every table on Base.metadata
+from gitops_orchestrator.config import get_settings
+from gitops_orchestrator.db.partitions import is_partition_table
+from gitops_orchestrator.db.session import Base
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def _url() -> str:
+    return config.get_main_option("sqlalchemy.url") or get_settings().sqlalchemy_database_uri
+
+
+def run_migrations_offline() -> None:
+    """Emit the SQL to stdout (``alembic upgrade head --sql``)."""
+    context.configure(url=_url(), target_metadata=target_metadata, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def _include_name(name: str | None, type_: str, parent_names: dict) -> bool:
+    # job_history partitions are managed at runtime, not by migrations.
+    return not (type_ == "table" and name is not None and is_partition_table(name))
+
+
+def _run(connection: Connection) -> None:
+    context.configure(connection=connection, target_metadata=target_metadata, include_name=_include_name)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_migrations_online() -> None:
+    engine = create_async_engine(_url(), poolclass=pool.NullPool)
+    async with engine.connect() as connection:
+        await connection.run_sync(_run)
+    await engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    asyncio.run(run_migrations_online())
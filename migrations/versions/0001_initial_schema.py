@@ -0,0 +1,102 @@
+"""Initial schema, as ``Base.metadata.create_all`` used to create it.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+Databases bootstrapped earlier with ``Base.metadata.create_all`` already are
+at this revision: run ``alembic stamp 0001 && alembic upgrade head``.
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+resource_category = postgresql.ENUM(
+    "compute_osimages",
+    "compute_vms",
+    "k8s_namespace",
+    "k8s_pvs",
+    "k8s_service_mesh",
+    "enterprise_networking_lb",
+    "enterprise_networking_cname",
+    "enterprise_networking_fw",
+    "storage_s3tenant",
+    "storage_s3bucket",
+    "misc",
+    name="resource_category",
+)
+_STATUSES = ("pending", "running", "succeeded", "failed", "cancelled")
+job_status = postgresql.ENUM(*_STATUSES, name="job_status")
+job_status_history = postgresql.ENUM(*_STATUSES, name="job_status_history")
+job_type = postgresql.ENUM("create", "update", "delete", "read", name="job_type")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tenants",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+
+    op.create_table(
+        "resources",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("tenant_id", sa.UUID(), nullable=False),
+        sa.Column("category", resource_category, nullable=False),
+        sa.Column("name", sa.String(length=200), nullable=False),
+        sa.Column("last_observed_state", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("tenant_id", sa.UUID(), nullable=False),
+        sa.Column("resource_id", sa.UUID(), nullable=True),
+        sa.Column("job_type", job_type, nullable=False),
+        sa.Column("status", job_status, nullable=False),
+        sa.Column("input_payload", sa.JSON(), nullable=False),
+        sa.Column("result_payload", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["resource_id"], ["resources.id"], ondelete="SET NULL"),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    op.create_table(
+        "job_history",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("job_id", sa.UUID(), nullable=False),
+        sa.Column("status", job_status_history, nullable=False),
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+        sa.Column("message", sa.Text(), nullable=True),
+        sa.Column("extra_metadata", sa.JSON(), nullable=True),
+        sa.ForeignKeyConstraint(["job_id"], ["jobs.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("job_history")
+    op.drop_table("jobs")
+    op.drop_table("resources")
+    op.drop_table("tenants")
+    bind = op.get_bind()
+    for enum_type in (job_status_history, job_status, job_type, resource_category):
+        enum_type.drop(bind, checkfirst=True)
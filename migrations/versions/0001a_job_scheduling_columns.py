@@ -0,0 +1,96 @@
+"""Job scheduling columns and indexes for the hot API and scheduler queries.
+
+Revision ID: 0001a
+Revises: 0001
+Create Date: 2026-10-19
+
+Adds the job columns for the tenant-fair scheduler (``priority``,
+``dispatched_at``), superseding (``category``, ``resource_name``,
+``superseded_by_id``) and idempotent submission (``idempotency_key``), plus
+the indexes of the list, scheduler and supersede queries.  Existing jobs
+were started when they were created, so they are marked dispatched then.
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0001a"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_IN_FLIGHT = "status IN ('pending', 'running')"
+
+
+def upgrade() -> None:
+    op.add_column("jobs", sa.Column("category", sa.String(length=100), nullable=True))
+    op.add_column("jobs", sa.Column("resource_name", sa.String(length=200), nullable=True))
+    # The server default only fills existing rows; the models set it on insert.
+    op.add_column("jobs", sa.Column("priority", sa.String(length=32), server_default="normal", nullable=False))
+    op.alter_column("jobs", "priority", server_default=None)
+    op.add_column("jobs", sa.Column("dispatched_at", sa.DateTime(), nullable=True))
+    op.add_column("jobs", sa.Column("idempotency_key", sa.String(length=255), nullable=True))
+    op.add_column("jobs", sa.Column("superseded_by_id", sa.UUID(), nullable=True))
+    op.execute("UPDATE jobs SET dispatched_at = created_at")
+    op.create_foreign_key(
+        "jobs_superseded_by_id_fkey", "jobs", "jobs", ["superseded_by_id"], ["id"], ondelete="SET NULL"
+    )
+    op.create_unique_constraint("uq_jobs_tenant_idempotency_key", "jobs", ["tenant_id", "idempotency_key"])
+
+    op.create_index("ix_tenants_created_at_id", "tenants", ["created_at", "id"])
+    op.create_index(
+        "ix_resources_tenant_category_created", "resources", ["tenant_id", "category", "created_at", "id"]
+    )
+    op.create_index("ix_resources_tenant_created", "resources", ["tenant_id", "created_at", "id"])
+    op.create_index("ix_jobs_tenant_created", "jobs", ["tenant_id", "created_at", "id"])
+    op.create_index("ix_jobs_tenant_status_created", "jobs", ["tenant_id", "status", "created_at", "id"])
+    op.create_index("ix_jobs_resource_created", "jobs", ["resource_id", "created_at"])
+    op.create_index(
+        "ix_jobs_queued",
+        "jobs",
+        ["tenant_id", "priority", "created_at", "id"],
+        postgresql_where=sa.text("dispatched_at IS NULL AND status = 'pending'"),
+    )
+    op.create_index(
+        "ix_jobs_in_flight",
+        "jobs",
+        ["tenant_id"],
+        postgresql_where=sa.text(f"dispatched_at IS NOT NULL AND {_IN_FLIGHT}"),
+    )
+    op.create_index(
+        "ix_jobs_active_resource",
+        "jobs",
+        ["tenant_id", "category", "resource_name"],
+        postgresql_where=sa.text(_IN_FLIGHT),
+    )
+    op.create_index(
+        "ix_jobs_superseded_by",
+        "jobs",
+        ["superseded_by_id"],
+        postgresql_where=sa.text("superseded_by_id IS NOT NULL"),
+    )
+    op.create_index("ix_job_history_job_timestamp", "job_history", ["job_id", "timestamp"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_job_history_job_timestamp", table_name="job_history")
+    for index in (
+        "ix_jobs_superseded_by",
+        "ix_jobs_active_resource",
+        "ix_jobs_in_flight",
+        "ix_jobs_queued",
+        "ix_jobs_resource_created",
+        "ix_jobs_tenant_status_created",
+        "ix_jobs_tenant_created",
+    ):
+        op.drop_index(index, table_name="jobs")
+    op.drop_index("ix_resources_tenant_created", table_name="resources")
+    op.drop_index("ix_resources_tenant_category_created", table_name="resources")
+    op.drop_index("ix_tenants_created_at_id", table_name="tenants")
+    op.drop_constraint("uq_jobs_tenant_idempotency_key", "jobs", type_="unique")
+    op.drop_constraint("jobs_superseded_by_id_fkey", "jobs", type_="foreignkey")
+    for column in ("superseded_by_id", "idempotency_key", "dispatched_at", "priority", "resource_name", "category"):
+        op.drop_column("jobs", column)
@@ -0,0 +1,56 @@
+"""JSONB payload columns with GIN (jsonb_path_ops) indexes.
+
+Revision ID: 0002
+Revises: 0001a
+Create Date: 2026-10-19
+
+Rewrites ``jobs`` and ``resources`` under an ACCESS EXCLUSIVE lock; schedule
+it in a maintenance window on large installations.
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column, nullable, GIN index name)
+_COLUMNS = (
+    ("jobs", "input_payload", False, "ix_jobs_input_payload"),
+    ("jobs", "result_payload", True, "ix_jobs_result_payload"),
+    ("resources", "last_observed_state", False, "ix_resources_last_observed_state"),
+)
+
+
+def upgrade() -> None:
+    for table, column, nullable, index in _COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=postgresql.JSONB(),
+            existing_type=sa.JSON(),
+            existing_nullable=nullable,
+            postgresql_using=f"{column}::jsonb",
+        )
+        op.create_index(
+            index, table, [column], postgresql_using="gin", postgresql_ops={column: "jsonb_path_ops"}
+        )
+
+
+def downgrade() -> None:
+    for table, column, nullable, index in _COLUMNS:
+        op.drop_index(index, table_name=table)
+        op.alter_column(
+            table,
+            column,
+            type_=sa.JSON(),
+            existing_type=postgresql.JSONB(),
+            existing_nullable=nullable,
+            postgresql_using=f"{column}::json",
+        )
@@ -0,0 +1,70 @@
+"""Per-tenant metric rollups.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+Creates ``tenant_rollups`` and backfills it from ``jobs`` / ``resources``
+(same result as ``python -m gitops_orchestrator.db.rollups rebuild``).
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# resource_category enum labels (member names) -> API values used as keys.
+_RESOURCE_CATEGORIES = {
+    "compute_osimages": "compute/osimages",
+    "compute_vms": "compute/vms",
+    "k8s_namespace": "k8s/namespace",
+    "k8s_pvs": "k8s/pvs",
+    "k8s_service_mesh": "k8s/service_mesh",
+    "enterprise_networking_lb": "enterprise_networking/lb",
+    "enterprise_networking_cname": "enterprise_networking/cname",
+    "enterprise_networking_fw": "enterprise_networking/fw",
+    "storage_s3tenant": "storage/s3tenant",
+    "storage_s3bucket": "storage/s3bucket",
+    "misc": "misc",
+}
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tenant_rollups",
+        sa.Column("tenant_id", sa.UUID(), nullable=False),
+        sa.Column("dimension", sa.String(length=32), nullable=False),
+        sa.Column("key", sa.String(length=100), nullable=False),
+        sa.Column("count", sa.BigInteger(), nullable=False),
+        sa.Column("last_job_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("tenant_id", "dimension", "key"),
+    )
+    op.create_index("ix_jobs_tenant_dispatched", "jobs", ["tenant_id", "dispatched_at"])
+
+    categories = ", ".join(f"('{name}', '{value}')" for name, value in _RESOURCE_CATEGORIES.items())
+    op.execute(
+        f"""
+        INSERT INTO tenant_rollups (tenant_id, dimension, key, count, last_job_at)
+        SELECT tenant_id, 'job_status', status::text, count(*), NULL
+        FROM jobs GROUP BY tenant_id, status
+        UNION ALL
+        SELECT tenant_id, 'job_category', category, count(*), max(created_at)
+        FROM jobs WHERE category IS NOT NULL GROUP BY tenant_id, category
+        UNION ALL
+        SELECT r.tenant_id, 'resource_category', c.value, count(*), NULL
+        FROM resources r JOIN (VALUES {categories}) AS c(name, value) ON c.name = r.category::text
+        GROUP BY r.tenant_id, c.value
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jobs_tenant_dispatched", table_name="jobs")
+    op.drop_table("tenant_rollups")
@@ -0,0 +1,100 @@
+"""Range-partition job_history by month.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+
+Recreates ``job_history`` partitioned on ``timestamp`` (primary key
+``(id, timestamp)``; ``id`` widened to bigint, same sequence), with monthly
+partitions from the oldest row up to three months ahead plus a default
+partition, and copies the existing rows over.  Later partitions are created by
+``python -m gitops_orchestrator.db.partitions maintain``.
+
+The copy rewrites the table: on a large ``job_history`` run it in a
+maintenance window.
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_COLUMNS = "id, job_id, status, timestamp, message, extra_metadata"
+
+
+def _create_job_history(id_type: sa.types.TypeEngine, **kw: object) -> None:
+    job_status_history = postgresql.ENUM(name="job_status_history", create_type=False)
+    op.create_table(
+        "job_history",
+        sa.Column("id", id_type, server_default=sa.text("nextval('job_history_id_seq')"), nullable=False),
+        sa.Column("job_id", sa.UUID(), nullable=False),
+        sa.Column("status", job_status_history, nullable=False),
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+        sa.Column("message", sa.Text(), nullable=True),
+        sa.Column("extra_metadata", sa.JSON(), nullable=True),
+        sa.ForeignKeyConstraint(["job_id"], ["jobs.id"], ondelete="CASCADE", name="job_history_job_id_fkey"),
+        **kw,
+    )
+    op.create_index("ix_job_history_job_timestamp", "job_history", ["job_id", "timestamp"])
+
+
+def _set_aside_old_table() -> None:
+    op.execute("ALTER TABLE job_history RENAME TO job_history_old")
+    op.execute("ALTER INDEX ix_job_history_job_timestamp RENAME TO ix_job_history_old_job_timestamp")
+    op.execute("ALTER TABLE job_history_old RENAME CONSTRAINT job_history_pkey TO job_history_old_pkey")
+    op.execute("ALTER TABLE job_history_old RENAME CONSTRAINT job_history_job_id_fkey TO job_history_old_job_id_fkey")
+    # Keep the sequence alive when the old table is dropped.
+    op.execute("ALTER SEQUENCE job_history_id_seq OWNED BY NONE")
+
+
+def _copy_and_drop_old_table() -> None:
+    op.execute(f"INSERT INTO job_history ({_COLUMNS}) SELECT {_COLUMNS} FROM job_history_old")
+    op.execute("ALTER SEQUENCE job_history_id_seq OWNED BY job_history.id")
+    op.execute("DROP TABLE job_history_old")
+
+
+def upgrade() -> None:
+    _set_aside_old_table()
+    op.execute("ALTER SEQUENCE job_history_id_seq AS bigint")
+    _create_job_history(
+        sa.BigInteger(),
+        postgresql_partition_by="RANGE (timestamp)",
+    )
+    op.create_primary_key("job_history_pkey", "job_history", ["id", "timestamp"])
+    op.execute(
+        """
+        DO $$
+        DECLARE month date;
+        BEGIN
+            FOR month IN
+                SELECT generate_series(
+                    date_trunc('month', COALESCE((SELECT min(timestamp) FROM job_history_old), now())),
+                    date_trunc('month', now()) + interval '3 months',
+                    interval '1 month'
+                )::date
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF job_history FOR VALUES FROM (%L) TO (%L)',
+                    'job_history_p' || to_char(month, 'YYYYMM'), month, (month + interval '1 month')::date
+                );
+            END LOOP;
+        END $$
+        """
+    )
+    op.execute("CREATE TABLE job_history_default PARTITION OF job_history DEFAULT")
+    _copy_and_drop_old_table()
+
+
+def downgrade() -> None:
+    _set_aside_old_table()
+    _create_job_history(sa.Integer())
+    op.create_primary_key("job_history_pkey", "job_history", ["id"])
+    _copy_and_drop_old_table()
+    op.execute("ALTER SEQUENCE job_history_id_seq AS integer")
@@ -0,0 +1,110 @@
+"""Git drift reconciliation state.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+
+Adds the manifest path / commit and out-of-band edit columns to
+``resources``, one row per (tenant, category, name), and
+``repo_reconcile_state`` with the last commit reconciled per repo (see
+``gitops_orchestrator.reconciler``).  Resources already duplicated on
+(tenant, category, name) are merged into the most recently updated one
+first: their jobs are moved to it and the resource rollups corrected.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+# resource_category enum labels -> rollup keys, as in 0003.
+_RESOURCE_CATEGORIES = {
+    "compute_osimages": "compute/osimages",
+    "compute_vms": "compute/vms",
+    "k8s_namespace": "k8s/namespace",
+    "k8s_pvs": "k8s/pvs",
+    "k8s_service_mesh": "k8s/service_mesh",
+    "enterprise_networking_lb": "enterprise_networking/lb",
+    "enterprise_networking_cname": "enterprise_networking/cname",
+    "enterprise_networking_fw": "enterprise_networking/fw",
+    "storage_s3tenant": "storage/s3tenant",
+    "storage_s3bucket": "storage/s3bucket",
+    "misc": "misc",
+}
+
+# Every resource sharing (tenant, category, name) with a more recently
+# updated one, and the id of the one it is merged into.
+_DUPLICATES = """
+    SELECT id, keep_id FROM (
+        SELECT id, first_value(id) OVER (
+            PARTITION BY tenant_id, category, name ORDER BY updated_at DESC, created_at DESC, id
+        ) AS keep_id
+        FROM resources
+    ) ranked
+    WHERE id <> keep_id
+"""
+
+
+def _merge_duplicate_resources() -> None:
+    if not op.get_context().as_sql:  # offline (--sql) scripts always include the merge
+        duplicates = op.get_bind().execute(sa.text(f"SELECT count(*) FROM ({_DUPLICATES}) d")).scalar()
+        if not duplicates:
+            return
+        logger.warning("Merging %d duplicate resources before adding uq_resources_tenant_category_name", duplicates)
+    categories = ", ".join(f"('{name}', '{value}')" for name, value in _RESOURCE_CATEGORIES.items())
+    op.execute(
+        f"""
+        UPDATE tenant_rollups t SET count = t.count - d.n
+        FROM (
+            SELECT r.tenant_id, c.value, count(*) AS n
+            FROM resources r
+            JOIN ({_DUPLICATES}) dup ON dup.id = r.id
+            JOIN (VALUES {categories}) AS c(name, value) ON c.name = r.category::text
+            GROUP BY r.tenant_id, c.value
+        ) d
+        WHERE t.tenant_id = d.tenant_id AND t.dimension = 'resource_category' AND t.key = d.value
+        """
+    )
+    op.execute(f"UPDATE jobs SET resource_id = dup.keep_id FROM ({_DUPLICATES}) dup WHERE jobs.resource_id = dup.id")
+    op.execute(f"DELETE FROM resources USING ({_DUPLICATES}) dup WHERE resources.id = dup.id")
+
+
+def upgrade() -> None:
+    op.add_column("resources", sa.Column("git_path", sa.String(length=500), nullable=True))
+    op.add_column("resources", sa.Column("git_commit", sa.String(length=40), nullable=True))
+    op.add_column("resources", sa.Column("drift_commit", sa.String(length=40), nullable=True))
+    op.add_column("resources", sa.Column("drift_detected_at", sa.DateTime(), nullable=True))
+    _merge_duplicate_resources()
+    op.create_unique_constraint("uq_resources_tenant_category_name", "resources", ["tenant_id", "category", "name"])
+    op.create_index(
+        "ix_resources_drifted",
+        "resources",
+        ["tenant_id", "category"],
+        postgresql_where=sa.text("drift_commit IS NOT NULL"),
+    )
+    op.create_table(
+        "repo_reconcile_state",
+        sa.Column("repo_url", sa.String(length=500), nullable=False),
+        sa.Column("commit", sa.String(length=40), nullable=False),
+        sa.Column("reconciled_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("repo_url"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("repo_reconcile_state")
+    op.drop_index("ix_resources_drifted", table_name="resources")
+    op.drop_constraint("uq_resources_tenant_category_name", "resources", type_="unique")
+    op.drop_column("resources", "drift_detected_at")
+    op.drop_column("resources", "drift_commit")
+    op.drop_column("resources", "git_commit")
+    op.drop_column("resources", "git_path")
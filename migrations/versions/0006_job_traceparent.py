@@ -0,0 +1,29 @@
+"""Trace context of queued jobs.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+
+Adds ``jobs.traceparent``: the W3C trace context of the request that
+submitted the job, so a workflow started later by the scheduler continues
+the request's trace (see ``gitops_orchestrator.tracing``).
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("jobs", sa.Column("traceparent", sa.String(length=55), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("jobs", "traceparent")